@@ -1,84 +1,52 @@
-import csv
-import random
-from datetime import datetime, timedelta
-from faker import Faker
+import argparse
+from caminhos import ARQUIVO_CLIENTES
+from escala import adicionar_argumento_sf, num_clientes, tamanho_adaptado
+from escritores import FORMATOS
+from gerador_clientes import lotes_clientes
+from instrumentacao import adicionar_argumentos_instrumentacao, configurar_instrumentacao, etapa
+from manifesto import publicar_com_manifesto
+from reprodutibilidade import (adicionar_argumentos_reprodutibilidade, configurar_reprodutibilidade, lote_alinhado,
+                               parametros_reprodutibilidade)
+from saida import publicar
 
 # --- CONFIGURAÇÃO ---
-NUM_CLIENTES = 12000
-NOME_ARQUIVO = 'CLIENTES.csv'
-LOCALE = 'pt_BR'
+TAMANHO_LOTE = 50_000   # Clientes por lote (teto): a memória não depende do número de clientes
+
+# --- ARGUMENTOS ---
+parser = argparse.ArgumentParser(description='Gera a tabela de clientes.')
+parser.add_argument('--sqlite', action='store_true', help='Carrega os clientes direto no banco SQLite')
+parser.add_argument('--sem-csv', action='store_true', help='Não escreve o arquivo de saída')
+parser.add_argument('--formato', choices=FORMATOS, default='csv', help='Formato do arquivo de saída (padrão: %(default)s)')
+adicionar_argumento_sf(parser)
+adicionar_argumentos_reprodutibilidade(parser)
+adicionar_argumentos_instrumentacao(parser)
+args = parser.parse_args()
+configurar_instrumentacao(args)
+configurar_reprodutibilidade(args)
+
+NUM_CLIENTES = num_clientes(args.sf)
+LOTE = lote_alinhado(tamanho_adaptado(TAMANHO_LOTE, NUM_CLIENTES))
+
+# --- GERAÇÃO E EXPORTAÇÃO EM LOTES ---
+print(f"Gerando {NUM_CLIENTES} registros (SF={args.sf:g})...")
+
+# Cada lote é gerado, escrito e descartado antes do próximo
+def gerar(inicio=0, proximo_id=1):
+    return (linhas for linhas, _ in lotes_clientes(NUM_CLIENTES, LOTE, inicio))
 
-# Inicializa o Faker
-fake = Faker(LOCALE)
-
-# Definições de Domínios para Renda e Ocupação (para simular realidade)
-OCUPACOES = [
-    'CLT', 'Autônomo', 'Funcionário Público', 
-    'Empresário', 'Estudante', 'Aposentado'
-]
-
-# Definir a data mínima e máxima de nascimento (18 a 75 anos)
-def gerar_data_nascimento():
-    hoje = datetime.now()
-    min_idade = hoje - timedelta(days=365 * 75)
-    max_idade = hoje - timedelta(days=365 * 18)
-    return fake.date_between(start_date=min_idade, end_date=max_idade).strftime('%Y-%m-%d')
-
-# Definir a faixa de renda com alguma variação
-def gerar_renda():
-    # Renda base simulando 2k a 8k, com desvio padrão
-    return round(random.gauss(5000, 3000), 2)
-
-# --- GERAÇÃO DE DADOS ---
-dados_clientes = []
-
-# Define o cabeçalho do CSV
-cabecalho = [
-    'cliente_id', 'nome_completo', 'data_nascimento', 
-    'ocupacao', 'renda_mensal', 'cidade', 'estado', 'cpf'
-]
-dados_clientes.append(cabecalho)
-
-print(f"Gerando {NUM_CLIENTES} registros...")
-
-for i in range(1, NUM_CLIENTES + 1):
-    renda = gerar_renda()
-    
-    # Simula distribuição realista: a maioria tem renda positiva
-    if renda < 1000:
-        # Pessoas com renda muito baixa (Estudantes, Aposentados com baixo benefício)
-        renda = random.randint(500, 1500)
-    
-    # Ajusta a ocupação de forma semi-realista
-    if renda > 15000:
-        ocupacao = random.choice(['Empresário', 'CLT'])
-    elif renda < 2000:
-        ocupacao = random.choice(['Estudante', 'Aposentado'])
-    else:
-        ocupacao = random.choice(OCUPACOES)
-        
-    
-    # Monta a linha de dados
-    dados_clientes.append([
-        i,  # cliente_id
-        fake.name(),
-        gerar_data_nascimento(),
-        ocupacao,
-        round(renda, 2),
-        fake.city(),
-        fake.state_abbr(),
-        fake.cpf()
-    ])
-
-print(f"Geração concluída. Escrevendo no arquivo {NOME_ARQUIVO}...")
-
-# --- EXPORTAÇÃO PARA CSV ---
 try:
-    with open(NOME_ARQUIVO, 'w', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        writer.writerows(dados_clientes)
-    
-    print(f"Sucesso! Arquivo '{NOME_ARQUIVO}' criado com {NUM_CLIENTES} clientes.")
+    with etapa('clientes') as medida:
+        if args.formato == 'csv' and not args.sem_csv:
+            # CSV com manifesto por lote: com --seed, lotes já gravados e conferidos são mantidos
+            parametros = {**parametros_reprodutibilidade(), 'num_clientes': NUM_CLIENTES}
+            total, caminho = publicar_com_manifesto(gerar, 'clientes', ARQUIVO_CLIENTES, parametros,
+                                                    args.sqlite, medida, LOTE)
+        else:
+            total, caminho = publicar(medida.chunks(gerar()), 'clientes', ARQUIVO_CLIENTES, args.formato,
+                                      escrever_arquivo=not args.sem_csv, carregar_sqlite=args.sqlite)
+
+    if caminho:
+        print(f"Sucesso! Arquivo '{caminho}' criado com {total} clientes.")
 
 except Exception as e:
     print(f"Erro ao escrever no arquivo: {e}")
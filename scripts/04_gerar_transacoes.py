@@ -1,134 +1,410 @@
-import csv
+import argparse
+import os
 import random
+import sqlite3
+import time
+from contextlib import closing
+from contextlib import ExitStack
 from datetime import datetime, timedelta
-from faker import Faker
-import sys
-
-# Aumenta o limite de campo para o CSV para lidar com registros grandes (segurança)
-csv.field_size_limit = sys.maxsize 
+import numpy as np
+from motor_transacoes import CABECALHO_TRANSACOES, configurar_pool_destinos, chunks_por_linha, chunks_vetorizado, fake
+from geracao_paralela import gerar_em_shards
+from carga_sqlite import carga_em_massa, carregar_tabela, anexar_tabela, criar_indices, ler_csv_em_chunks
+from caminhos import ARQUIVO_CLIENTES, ARQUIVO_CONTAS, ARQUIVO_TRANSACOES, DIRETORIO_TRANSACOES_MENSAIS, CAMINHO_DB
+from checkpoint import (caminho_checkpoint, ler_checkpoint, validar_retomada, restaurar_estado_aleatorio,
+                        EscritorComCheckpoint, gravar_com_estado, remover_checkpoint)
+from escrita_assincrona import EscritorAssincrono, EscritorCronometrado, cronometrar_chunks, relatorio_io
+from modelo_carga import CARGAS, SKEW_CONTAS, SKEW_DIAS, configurar_carga
+from escritores import FORMATOS, COMPRESSOES, EscritorCSV, abrir_escritor, caminho_com_formato, gravar_chunks
+from dados_referencia import carregar_clientes, carregar_contas
+from instrumentacao import adicionar_argumentos_instrumentacao, configurar_instrumentacao, etapa
+from datas import momento_referencia
+from escala import BYTES_CSV_TRANSACAO, adicionar_argumento_sf, num_transacoes as transacoes_do_sf, tamanho_adaptado
+from registros import TabelaContas
+from particoes import EscritorParticionado, carregar_particoes, indexar_particoes, anexar_particoes
+from razao import Razao, registrar_chunks, gravar_razao, atualizar_razao, razao_existe
+from agregados import Agregador, gravar_agregados, agregados_existem
+from incremental import TRANSACOES_POR_DIA, marca_dagua_csv, marca_dagua_sqlite, janela_incremental, chunks_janela
+from manifesto import EscritorComManifesto, chunks_reaproveitaveis, impressao_digital, remover_manifesto
+from reprodutibilidade import (adicionar_argumentos_reprodutibilidade, configurar_reprodutibilidade,
+                               parametros_reprodutibilidade, semear_lote)
 
 # --- CONFIGURAÇÃO DE PRODUÇÃO ---
-NUM_TRANSACOES = 10_000_000  # Dez milhões de transações
-CHUNK_SIZE = 100_000          # Escrevemos em blocos de 100 mil para preservar a RAM
-NOME_ARQUIVO_TRANSACOES = 'TRANSACOES.csv'
-ARQUIVO_CONTAS = 'banco_fake/CONTAS.csv'
-LOCALE = 'pt_BR'
-
-fake = Faker(LOCALE)
-TIPOS_TRANSACAO = ['Depósito', 'Saque', 'TED', 'Pix', 'Compra Débito']
-
-# --- FUNÇÕES DE LEITURA ---
-
-def ler_contas():
-    """Lê todas as contas e suas datas de abertura."""
-    contas = {}
-    try:
-        # Nota: O arquivo de contas é pequeno, podemos ler ele inteiro sem chunking
-        with open(ARQUIVO_CONTAS, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            next(reader) 
-            for row in reader:
-                conta_id = int(row[0])
-                data_abertura_str = row[4] 
-                contas[conta_id] = datetime.strptime(data_abertura_str, '%Y-%m-%d')
-        print(f"Lidas {len(contas)} contas ativas.")
-    except FileNotFoundError:
-        print(f"ERRO: Arquivo de contas não encontrado em '{ARQUIVO_CONTAS}'.")
-        return None
-    return contas
-
-# --- FUNÇÕES DE GERAÇÃO ---
-
-def gerar_destino(tipo):
-    """Simula o destino ou origem da transação."""
-    if tipo in ['TED', 'Pix']:
-        return fake.name()
-    elif tipo == 'Compra Débito':
-        return random.choice(['Supermercado X', 'Farmácia Y', 'Posto Z', 'Loja de Roupas D', 'Restaurante F'])
+# O número de transações vem do fator de escala (--sf; SF=1 = dez milhões)
+CHUNK_SIZE = 100_000          # Teto dos blocos (100 mil); encolhe se a RAM disponível for pouca
+MODO_GERACAO = 'vetorizado'   # 'vetorizado' (lote NumPy) ou 'linha' (loop original)
+TAMANHO_POOL_NOMES = 50_000   # Nomes pré-gerados para destino de TED/Pix (0 = fake.name() por linha)
+
+# --- FUNÇÕES ---
+
+def carregar_transacoes(con, chunks, particionar=False):
+    """Carrega os chunks na tabela única ou nas partições mensais e cria os índices no final."""
+    if particionar:
+        carregar_particoes(con, chunks)
+        indexar_particoes(con)
     else:
-        return 'Interno'
-
-def gerar_transacao(conta_id, data_abertura):
-    """Gera uma única linha de transação."""
-    
-    # 1. Definir o tipo e valor
-    tipo = random.choice(TIPOS_TRANSACAO)
-    
-    if tipo in ['Saque', 'Compra Débito']:
-        valor = round(random.uniform(10, 500), 2)
-    elif tipo == 'Depósito':
-        valor = round(random.uniform(50, 5000), 2)
-    else: # TED, Pix
-        valor = round(random.uniform(100, 10000), 2)
-
-    # 2. Definir a Data/Hora
-    data_maxima = datetime.now() - timedelta(days=7) 
-    data_inicio_valida = data_abertura + timedelta(days=30) 
-    
-    data_inicio_faker = data_inicio_valida
-    if data_inicio_valida > data_maxima:
-        # Se a conta é muito nova, ajusta o início (garante que end_date > start_date)
-        data_inicio_faker = data_maxima - timedelta(days=1)
-        
-    data_hora = fake.date_time_between_dates(
-        datetime_start=data_inicio_faker, 
-        datetime_end=data_maxima
-    ).strftime('%Y-%m-%d %H:%M:%S')
-
-    # 3. Gerar a linha
-    return [
-        conta_id,
-        tipo,
-        valor,
-        data_hora,
-        gerar_destino(tipo)
-    ]
+        carregar_tabela(con, 'transacoes', chunks)
+        criar_indices(con)
+
+def anexar_incremental(args, contas_ref, modelo):
+    """Gera só a janela depois da marca d'água e anexa ao CSV e/ou ao banco (tabela única ou partições)."""
+    inicio_execucao = time.perf_counter()
+
+    marcas = {}
+    if not args.sem_csv:
+        if not os.path.exists(ARQUIVO_TRANSACOES):
+            print(f"ERRO: '{ARQUIVO_TRANSACOES}' não existe. Rode a geração completa antes do --incremental.")
+            return
+        marcas['arquivo'] = marca_dagua_csv(ARQUIVO_TRANSACOES)
+    if args.sqlite:
+        with closing(sqlite3.connect(CAMINHO_DB)) as con:
+            marcas['banco'] = marca_dagua_sqlite(con, args.particionar)
+
+    vazias = [origem for origem, marca in marcas.items() if marca is None]
+    if vazias:
+        print(f"ERRO: sem transações no {' e no '.join(vazias)}. Rode a geração completa antes do --incremental.")
+        return
+    maiores_ids = {origem: marca[0] for origem, marca in marcas.items()}
+    if len(set(maiores_ids.values())) > 1:
+        print(f"ERRO: arquivo e banco fora de sincronia (maior transacao_id: {maiores_ids}).")
+        return
+
+    maior_id = next(iter(maiores_ids.values()))
+    marca_data_hora = max(marca[1] for marca in marcas.values())
+    print(f"Marca d'água: transacao_id {maior_id:,}, data_hora {marca_data_hora}")
+
+    janela = janela_incremental(marca_data_hora, args.dias)
+    if janela is None:
+        print("Nada a gerar: as transações já chegam até agora.")
+        return
+    inicio, fim = janela
+    num_transacoes = max(1, round(args.por_dia * (fim - inicio).total_seconds() / 86400))
+    print(f"Anexando {num_transacoes:,} transações de {inicio} a {fim}...")
+
+    # Semente por (seed, marca d'água): cada execução sorteia contas, valores e destinos novos
+    chunks = chunks_janela(contas_ref, maior_id + 1, inicio, fim, num_transacoes,
+                           tamanho_adaptado(CHUNK_SIZE, num_transacoes),
+                           semear_lote('incremental', maior_id + 1, fake), modelo)
+    razao = Razao(contas_ref) if args.razao else None
+    if razao is not None:
+        chunks = registrar_chunks(chunks, razao)
+    agregador = Agregador(contas_ref) if args.agregados else None
+    if agregador is not None:
+        chunks = registrar_chunks(chunks, agregador)
+    with ExitStack() as pilha:
+        medida = pilha.enter_context(etapa('incremental'))
+        chunks = medida.chunks(chunks)
+        if not args.sem_csv:
+            # Sem cabeçalho, a partir do fim do arquivo atual
+            escritor = EscritorCSV(ARQUIVO_TRANSACOES, 'transacoes', os.path.getsize(ARQUIVO_TRANSACOES))
+            chunks = gravar_chunks(chunks, pilha.enter_context(escritor))
+        if args.sqlite:
+            con = pilha.enter_context(carga_em_massa())
+            if args.particionar:
+                anexar_particoes(con, chunks)
+            else:
+                anexar_tabela(con, 'transacoes', chunks)
+        else:
+            for _ in chunks:
+                pass
+
+    if razao is not None:
+        with carga_em_massa() as con:
+            if razao_existe(con):
+                atualizar_razao(con, razao)
+            else:
+                print("Aviso: livro-razão ainda não existe no banco; rode python razao.py para calculá-lo.")
+
+    if agregador is not None:
+        clientes_ref = carregar_clientes(ARQUIVO_CLIENTES)
+        if clientes_ref is not None:
+            with carga_em_massa() as con:
+                if agregados_existem(con):
+                    gravar_agregados(con, agregador, clientes_ref, contas_ref, incremental=True)
+                else:
+                    print("Aviso: agregados ainda não existem no banco; rode python agregados.py para calculá-los.")
+
+    print(f"\n✅ {num_transacoes:,} transações anexadas (transacao_id {maior_id + 1:,} a "
+          f"{maior_id + num_transacoes:,}) em {time.perf_counter() - inicio_execucao:.1f}s.")
 
 # --- EXECUÇÃO PRINCIPAL ---
 
-contas_data = ler_contas()
-
-if contas_data:
-    lista_ids = list(contas_data.keys())
-    
-    caminho_saida = f"banco_fake/{NOME_ARQUIVO_TRANSACOES}"
-    
-    print(f"Iniciando a geração de {NUM_TRANSACOES:,} transações (aprox. 1 GB)...")
-    
-    try:
-        # 'w' abre o arquivo e o cria se não existir, ou o trunca (limpa) se existir
-        with open(caminho_saida, 'w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            
-            # Escreve o cabeçalho
-            writer.writerow(['transacao_id', 'conta_id', 'tipo', 'valor', 'data_hora', 'destino'])
-            
-            dados_chunk = []
-            transacao_id_counter = 1
-            
-            # Loop principal de GERAÇÃO e ESCRITA EM CHUNKS
-            for i in range(1, NUM_TRANSACOES + 1):
-                
-                # Seleção aleatória de uma conta ID para distribuir as transações
-                conta_id = random.choice(lista_ids)
-                data_abertura = contas_data[conta_id]
-                
-                # Gera e formata a linha de transação
-                transacao_linha = gerar_transacao(conta_id, data_abertura)
-                dados_chunk.append([transacao_id_counter] + transacao_linha)
-                transacao_id_counter += 1
-                
-                # Verifica se atingiu o tamanho do CHUNK ou se é a última iteração
-                if i % CHUNK_SIZE == 0 or i == NUM_TRANSACOES:
-                    
-                    # 🚀 ESCREVE O BLOCO NO DISCO
-                    writer.writerows(dados_chunk)
-                    dados_chunk = [] # Limpa a lista da memória RAM
-                    
-                    # Feedback de progresso
-                    print(f" -> Escritos: {i / 1_000_000:.1f}M registros ({i / NUM_TRANSACOES * 100:.1f}%)")
-                    
-        print(f"\n✅ Concluído! Arquivo '{caminho_saida}' criado com {NUM_TRANSACOES:,} transações.")
-
-    except Exception as e:
-        print(f"\nERRO FATAL DURANTE A ESCRITA: {e}")
+def main():
+    parser = argparse.ArgumentParser(description='Gera o arquivo de transações em chunks.')
+    parser.add_argument('--modo', choices=['vetorizado', 'linha'], default=MODO_GERACAO,
+                        help='Motor de geração (padrão: %(default)s)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processos em paralelo, um shard por processo (padrão: %(default)s)')
+    parser.add_argument('--pool-nomes', type=int, default=TAMANHO_POOL_NOMES,
+                        help='Tamanho do pool de nomes de destino, 0 desativa (padrão: %(default)s)')
+    parser.add_argument('--zipf', type=float, default=0.0,
+                        help='Expoente Zipf para repetir contrapartes no pool (padrão: uniforme)')
+    parser.add_argument('--carga', choices=CARGAS, default='realista',
+                        help='Modelo de contas e instantes; realista = contas/dias quentes e sazonalidade (padrão: %(default)s)')
+    parser.add_argument('--skew-contas', type=float, default=SKEW_CONTAS,
+                        help='Expoente Zipf das contas quentes, 0 desliga (padrão: %(default)s)')
+    parser.add_argument('--skew-dias', type=float, default=SKEW_DIAS,
+                        help='Intensidade dos dias quentes (10^skew x o normal), 0 desliga (padrão: %(default)s)')
+    parser.add_argument('--sqlite', action='store_true',
+                        help='Carrega as transações direto no banco SQLite e cria os índices')
+    parser.add_argument('--sem-csv', action='store_true', help='Não escreve o arquivo de saída')
+    parser.add_argument('--formato', choices=FORMATOS, default='csv',
+                        help='Formato do arquivo de saída (padrão: %(default)s)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continua uma geração interrompida a partir do último checkpoint')
+    parser.add_argument('--assincrono', action='store_true',
+                        help='Grava numa thread separada enquanto o próximo chunk é gerado')
+    parser.add_argument('--compressao', choices=COMPRESSOES, default=None,
+                        help='Comprime o CSV na hora (gzip ou zstd)')
+    parser.add_argument('--particionar', action='store_true',
+                        help='Um arquivo por mês de data_hora em transacoes_mensais/ e, com --sqlite, '
+                             'uma tabela por mês (transacoes_YYYY_MM)')
+    parser.add_argument('--incremental', action='store_true',
+                        help="Anexa só os dias depois da marca d'água do CSV/banco, sem regenerar o histórico")
+    parser.add_argument('--dias', type=int, default=1,
+                        help='Dias anexados por execução com --incremental (padrão: %(default)s)')
+    parser.add_argument('--por-dia', type=int, default=TRANSACOES_POR_DIA,
+                        help='Transações por dia com --incremental (padrão: %(default)s)')
+    parser.add_argument('--razao', action='store_true',
+                        help='Calcula (ou atualiza, com --incremental) o livro-razão de saldos no SQLite')
+    parser.add_argument('--agregados', action='store_true',
+                        help='Calcula (ou atualiza, com --incremental) as tabelas de agregados por conta, cliente e estado')
+    adicionar_argumento_sf(parser)
+    adicionar_argumentos_reprodutibilidade(parser)
+    adicionar_argumentos_instrumentacao(parser)
+    args = parser.parse_args()
+    configurar_instrumentacao(args)
+    configurar_reprodutibilidade(args)
+
+    if args.incremental:
+        if args.workers > 1 or args.formato != 'csv' or args.compressao or args.resume or args.modo == 'linha':
+            parser.error('--incremental anexa ao CSV sem compressão no modo vetorizado '
+                         '(sem --workers/--formato/--compressao/--resume/--modo linha)')
+        if args.particionar and not args.sem_csv:
+            parser.error('--incremental --particionar anexa às tabelas mensais do SQLite; use --sqlite --sem-csv')
+        if args.sem_csv and not args.sqlite:
+            parser.error('--incremental --sem-csv precisa de --sqlite')
+
+    paralelo = not args.incremental and args.workers > 1
+    if paralelo and (args.sem_csv or args.formato != 'csv' or args.compressao):
+        parser.error('--workers junta os shards num CSV; use --formato csv sem --sem-csv/--compressao')
+    if args.compressao and args.formato != 'csv':
+        parser.error('--compressao só vale para --formato csv')
+
+    # CSV sem compressão de um único processo: o arquivo pode ser cortado e continuado. Com --seed,
+    # o manifesto por chunk mantém o que já confere; sem seed, o checkpoint guarda o estado aleatório
+    retomavel = (not paralelo and not args.incremental and not args.sem_csv and not args.particionar
+                 and args.formato == 'csv' and args.compressao is None)
+    com_manifesto = retomavel and args.seed is not None
+    com_checkpoint = retomavel and args.seed is None
+    if args.resume and not com_checkpoint:
+        parser.error('--resume só vale para a geração em CSV sem compressão num único processo '
+                     '(sem --workers/--particionar; com --seed os chunks prontos já são mantidos pelo manifesto)')
+
+    contas_ref = carregar_contas(ARQUIVO_CONTAS)
+    pool_nomes = (args.pool_nomes, args.zipf) if args.pool_nomes > 0 else None
+    if pool_nomes is not None:
+        configurar_pool_destinos(*pool_nomes)
+
+    # O modelo de carga vale para o motor vetorizado; o modo por linha mantém o sorteio original
+    modelo = configurar_carga(args.carga, args.skew_contas, args.skew_dias) if args.modo == 'vetorizado' else None
+
+    if args.incremental:
+        if contas_ref is not None:
+            anexar_incremental(args, contas_ref, modelo)
+        return
+
+    if contas_ref is not None:
+        caminho_saida = caminho_com_formato(ARQUIVO_TRANSACOES, args.formato, args.compressao)
+        num_transacoes = transacoes_do_sf(args.sf)
+        chunk_size = tamanho_adaptado(CHUNK_SIZE, num_transacoes)
+        rng = np.random.default_rng()
+        agora = momento_referencia().replace(microsecond=0)
+        if args.seed is not None:
+            # Com semente, a janela termina à meia-noite (reprodutível no mesmo dia, ou sempre com --as-of)
+            agora = datetime.combine(agora.date(), datetime.min.time())
+        data_maxima = agora - timedelta(days=7)
+        inicio, deslocamento = 0, None
+        chunks_mantidos = []
+
+        if com_checkpoint:
+            checkpoint = ler_checkpoint(caminho_saida)
+            if checkpoint is not None and not args.resume:
+                print(f"Aviso: checkpoint de uma execução interrompida em '{caminho_checkpoint(caminho_saida)}'. "
+                      "Recomeçando do zero (use --resume para continuar).")
+                checkpoint = None
+            elif checkpoint is None and args.resume:
+                print("Nenhum checkpoint encontrado. Começando do zero.")
+
+            if checkpoint is not None:
+                # A janela de datas é a da execução original, para o arquivo todo ser coerente
+                data_maxima = datetime.fromisoformat(checkpoint['parametros']['data_maxima'])
+                chunk_size = checkpoint['parametros']['chunk_size']
+
+            parametros = {
+                'num_transacoes': num_transacoes,
+                'chunk_size': chunk_size,
+                'modo': args.modo,
+                'pool_nomes': list(pool_nomes) if pool_nomes else None,
+                'carga': modelo,
+                'num_contas': len(contas_ref['conta_id']),
+                'data_maxima': data_maxima.isoformat(),
+            }
+
+            if checkpoint is not None:
+                try:
+                    validar_retomada(checkpoint, parametros)
+                except ValueError as e:
+                    print(f"ERRO: {e}. Rode sem --resume para recomeçar do zero.")
+                    return
+                restaurar_estado_aleatorio(checkpoint['estado_aleatorio'], rng, fake)
+                inicio, deslocamento = checkpoint['linhas_escritas'], checkpoint['deslocamento']
+                print(f"Retomando do checkpoint: {inicio:,} transações já escritas "
+                      f"(próximo transacao_id: {checkpoint['proximo_id']:,}).")
+
+        if com_manifesto:
+            # Os chunks mantidos valem só para as mesmas contas e a mesma janela de datas
+            parametros_manifesto = {
+                **parametros_reprodutibilidade(),
+                'num_transacoes': num_transacoes,
+                'modo': args.modo,
+                'pool_nomes': list(pool_nomes) if pool_nomes else None,
+                'carga': modelo,
+                'data_maxima': data_maxima.isoformat(),
+                'contas': impressao_digital(ARQUIVO_CONTAS),
+            }
+            chunks_mantidos, _ = chunks_reaproveitaveis(caminho_saida, parametros_manifesto)
+            inicio = sum(chunk['linhas'] for chunk in chunks_mantidos)
+            if inicio:
+                print(f"Mantendo {inicio:,} transações já geradas com a mesma seed.")
+        elif com_checkpoint or paralelo:
+            # O CSV vai ser reescrito sem manifesto: um manifesto antigo não o descreve mais
+            remover_manifesto(caminho_saida)
+
+        print(f"Iniciando a geração de {num_transacoes:,} transações (SF={args.sf:g}, "
+              f"aprox. {num_transacoes * BYTES_CSV_TRANSACAO / 1024 ** 3:.2f} GB) no modo '{args.modo}'...")
+
+        # Carga no SQLite a partir do arquivo pronto quando parte dele veio de outra execução/processo
+        carregar_do_arquivo = args.sqlite and (paralelo or inicio > 0)
+        # Os shards paralelos saem num CSV único; as partições mensais são feitas a partir dele
+        particionar_do_arquivo = paralelo and args.particionar
+
+        tempos = {}
+        escritor = None
+        inicio_execucao = time.perf_counter()
+
+        try:
+            with etapa('transacoes') as medida:
+                if paralelo:
+                    # A janela termina à meia-noite de hoje (ou do --as-of) - 7 dias: mesmo (seed, workers), mesmo arquivo
+                    seed = args.seed if args.seed is not None else random.SystemRandom().randrange(2**32)
+                    hoje = datetime.combine(momento_referencia().date(), datetime.min.time())
+                    data_maxima = hoje - timedelta(days=7)
+
+                    print(f" -> {args.workers} worker(s), seed={seed}")
+                    gerar_em_shards(caminho_saida, CABECALHO_TRANSACOES, contas_ref, num_transacoes,
+                                    chunk_size, args.workers, seed, data_maxima, args.modo, pool_nomes, modelo)
+                    medida.linhas = num_transacoes
+                    chunks = iter(())
+                elif args.modo == 'vetorizado':
+                    chunks = chunks_vetorizado(contas_ref, num_transacoes, chunk_size, rng, inicio, data_maxima, modelo)
+                else:
+                    chunks = chunks_por_linha(TabelaContas(contas_ref), num_transacoes, chunk_size, inicio, data_maxima)
+
+                # Mede só o tempo gasto gerando cada chunk (a escrita é medida pelo escritor)
+                chunks = medida.chunks(cronometrar_chunks(chunks, tempos))
+
+                # Livro-razão e agregados na mesma passada; se parte das linhas veio de outra
+                # execução/processo, eles leem o arquivo no final
+                razao = Razao(contas_ref) if args.razao else None
+                agregador = Agregador(contas_ref) if args.agregados else None
+                acumular_do_arquivo = paralelo or inicio > 0
+                for acumulador in (razao, agregador):
+                    if acumulador is not None and not acumular_do_arquivo:
+                        chunks = registrar_chunks(chunks, acumulador)
+
+                with ExitStack() as pilha:
+                    if com_checkpoint:
+                        # Cria ou trunca o arquivo (na retomada, corta no último checkpoint e continua)
+                        base = EscritorComCheckpoint(EscritorCSV(caminho_saida, 'transacoes', deslocamento), parametros, inicio)
+                    elif com_manifesto:
+                        # Corta o arquivo depois do último chunk conferido e continua dali
+                        base = EscritorComManifesto(caminho_saida, 'transacoes', parametros_manifesto, chunks_mantidos)
+                    elif not paralelo and not args.sem_csv and args.particionar:
+                        base = EscritorParticionado(DIRETORIO_TRANSACOES_MENSAIS, args.formato, args.compressao)
+                    elif not paralelo and not args.sem_csv:
+                        base = abrir_escritor(args.formato, caminho_saida, 'transacoes', args.compressao)
+                    else:
+                        base = None
+
+                    if base is not None:
+                        # Assíncrono: a thread grava o chunk N enquanto o produtor gera o N+1
+                        escritor = EscritorAssincrono(base) if args.assincrono else EscritorCronometrado(base)
+                        pilha.enter_context(escritor)
+                        if com_checkpoint:
+                            chunks = gravar_com_estado(chunks, escritor, rng, fake)
+                        else:
+                            chunks = gravar_chunks(chunks, escritor)
+
+                    if args.sqlite and not carregar_do_arquivo:
+                        # Índices só depois que a tabela inteira foi carregada
+                        con = pilha.enter_context(carga_em_massa())
+                        carregar_transacoes(con, chunks, args.particionar)
+                    else:
+                        for _ in chunks:
+                            pass
+
+                    if com_manifesto:
+                        base.concluir()
+
+            if carregar_do_arquivo or particionar_do_arquivo:
+                with etapa('carga_do_arquivo') as medida, ExitStack() as pilha:
+                    chunks = medida.chunks(ler_csv_em_chunks(caminho_saida, chunk_size))
+                    if particionar_do_arquivo:
+                        chunks = gravar_chunks(chunks, pilha.enter_context(EscritorParticionado()))
+                    if carregar_do_arquivo:
+                        carregar_transacoes(pilha.enter_context(carga_em_massa()), chunks, args.particionar)
+                    else:
+                        for _ in chunks:
+                            pass
+
+            if razao is not None:
+                with etapa('razao'):
+                    if acumular_do_arquivo:
+                        for chunk in ler_csv_em_chunks(caminho_saida, chunk_size):
+                            razao.acumular(chunk)
+                    with carga_em_massa() as con:
+                        gravar_razao(con, razao)
+
+            if agregador is not None:
+                clientes_ref = carregar_clientes(ARQUIVO_CLIENTES)
+                with etapa('agregados'):
+                    if acumular_do_arquivo:
+                        for chunk in ler_csv_em_chunks(caminho_saida, chunk_size):
+                            agregador.acumular(chunk)
+                    if clientes_ref is not None:
+                        with carga_em_massa() as con:
+                            gravar_agregados(con, agregador, clientes_ref, contas_ref)
+
+            if com_checkpoint:
+                remover_checkpoint(caminho_saida)
+
+            if escritor is not None:
+                relatorio_io(tempos, escritor, time.perf_counter() - inicio_execucao)
+
+            if args.sem_csv:
+                destino = 'no banco SQLite'
+            elif args.particionar:
+                destino = f"nos arquivos mensais em '{DIRETORIO_TRANSACOES_MENSAIS}'"
+            else:
+                destino = f"no arquivo '{caminho_saida}'"
+            print(f"\n✅ Concluído! {num_transacoes:,} transações geradas {destino}.")
+
+        except Exception as e:
+            print(f"\nERRO FATAL DURANTE A ESCRITA: {e}")
+            if com_checkpoint:
+                print("O último chunk completo ficou registrado; rode de novo com --resume para continuar.")
+
+# Guarda necessária para o pool de processos (o módulo é reimportado nos workers)
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,6 @@
 -- Objetivo: Acelerar todas as consultas que usam JOIN ou WHERE na coluna 'conta_id'
 -- da tabela 'transacoes', que é a maior tabela do banco (10M de linhas).
 
-CREATE INDEX idx_trans_conta_id ON transacoes (conta_id);
+CREATE INDEX IF NOT EXISTS idx_trans_conta_id ON transacoes (conta_id);
 
 -- O índice é criado na tabela 'transacoes' (tabela grande) na coluna 'conta_id' (chave de ligação).
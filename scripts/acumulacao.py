@@ -0,0 +1,69 @@
+import numpy as np
+from datas import parsear_datas_hora
+from dominios import CODIGOS_TIPO
+
+# Acumulação de transações em NumPy, compartilhada pelo livro-razão (razao.py) e
+# pelos agregados (agregados.py): cada chunk vira colunas (posição da conta, tipo,
+# valor, instante) e as somas por chave ficam em partes que são consolidadas
+# quando passam de um limite, sem guardar as transações.
+
+# --- CONFIGURAÇÃO ---
+LINHAS_CONSOLIDACAO = 2_000_000 # Chaves pendentes antes de somar as partes
+
+# --- ACUMULAÇÃO ---
+
+def somar_por(chave, *valores):
+    """Chaves únicas (ordenadas) e a soma de cada array de valores por chave."""
+    unicas, inverso = np.unique(chave, return_inverse=True)
+    return (unicas,) + tuple(np.bincount(inverso, weights=v, minlength=len(unicas)) for v in valores)
+
+def colunas_transacoes(ids, linhas):
+    """Colunas de um chunk de transações (texto do CSV ou tipadas do gerador).
+
+    Retorna a posição de cada conta_id em ids (ordenado), o código do tipo, o valor
+    e os segundos de data_hora; ValueError se alguma conta não está em ids.
+    """
+    conta_id = np.array([linha[1] for linha in linhas]).astype(np.int64)
+    tipo = np.array([CODIGOS_TIPO[linha[2]] for linha in linhas], dtype=np.int64)
+    valor = np.array([linha[3] for linha in linhas]).astype(np.float64)
+    segundos = parsear_datas_hora([linha[4] for linha in linhas])
+
+    idx = np.searchsorted(ids, conta_id)
+    if (idx >= len(ids)).any() or (ids[np.minimum(idx, len(ids) - 1)] != conta_id).any():
+        raise ValueError("Transação de uma conta que não existe no CONTAS.csv.")
+    return idx, tipo, valor, segundos
+
+class SomaPorChave:
+    """Partes (chave, valores...) acumuladas chunk a chunk e somadas por chave quando passam de um limite.
+
+    A memória fica proporcional às chaves distintas, não ao número de transações.
+    """
+
+    def __init__(self):
+        self.partes = []
+        self.pendentes = 0
+        self.limite = LINHAS_CONSOLIDACAO
+        self.consolidado = True
+
+    def adicionar(self, chave, *valores):
+        self.partes.append((chave,) + valores)
+        self.pendentes += len(chave)
+        self.consolidado = False
+        if self.pendentes >= self.limite:
+            self.consolidar()
+
+    def consolidar(self):
+        if self.consolidado:
+            return
+        colunas = [np.concatenate([parte[i] for parte in self.partes]) for i in range(len(self.partes[0]))]
+        self.partes = [somar_por(*colunas)]
+        self.pendentes = len(self.partes[0][0])
+        self.limite = max(LINHAS_CONSOLIDACAO, 2 * self.pendentes)
+        self.consolidado = True
+
+    def somas(self):
+        """(chaves únicas ordenadas, somas...) de tudo o que foi adicionado; None se nada foi."""
+        if not self.partes:
+            return None
+        self.consolidar()
+        return self.partes[0]
@@ -0,0 +1,364 @@
+import argparse
+import sqlite3
+import time
+import numpy as np
+from acumulacao import SomaPorChave, colunas_transacoes, somar_por
+from caminhos import ARQUIVO_CLIENTES, ARQUIVO_CONTAS, ARQUIVO_CREDITO, ARQUIVO_TRANSACOES, CAMINHO_DB
+from carga_sqlite import carga_em_massa, ler_csv_em_chunks
+from dados_referencia import carregar_clientes, carregar_contas, carregar_credito
+from datas import SEGUNDOS_DIA, formatar_datas
+from dominios import ESTADOS, OCUPACOES, STATUS_CREDITO, TIPOS_TRANSACAO
+from instrumentacao import adicionar_argumentos_instrumentacao, configurar_instrumentacao, etapa
+
+# Tabelas de agregados para a camada de análise: somas e contagens por tipo de
+# transação já resolvidas por conta, cliente, estado e ocupação, para os painéis
+# consultarem milhares de linhas em vez de juntar transacoes -> contas -> clientes.
+# Uma passada pelos chunks acumula (conta, dia, tipo) em NumPy; os níveis mensal,
+# por cliente e por estado saem desse nível no final, sem reler as transações.
+#   agregados_contas_diario   - conta, dia, tipo: valor e nº de transações
+#   agregados_contas_mensal   - conta, mês, tipo
+#   agregados_clientes_mensal - cliente, mês, tipo (com estado e ocupação)
+#   agregados_estados_mensal  - estado, ocupação, mês, tipo
+#   agregados_clientes        - totais do cliente: entradas, saídas, contas e saldo de abertura
+#   exposicao_credito         - crédito por cliente a partir do CREDITO.csv
+# Transações novas (geração incremental) somam nas tabelas com UPSERT, sem
+# reprocessar o histórico.
+
+# --- CONFIGURAÇÃO ---
+NUM_TIPOS = len(TIPOS_TRANSACAO)
+IDX_DEPOSITO = TIPOS_TRANSACAO.index('Depósito')   # Única entrada; os demais tipos são saídas
+DIAS_CHAVE = 1 << 16             # Chave (conta, dia, tipo) = (índice_conta * DIAS_CHAVE + dia) * NUM_TIPOS + tipo
+LINHAS_POR_INSERT = 100_000
+
+# Contratos em aberto (o valor ainda está com o cliente); 'Pago' e 'Negado' não expõem
+STATUS_EXPOSICAO = [STATUS_CREDITO.index('Aprovado'), STATUS_CREDITO.index('Inadimplente')]
+IDX_INADIMPLENTE = STATUS_CREDITO.index('Inadimplente')
+IDX_NEGADO = STATUS_CREDITO.index('Negado')
+
+ESQUEMAS_AGREGADOS = {
+    'agregados_contas_diario': """
+        CREATE TABLE agregados_contas_diario (
+            conta_id INTEGER, dia TEXT, tipo TEXT, valor REAL, num_transacoes INTEGER,
+            PRIMARY KEY (conta_id, dia, tipo)) WITHOUT ROWID""",
+    'agregados_contas_mensal': """
+        CREATE TABLE agregados_contas_mensal (
+            conta_id INTEGER, mes TEXT, tipo TEXT, valor REAL, num_transacoes INTEGER,
+            PRIMARY KEY (conta_id, mes, tipo)) WITHOUT ROWID""",
+    'agregados_clientes_mensal': """
+        CREATE TABLE agregados_clientes_mensal (
+            cliente_id INTEGER, mes TEXT, tipo TEXT, estado TEXT, ocupacao TEXT, valor REAL, num_transacoes INTEGER,
+            PRIMARY KEY (cliente_id, mes, tipo)) WITHOUT ROWID""",
+    'agregados_estados_mensal': """
+        CREATE TABLE agregados_estados_mensal (
+            estado TEXT, ocupacao TEXT, mes TEXT, tipo TEXT, valor REAL, num_transacoes INTEGER,
+            PRIMARY KEY (estado, ocupacao, mes, tipo)) WITHOUT ROWID""",
+    'agregados_clientes': """
+        CREATE TABLE agregados_clientes (
+            cliente_id INTEGER PRIMARY KEY, estado TEXT, ocupacao TEXT, renda REAL, num_contas INTEGER,
+            saldo_abertura REAL, entradas REAL, saidas REAL, num_transacoes INTEGER)""",
+}
+
+ESQUEMA_EXPOSICAO = """
+    CREATE TABLE exposicao_credito (
+        cliente_id INTEGER PRIMARY KEY, estado TEXT, ocupacao TEXT, renda REAL, num_operacoes INTEGER,
+        valor_contratado REAL, exposicao REAL, valor_inadimplente REAL, taxa_media REAL, ultima_aprovacao TEXT)"""
+
+# Colunas somadas no UPSERT de cada tabela (as demais são a chave ou atributos fixos)
+SOMADAS = {
+    'agregados_contas_diario': ['valor', 'num_transacoes'],
+    'agregados_contas_mensal': ['valor', 'num_transacoes'],
+    'agregados_clientes_mensal': ['valor', 'num_transacoes'],
+    'agregados_estados_mensal': ['valor', 'num_transacoes'],
+    'agregados_clientes': ['entradas', 'saidas', 'num_transacoes'],
+}
+CHAVES = {
+    'agregados_contas_diario': 'conta_id, dia, tipo',
+    'agregados_contas_mensal': 'conta_id, mes, tipo',
+    'agregados_clientes_mensal': 'cliente_id, mes, tipo',
+    'agregados_estados_mensal': 'estado, ocupacao, mes, tipo',
+    'agregados_clientes': 'cliente_id',
+}
+
+# --- ACUMULAÇÃO ---
+
+def meses_de_dias(dias):
+    """Dias desde 1970-01-01 -> meses desde 1970-01."""
+    return np.asarray(dias, dtype='datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+def formatar_meses(meses):
+    """Meses desde 1970-01 -> 'YYYY-MM'."""
+    return np.datetime_as_string(np.asarray(meses, dtype='datetime64[M]')).astype(object)
+
+class Agregador:
+    """Acumula valor e nº de transações por (conta, dia, tipo), chunk a chunk."""
+
+    def __init__(self, contas_ref):
+        ordem = np.argsort(contas_ref['conta_id'])
+        self.ids = np.asarray(contas_ref['conta_id'], dtype=np.int64)[ordem]
+        self.clientes = np.asarray(contas_ref['cliente_id'], dtype=np.int64)[ordem]
+        self.por_chave = SomaPorChave()   # (conta, dia, tipo) -> valor, nº de transações
+        self.num_transacoes = 0
+
+    def acumular(self, linhas):
+        """Soma um chunk de linhas de transação (valores como texto do CSV ou tipados do gerador)."""
+        if not linhas:
+            return
+        idx, tipo, valor, segundos = colunas_transacoes(self.ids, linhas)
+        dia = segundos // SEGUNDOS_DIA
+        self.por_chave.adicionar((idx * DIAS_CHAVE + dia) * NUM_TIPOS + tipo, valor, np.ones(len(idx)))
+        self.num_transacoes += len(idx)
+
+    def diario(self):
+        """Arrays por (conta, dia, tipo), ordenados: índice da conta, dia, tipo, valor e nº de transações."""
+        somas = self.por_chave.somas()
+        if somas is None:
+            vazio = np.zeros(0, dtype=np.int64)
+            return {'idx': vazio, 'dia': vazio, 'tipo': vazio, 'valor': np.zeros(0), 'num': vazio}
+        chave, valor, num = somas
+        tipo = chave % NUM_TIPOS
+        conta_dia = chave // NUM_TIPOS
+        return {'idx': conta_dia // DIAS_CHAVE, 'dia': conta_dia % DIAS_CHAVE, 'tipo': tipo,
+                'valor': valor, 'num': num.astype(np.int64)}
+
+# --- NÍVEIS DE AGREGAÇÃO ---
+
+def posicoes_clientes(clientes_ref, cliente_ids):
+    """Posição de cada cliente_id na referência de clientes (ordenada por id)."""
+    ids = np.asarray(clientes_ref['cliente_id'], dtype=np.int64)
+    posicoes = np.searchsorted(ids, cliente_ids)
+    if (posicoes >= len(ids)).any() or (ids[np.minimum(posicoes, len(ids) - 1)] != cliente_ids).any():
+        raise ValueError("Conta de um cliente que não existe no clientes.csv.")
+    return posicoes
+
+def niveis(agregador, clientes_ref):
+    """Linhas de cada tabela de agregados (colunas em listas), a partir do nível (conta, dia, tipo)."""
+    diario = agregador.diario()
+    nomes_tipo = np.array(TIPOS_TRANSACAO, dtype=object)
+    nomes_estado = np.array(ESTADOS, dtype=object)
+    nomes_ocupacao = np.array(OCUPACOES, dtype=object)
+    valor, num = diario['valor'], diario['num']
+    mes = meses_de_dias(diario['dia'])
+    tabelas = {}
+
+    tabelas['agregados_contas_diario'] = [
+        agregador.ids[diario['idx']], formatar_datas(diario['dia']), nomes_tipo[diario['tipo']], valor, num]
+
+    # (conta, mês, tipo): meses cabem com folga em DIAS_CHAVE
+    chave, soma, conta = somar_por((diario['idx'] * DIAS_CHAVE + mes) * NUM_TIPOS + diario['tipo'], valor, num)
+    tipo, conta_mes = chave % NUM_TIPOS, chave // NUM_TIPOS
+    tabelas['agregados_contas_mensal'] = [
+        agregador.ids[conta_mes // DIAS_CHAVE], formatar_meses(conta_mes % DIAS_CHAVE), nomes_tipo[tipo], soma, conta]
+
+    # (cliente, mês, tipo), pela posição do cliente dono da conta
+    pos_cliente = posicoes_clientes(clientes_ref, agregador.clientes[diario['idx']])
+    chave, soma, conta = somar_por((pos_cliente * DIAS_CHAVE + mes) * NUM_TIPOS + diario['tipo'], valor, num)
+    tipo, cliente_mes = chave % NUM_TIPOS, chave // NUM_TIPOS
+    pos = cliente_mes // DIAS_CHAVE
+    estado = np.asarray(clientes_ref['estado'])[pos]
+    ocupacao = np.asarray(clientes_ref['ocupacao'])[pos]
+    tabelas['agregados_clientes_mensal'] = [
+        np.asarray(clientes_ref['cliente_id'])[pos], formatar_meses(cliente_mes % DIAS_CHAVE), nomes_tipo[tipo],
+        nomes_estado[estado], nomes_ocupacao[ocupacao], soma, conta]
+
+    # (estado, ocupação, mês, tipo) a partir do nível de cliente já somado
+    chave_grupo = ((estado.astype(np.int64) * len(OCUPACOES) + ocupacao) * DIAS_CHAVE
+                   + cliente_mes % DIAS_CHAVE) * NUM_TIPOS + tipo
+    chave, soma, conta = somar_por(chave_grupo, soma, conta)
+    tipo, resto = chave % NUM_TIPOS, chave // NUM_TIPOS
+    grupo, mes_grupo = resto // DIAS_CHAVE, resto % DIAS_CHAVE
+    tabelas['agregados_estados_mensal'] = [
+        nomes_estado[grupo // len(OCUPACOES)], nomes_ocupacao[grupo % len(OCUPACOES)],
+        formatar_meses(mes_grupo), nomes_tipo[tipo], soma, conta]
+
+    # Totais por cliente (todas as linhas do cliente, com ou sem transações novas)
+    n = len(clientes_ref['cliente_id'])
+    entrada = diario['tipo'] == IDX_DEPOSITO
+    entradas = np.bincount(pos_cliente, weights=np.where(entrada, valor, 0.0), minlength=n)
+    saidas = np.bincount(pos_cliente, weights=np.where(entrada, 0.0, valor), minlength=n)
+    transacoes = np.bincount(pos_cliente, weights=num, minlength=n).astype(np.int64)
+    tocados = np.flatnonzero(transacoes)
+    tabelas['agregados_clientes'] = (tocados, entradas, saidas, transacoes)
+
+    return tabelas
+
+# --- TABELAS NO SQLITE ---
+
+def upsert(con, tabela, colunas):
+    """INSERT das colunas; chave repetida soma as colunas de SOMADAS[tabela] (atualização incremental)."""
+    marcadores = ', '.join('?' * len(colunas))
+    # Valores em reais ficam arredondados no centavo; contagens somam direto
+    somas = ', '.join(
+        f"{coluna} = {coluna} + excluded.{coluna}" if coluna == 'num_transacoes'
+        else f"{coluna} = ROUND({coluna} + excluded.{coluna}, 2)"
+        for coluna in SOMADAS[tabela])
+    sql = f"INSERT INTO {tabela} VALUES ({marcadores}) ON CONFLICT ({CHAVES[tabela]}) DO UPDATE SET {somas}"
+    listas = [np.round(c, 2).tolist() if c.dtype == np.float64 else c.tolist() for c in map(np.asarray, colunas)]
+    total = len(listas[0])
+    for inicio in range(0, total, LINHAS_POR_INSERT):
+        fim = inicio + LINHAS_POR_INSERT
+        con.executemany(sql, zip(*(c[inicio:fim] for c in listas)))
+    return total
+
+def linhas_clientes(clientes_ref, contas_ref, posicoes, entradas, saidas, transacoes):
+    """Colunas de agregados_clientes para as posições de cliente pedidas."""
+    ids = np.asarray(clientes_ref['cliente_id'])
+    pos_contas = posicoes_clientes(clientes_ref, np.asarray(contas_ref['cliente_id'], dtype=np.int64))
+    num_contas = np.bincount(pos_contas, minlength=len(ids))
+    saldo = np.bincount(pos_contas, weights=np.asarray(contas_ref['saldo']), minlength=len(ids))
+    return [
+        ids[posicoes],
+        np.array(ESTADOS, dtype=object)[np.asarray(clientes_ref['estado'])[posicoes]],
+        np.array(OCUPACOES, dtype=object)[np.asarray(clientes_ref['ocupacao'])[posicoes]],
+        np.asarray(clientes_ref['renda'])[posicoes],
+        num_contas[posicoes],
+        saldo[posicoes],
+        entradas[posicoes],
+        saidas[posicoes],
+        transacoes[posicoes],
+    ]
+
+def gravar_agregados(con, agregador, clientes_ref, contas_ref, incremental=False):
+    """Recria (ou, com incremental, soma nas existentes) as tabelas de agregados de transações."""
+    inicio = time.perf_counter()
+    tabelas = niveis(agregador, clientes_ref)
+
+    if not incremental:
+        for tabela, ddl in ESQUEMAS_AGREGADOS.items():
+            con.execute(f"DROP TABLE IF EXISTS {tabela}")
+            con.execute(ddl)
+        con.execute("CREATE INDEX idx_agregados_clientes_mensal_mes ON agregados_clientes_mensal (mes, tipo)")
+
+    con.execute("BEGIN")
+    linhas = {}
+    for tabela in ('agregados_contas_diario', 'agregados_contas_mensal',
+                   'agregados_clientes_mensal', 'agregados_estados_mensal'):
+        linhas[tabela] = upsert(con, tabela, tabelas[tabela])
+
+    tocados, entradas, saidas, transacoes = tabelas['agregados_clientes']
+    # Na carga completa entram todos os clientes (inclusive sem transações)
+    posicoes = tocados if incremental else np.arange(len(clientes_ref['cliente_id']))
+    linhas['agregados_clientes'] = upsert(con, 'agregados_clientes',
+                                          linhas_clientes(clientes_ref, contas_ref, posicoes, entradas, saidas, transacoes))
+    con.execute("COMMIT")
+
+    acao = 'atualizados' if incremental else 'gravados'
+    print(f" -> Agregados {acao} ({agregador.num_transacoes:,} transações) em {time.perf_counter() - inicio:.1f}s:")
+    for tabela, total in linhas.items():
+        print(f"    {tabela:<28} {total:>12,} linhas")
+
+def gravar_exposicao_credito(con, credito_ref, clientes_ref):
+    """Recria exposicao_credito: operações, valor contratado, em aberto e inadimplente por cliente."""
+    con.execute("DROP TABLE IF EXISTS exposicao_credito")
+    con.execute(ESQUEMA_EXPOSICAO)
+
+    ids = np.asarray(clientes_ref['cliente_id'])
+    pos = posicoes_clientes(clientes_ref, np.asarray(credito_ref['cliente_id'], dtype=np.int64))
+    status = np.asarray(credito_ref['status'])
+    valor = np.asarray(credito_ref['valor_emprestado'], dtype=np.float64)
+    contratado = np.where(status != IDX_NEGADO, valor, 0.0)
+    em_aberto = np.where(np.isin(status, STATUS_EXPOSICAO), valor, 0.0)
+    n = len(ids)
+
+    num_operacoes = np.bincount(pos, minlength=n)
+    valor_contratado = np.bincount(pos, weights=contratado, minlength=n)
+    exposicao = np.bincount(pos, weights=em_aberto, minlength=n)
+    inadimplente = np.bincount(pos, weights=np.where(status == IDX_INADIMPLENTE, valor, 0.0), minlength=n)
+    # Taxa média ponderada pelo valor contratado
+    juros = np.bincount(pos, weights=contratado * np.asarray(credito_ref['taxa_juros']), minlength=n)
+    taxa_media = np.divide(juros, valor_contratado, out=np.zeros(n), where=valor_contratado > 0)
+    ultima = np.full(n, -1, dtype=np.int64)
+    np.maximum.at(ultima, pos, np.asarray(credito_ref['data_aprovacao'], dtype=np.int64))
+
+    com_credito = np.flatnonzero(num_operacoes)
+    datas = formatar_datas(ultima[com_credito])
+    con.execute("BEGIN")
+    con.executemany(
+        "INSERT INTO exposicao_credito VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        zip(ids[com_credito].tolist(),
+            np.array(ESTADOS, dtype=object)[np.asarray(clientes_ref['estado'])[com_credito]].tolist(),
+            np.array(OCUPACOES, dtype=object)[np.asarray(clientes_ref['ocupacao'])[com_credito]].tolist(),
+            np.asarray(clientes_ref['renda'])[com_credito].tolist(),
+            num_operacoes[com_credito].tolist(),
+            np.round(valor_contratado[com_credito], 2).tolist(),
+            np.round(exposicao[com_credito], 2).tolist(),
+            np.round(inadimplente[com_credito], 2).tolist(),
+            np.round(taxa_media[com_credito], 4).tolist(),
+            datas.tolist()))
+    con.execute("COMMIT")
+    print(f" -> Exposição de crédito: {len(com_credito):,} clientes")
+
+def agregados_existem(con):
+    consulta = ("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN "
+                f"({', '.join('?' * len(ESQUEMAS_AGREGADOS))})")
+    return con.execute(consulta, list(ESQUEMAS_AGREGADOS)).fetchone()[0] == len(ESQUEMAS_AGREGADOS)
+
+# --- CONSULTAS DE EXEMPLO ---
+
+# (descrição, consulta nos agregados, consulta equivalente nas tabelas base)
+CONSULTAS_EXEMPLO = [
+    ("Volume de Pix por estado",
+     "SELECT estado, ROUND(SUM(valor), 2) FROM agregados_estados_mensal WHERE tipo = 'Pix' "
+     "GROUP BY estado ORDER BY estado",
+     "SELECT cl.estado, ROUND(SUM(t.valor), 2) FROM transacoes t JOIN contas c ON c.conta_id = t.conta_id "
+     "JOIN clientes cl ON cl.cliente_id = c.cliente_id WHERE t.tipo = 'Pix' GROUP BY cl.estado ORDER BY cl.estado"),
+    ("Gasto por cliente no último mês",
+     "SELECT cliente_id, ROUND(SUM(valor), 2) FROM agregados_clientes_mensal "
+     "WHERE mes = (SELECT MAX(mes) FROM agregados_clientes_mensal) AND tipo <> 'Depósito' "
+     "GROUP BY cliente_id ORDER BY cliente_id",
+     "SELECT c.cliente_id, ROUND(SUM(t.valor), 2) FROM transacoes t JOIN contas c ON c.conta_id = t.conta_id "
+     "WHERE substr(t.data_hora, 1, 7) = (SELECT MAX(substr(data_hora, 1, 7)) FROM transacoes) "
+     "AND t.tipo <> 'Depósito' GROUP BY c.cliente_id ORDER BY c.cliente_id"),
+    ("Saídas por ocupação",
+     "SELECT ocupacao, ROUND(SUM(saidas), 2) FROM agregados_clientes GROUP BY ocupacao ORDER BY ocupacao",
+     "SELECT cl.ocupacao, ROUND(SUM(t.valor), 2) FROM transacoes t JOIN contas c ON c.conta_id = t.conta_id "
+     "JOIN clientes cl ON cl.cliente_id = c.cliente_id WHERE t.tipo <> 'Depósito' "
+     "GROUP BY cl.ocupacao ORDER BY cl.ocupacao"),
+]
+
+def comparar_consultas(con):
+    """Roda cada consulta de exemplo nos agregados e nas tabelas base; confere o resultado e o tempo."""
+    print("\n--- AGREGADOS vs. TABELAS BASE ---")
+    for descricao, agregada, base in CONSULTAS_EXEMPLO:
+        inicio = time.perf_counter()
+        resultado_agregado = con.execute(agregada).fetchall()
+        t_agregado = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        resultado_base = con.execute(base).fetchall()
+        t_base = time.perf_counter() - inicio
+        # Somas em ordens diferentes podem divergir no último centavo
+        iguais = len(resultado_agregado) == len(resultado_base) and all(
+            a[0] == b[0] and abs(a[1] - b[1]) < 0.05 for a, b in zip(resultado_agregado, resultado_base))
+        print(f" -> {descricao:<34} {t_agregado * 1000:>9.1f} ms vs {t_base * 1000:>9.1f} ms "
+              f"({len(resultado_agregado):,} linhas, {'iguais' if iguais else 'DIFERENTES'})")
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+# Uso direto: monta os agregados a partir dos CSVs já gerados
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Calcula as tabelas de agregados da camada de análise.')
+    parser.add_argument('--db', default=CAMINHO_DB, help='Arquivo do banco (padrão: %(default)s)')
+    parser.add_argument('--comparar', action='store_true',
+                        help='Compara as consultas de exemplo com as mesmas consultas nas tabelas base')
+    adicionar_argumentos_instrumentacao(parser)
+    args = parser.parse_args()
+    configurar_instrumentacao(args)
+
+    clientes_ref = carregar_clientes(ARQUIVO_CLIENTES)
+    contas_ref = carregar_contas(ARQUIVO_CONTAS)
+    credito_ref = carregar_credito(ARQUIVO_CREDITO)
+
+    if clientes_ref is not None and contas_ref is not None:
+        print(f"Calculando os agregados a partir de '{ARQUIVO_TRANSACOES}'...")
+        agregador = Agregador(contas_ref)
+        with etapa('agregados') as medida:
+            for chunk in medida.chunks(ler_csv_em_chunks(ARQUIVO_TRANSACOES)):
+                agregador.acumular(chunk)
+        with etapa('gravar_agregados'), carga_em_massa(args.db) as con:
+            gravar_agregados(con, agregador, clientes_ref, contas_ref)
+            if credito_ref is not None:
+                gravar_exposicao_credito(con, credito_ref, clientes_ref)
+        print("\n✅ Agregados concluídos.")
+
+        if args.comparar:
+            with sqlite3.connect(args.db) as con:
+                comparar_consultas(con)
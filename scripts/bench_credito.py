@@ -0,0 +1,72 @@
+import argparse
+import time
+from collections import Counter
+import numpy as np
+from datas import hoje_em_dias, parsear_datas
+from dominios import STATUS_CREDITO
+from gerador_credito import gerar_lote_credito_por_linha, avaliar_credito, credito_para_linhas
+
+# Benchmark: clientes/seg da decisão de crédito por linha (original) vs. avaliar_credito().
+# Também compara as distribuições (status, valor, taxa, data) das duas saídas.
+# Usa uma população sintética em memória, sem depender dos CSVs.
+
+# --- FUNÇÕES ---
+
+def populacao_sintetica(num_clientes):
+    """Gera dados de risco com idades de 16 a 75 anos e renda/saldo parecidos com os geradores."""
+    rng = np.random.default_rng()
+    hoje_dias = hoje_em_dias()
+    return {
+        'cliente_id': np.arange(1, num_clientes + 1, dtype=np.int64),
+        'renda': np.maximum(500, rng.normal(5000, 3000, num_clientes)).round(2),
+        'saldo_total': rng.uniform(-500, 20000, num_clientes).round(2),
+        'data_nascimento': (hoje_dias - rng.integers(365 * 16, 365 * 75, num_clientes)).astype(np.int32),
+    }
+
+def medir_por_linha(dados_risco):
+    """Decide o crédito com o loop original; retorna (segundos, linhas)."""
+    inicio = time.perf_counter()
+    linhas = gerar_lote_credito_por_linha(dados_risco, 1)
+    return time.perf_counter() - inicio, linhas
+
+def medir_vetorizado(dados_risco):
+    """Decide o crédito com avaliar_credito(); retorna (segundos, linhas)."""
+    rng = np.random.default_rng()
+    inicio = time.perf_counter()
+    colunas = avaliar_credito(rng, dados_risco['renda'], dados_risco['saldo_total'], dados_risco['data_nascimento'])
+    linhas = credito_para_linhas(dados_risco['cliente_id'], colunas, 1)
+    return time.perf_counter() - inicio, linhas
+
+def resumo(linhas, num_clientes):
+    """Indicadores da saída para comparar as distribuições dos dois motores."""
+    status = Counter(linha[4] for linha in linhas)
+    datas = parsear_datas([linha[5] for linha in linhas])
+    return {
+        'operações/cliente': len(linhas) / num_clientes,
+        'valor médio': float(np.mean([linha[2] for linha in linhas])),
+        'taxa média': float(np.mean([linha[3] for linha in linhas])),
+        'dias de aprovação (média)': float(datas.mean()),
+        **{f"% {s}": status[s] / len(linhas) * 100 for s in STATUS_CREDITO},
+    }
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+parser = argparse.ArgumentParser(description='Compara clientes/seg dos motores de crédito.')
+parser.add_argument('--clientes', type=int, default=200_000, help='Clientes na população sintética (padrão: %(default)s)')
+args = parser.parse_args()
+
+dados_risco = populacao_sintetica(args.clientes)
+
+print(f"Benchmark com {args.clientes:,} clientes...")
+
+t_linha, linhas_linha = medir_por_linha(dados_risco)
+t_vetor, linhas_vetor = medir_vetorizado(dados_risco)
+
+print(f" -> Por linha:   {args.clientes / t_linha:>12,.0f} clientes/seg ({t_linha:.2f}s)")
+print(f" -> Vetorizado:  {args.clientes / t_vetor:>12,.0f} clientes/seg ({t_vetor:.2f}s)")
+print(f" -> Ganho:       {t_linha / t_vetor:.1f}x")
+
+print(f"\n{'Indicador':<28} {'Por linha':>12} {'Vetorizado':>12}")
+resumo_linha, resumo_vetor = resumo(linhas_linha, args.clientes), resumo(linhas_vetor, args.clientes)
+for indicador in resumo_linha:
+    print(f"{indicador:<28} {resumo_linha[indicador]:>12,.3f} {resumo_vetor[indicador]:>12,.3f}")
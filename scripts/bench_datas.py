@@ -0,0 +1,61 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from datas import EPOCA, hoje_em_dias, formatar_datas, formatar_datas_hora, parsear_datas, parsear_datas_hora
+
+# Benchmark: formatação e leitura de datas/timestamps por linha (strftime/strptime)
+# vs. as tabelas de datas.py, sobre os mesmos valores aleatórios.
+
+# --- FUNÇÕES ---
+
+def medir(nome, funcao, n, referencia=None):
+    """Executa funcao(), imprime valores/seg e confere o resultado com a referência."""
+    inicio = time.perf_counter()
+    resultado = list(funcao())
+    segundos = time.perf_counter() - inicio
+    if referencia is not None:
+        assert resultado == referencia, f"{nome}: resultado diferente da referência"
+    print(f" -> {nome:<34} {n / segundos:>14,.0f} valores/seg ({segundos:.2f}s)")
+    return resultado, segundos
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+parser = argparse.ArgumentParser(description='Compara strftime/strptime com as tabelas de datas.py.')
+parser.add_argument('--valores', type=int, default=1_000_000, help='Valores por medição (padrão: %(default)s)')
+args = parser.parse_args()
+
+n = args.valores
+rng = np.random.default_rng()
+hoje = hoje_em_dias()
+dias = rng.integers(hoje - 365 * 75, hoje, n)
+segundos = rng.integers((hoje - 365 * 10) * 86400, hoje * 86400, n)
+
+print(f"Benchmark com {n:,} valores...")
+
+print("\nData 'YYYY-MM-DD' (formatação):")
+textos_dias, t_base = medir('strftime', lambda: (
+    (EPOCA + timedelta(days=d)).strftime('%Y-%m-%d') for d in dias.tolist()), n)
+_, t_tabela = medir('datas.formatar_datas', lambda: formatar_datas(dias).tolist(), n, textos_dias)
+print(f" -> Ganho: {t_base / t_tabela:.1f}x")
+
+print("\nTimestamp 'YYYY-MM-DD HH:MM:SS' (formatação):")
+textos_segundos, t_base = medir('strftime', lambda: (
+    (EPOCA + timedelta(seconds=s)).strftime('%Y-%m-%d %H:%M:%S') for s in segundos.tolist()), n)
+medir('np.datetime_as_string', lambda: np.char.replace(
+    np.datetime_as_string(segundos.astype('datetime64[s]'), unit='s'), 'T', ' ').tolist(), n, textos_segundos)
+_, t_tabela = medir('datas.formatar_datas_hora', lambda: formatar_datas_hora(segundos).tolist(), n, textos_segundos)
+print(f" -> Ganho sobre strftime: {t_base / t_tabela:.1f}x")
+
+print("\nData 'YYYY-MM-DD' (leitura):")
+_, t_base = medir('strptime', lambda: (
+    (datetime.strptime(t, '%Y-%m-%d') - EPOCA).days for t in textos_dias), n, dias.tolist())
+_, t_tabela = medir('datas.parsear_datas', lambda: parsear_datas(textos_dias).tolist(), n, dias.tolist())
+print(f" -> Ganho: {t_base / t_tabela:.1f}x")
+
+print("\nTimestamp 'YYYY-MM-DD HH:MM:SS' (leitura):")
+_, t_base = medir('strptime', lambda: (
+    int((datetime.strptime(t, '%Y-%m-%d %H:%M:%S') - EPOCA).total_seconds()) for t in textos_segundos),
+    n, segundos.tolist())
+_, t_tabela = medir('datas.parsear_datas_hora', lambda: parsear_datas_hora(textos_segundos).tolist(), n, segundos.tolist())
+print(f" -> Ganho: {t_base / t_tabela:.1f}x")
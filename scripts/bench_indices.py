@@ -0,0 +1,277 @@
+import argparse
+import hashlib
+import json
+import platform
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from caminhos import CAMINHO_DB
+from carga_sqlite import ARQUIVO_INDICES
+
+# Benchmark de índices do SQLite: roda um catálogo fixo de consultas típicas do
+# banco contra cada conjunto candidato de índices, mede os percentis de latência,
+# guarda o EXPLAIN QUERY PLAN e grava um relatório JSON (chaves ordenadas) para
+# comparar execuções com --comparar. Os índices existentes são removidos durante
+# a medição e recriados no final.
+
+# --- CONFIGURAÇÃO ---
+REPETICOES = 50                 # Execuções por consulta pontual (as analíticas rodam 1/10 disso, mínimo 3)
+SEED = 42                       # Mesmos parâmetros sorteados para todos os conjuntos
+CACHE_KIB = 262144              # cache_size da conexão do benchmark (256 MB)
+ARQUIVO_RELATORIO = 'bench_indices.json'
+TABELAS = ['clientes', 'contas', 'credito', 'transacoes']
+
+# Conjuntos candidatos: lista de (tabela, colunas); None = o 05_otimizar_db.sql atual
+CONJUNTOS_INDICES = {
+    'sem_indices': [],
+    'atual': None,
+    'composto': [('transacoes', ['conta_id', 'data_hora'])],
+    'cobertura': [
+        ('transacoes', ['conta_id', 'data_hora', 'tipo', 'valor', 'destino']),
+        ('transacoes', ['tipo', 'data_hora', 'valor']),
+        ('contas', ['cliente_id', 'saldo_atual']),
+        ('credito', ['status', 'cliente_id', 'valor_emprestado']),
+    ],
+    'composto_credito': [
+        ('transacoes', ['conta_id', 'data_hora']),
+        ('contas', ['cliente_id']),
+        ('credito', ['cliente_id', 'status']),
+    ],
+}
+
+# Catálogo de consultas: SQL, tipo (pontual/analítica) e sorteio dos parâmetros
+# (contexto = maiores ids e data_hora mais recente do banco; sorteio = random.Random).
+# As somas são arredondadas: a ordem de leitura muda com o índice e mudaria os últimos bits.
+CONSULTAS = {
+    'extrato_conta': {
+        'tipo': 'pontual',
+        'sql': """
+            SELECT transacao_id, tipo, valor, data_hora, destino
+            FROM transacoes
+            WHERE conta_id = ? AND data_hora >= ?
+            ORDER BY data_hora DESC, transacao_id DESC""",
+        'parametros': lambda ctx, sorteio: (sorteio.randint(1, ctx['max_conta']), ctx['menos_90_dias']),
+    },
+    'saldo_cliente': {
+        'tipo': 'pontual',
+        'sql': """
+            SELECT cl.cliente_id, cl.nome_completo, COUNT(ct.conta_id), ROUND(SUM(ct.saldo_atual), 2),
+                   ROUND(SUM((SELECT COALESCE(SUM(t.valor), 0) FROM transacoes t
+                              WHERE t.conta_id = ct.conta_id AND t.data_hora >= ?)), 2)
+            FROM clientes cl
+            JOIN contas ct ON ct.cliente_id = cl.cliente_id
+            WHERE cl.cliente_id = ?
+            GROUP BY cl.cliente_id""",
+        'parametros': lambda ctx, sorteio: (ctx['menos_30_dias'], sorteio.randint(1, ctx['max_cliente'])),
+    },
+    'credito_cliente': {
+        'tipo': 'pontual',
+        'sql': """
+            SELECT status, COUNT(*), ROUND(SUM(valor_emprestado), 2)
+            FROM credito
+            WHERE cliente_id = ?
+            GROUP BY status""",
+        'parametros': lambda ctx, sorteio: (sorteio.randint(1, ctx['max_cliente']),),
+    },
+    'inadimplentes_por_renda': {
+        'tipo': 'analitica',
+        'sql': """
+            SELECT CASE
+                       WHEN cl.renda_mensal < 2000 THEN 'ate_2k'
+                       WHEN cl.renda_mensal < 5000 THEN '2k_5k'
+                       WHEN cl.renda_mensal < 10000 THEN '5k_10k'
+                       WHEN cl.renda_mensal < 20000 THEN '10k_20k'
+                       ELSE 'acima_20k'
+                   END AS faixa_renda,
+                   COUNT(*), ROUND(SUM(cr.valor_emprestado), 2)
+            FROM credito cr
+            JOIN clientes cl ON cl.cliente_id = cr.cliente_id
+            WHERE cr.status = 'Inadimplente'
+            GROUP BY faixa_renda
+            ORDER BY MIN(cl.renda_mensal)""",
+        'parametros': lambda ctx, sorteio: (),
+    },
+    'volume_pix_diario': {
+        'tipo': 'analitica',
+        'sql': """
+            SELECT substr(data_hora, 1, 10) AS dia, COUNT(*), ROUND(SUM(valor), 2)
+            FROM transacoes
+            WHERE tipo = 'Pix' AND data_hora >= ? AND data_hora < ?
+            GROUP BY dia
+            ORDER BY dia""",
+        'parametros': lambda ctx, sorteio: (ctx['menos_30_dias'], ctx['ultima_data_hora']),
+    },
+}
+
+# --- FUNÇÕES ---
+
+def contexto_banco(con):
+    """Maiores ids e janelas de data a partir do dado mais recente (não do relógio)."""
+    ultima = con.execute("SELECT MAX(data_hora) FROM transacoes").fetchone()[0]
+    ultima_dt = datetime.strptime(ultima, '%Y-%m-%d %H:%M:%S')
+    return {
+        'max_conta': con.execute("SELECT MAX(conta_id) FROM contas").fetchone()[0],
+        'max_cliente': con.execute("SELECT MAX(cliente_id) FROM clientes").fetchone()[0],
+        'ultima_data_hora': ultima,
+        'menos_30_dias': (ultima_dt - timedelta(days=30)).strftime('%Y-%m-%d %H:%M:%S'),
+        'menos_90_dias': (ultima_dt - timedelta(days=90)).strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+def indices_existentes(con):
+    """(nome, SQL) dos índices criados pelo usuário nas tabelas do benchmark."""
+    marcadores = ', '.join('?' * len(TABELAS))
+    consulta = (f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+                f"AND tbl_name IN ({marcadores}) ORDER BY name")
+    return con.execute(consulta, TABELAS).fetchall()
+
+def remover_indices(con):
+    for nome, _ in indices_existentes(con):
+        con.execute(f"DROP INDEX {nome}")
+
+def tamanho_banco(con):
+    """Bytes em uso no banco (páginas livres de índices removidos não contam)."""
+    paginas = con.execute("PRAGMA page_count").fetchone()[0] - con.execute("PRAGMA freelist_count").fetchone()[0]
+    return paginas * con.execute("PRAGMA page_size").fetchone()[0]
+
+def criar_conjunto(con, indices):
+    """Cria o conjunto de índices; retorna (segundos, bytes ocupados, comandos)."""
+    if indices is None:
+        with open(ARQUIVO_INDICES, 'r', encoding='utf-8') as f:
+            script = f.read()
+        comandos = [linha.strip() for linha in script.splitlines() if linha.strip().upper().startswith('CREATE')]
+    else:
+        comandos = [f"CREATE INDEX idx_bench_{tabela}_{'_'.join(colunas)} ON {tabela} ({', '.join(colunas)})"
+                    for tabela, colunas in indices]
+
+    antes = tamanho_banco(con)
+    inicio = time.perf_counter()
+    if indices is None:
+        con.executescript(script)
+    else:
+        for comando in comandos:
+            con.execute(comando)
+    return time.perf_counter() - inicio, tamanho_banco(con) - antes, comandos
+
+def plano(con, sql, parametros):
+    """Linhas de detalhe do EXPLAIN QUERY PLAN."""
+    return [linha[3] for linha in con.execute("EXPLAIN QUERY PLAN " + sql, parametros)]
+
+def medir_consulta(con, consulta, contexto, repeticoes):
+    """Executa a consulta com parâmetros sorteados (semente fixa); latências em ms e hash dos resultados."""
+    sorteio = random.Random(SEED)
+    lista_parametros = [consulta['parametros'](contexto, sorteio) for _ in range(repeticoes)]
+
+    # Aquecimento fora da medição: as páginas já lidas ficam no cache, igual para todos os conjuntos
+    con.execute(consulta['sql'], lista_parametros[0]).fetchall()
+
+    latencias = []
+    resultado = hashlib.sha256()
+    linhas = 0
+    for parametros in lista_parametros:
+        inicio = time.perf_counter()
+        linhas_consulta = con.execute(consulta['sql'], parametros).fetchall()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        resultado.update(repr(linhas_consulta).encode())
+        linhas += len(linhas_consulta)
+
+    latencias = np.array(latencias)
+    return {
+        'repeticoes': repeticoes,
+        'linhas': linhas,
+        'p50_ms': round(float(np.percentile(latencias, 50)), 3),
+        'p95_ms': round(float(np.percentile(latencias, 95)), 3),
+        'p99_ms': round(float(np.percentile(latencias, 99)), 3),
+        'media_ms': round(float(latencias.mean()), 3),
+        'max_ms': round(float(latencias.max()), 3),
+        'resultado_sha256': resultado.hexdigest()[:16],
+        'plano': plano(con, consulta['sql'], lista_parametros[0]),
+    }
+
+def comparar_relatorios(anterior, atual):
+    """Imprime o p50 de cada (conjunto, consulta) no relatório anterior vs. o atual."""
+    print(f"\n--- COMPARAÇÃO COM {anterior['data']} ---")
+    for conjunto, medidas in atual['conjuntos'].items():
+        antes = anterior['conjuntos'].get(conjunto)
+        if antes is None:
+            continue
+        for nome, medida in medidas['consultas'].items():
+            if nome not in antes['consultas']:
+                continue
+            p50_antes = antes['consultas'][nome]['p50_ms']
+            razao = medida['p50_ms'] / max(p50_antes, 1e-9)
+            mudou_plano = ' (plano mudou)' if medida['plano'] != antes['consultas'][nome]['plano'] else ''
+            print(f" -> {conjunto:<18} {nome:<25} {p50_antes:>10.3f} -> {medida['p50_ms']:>10.3f} ms "
+                  f"({razao:.2f}x){mudou_plano}")
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+parser = argparse.ArgumentParser(description='Mede consultas típicas com cada conjunto candidato de índices.')
+parser.add_argument('--db', default=CAMINHO_DB, help='Arquivo do banco (padrão: %(default)s)')
+parser.add_argument('--repeticoes', type=int, default=REPETICOES, help='Execuções por consulta (padrão: %(default)s)')
+parser.add_argument('--conjuntos', nargs='*', choices=list(CONJUNTOS_INDICES), default=list(CONJUNTOS_INDICES),
+                    help='Conjuntos de índices a medir (padrão: todos)')
+parser.add_argument('--saida', default=ARQUIVO_RELATORIO, help='Relatório JSON (padrão: %(default)s)')
+parser.add_argument('--comparar', default=None, help='Relatório JSON anterior para comparar')
+args = parser.parse_args()
+
+con = sqlite3.connect(args.db, isolation_level=None)
+con.execute(f"PRAGMA cache_size = -{CACHE_KIB}")
+
+faltando = [t for t in TABELAS if not con.execute(
+    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (t,)).fetchone()]
+if faltando:
+    raise SystemExit(f"Tabelas ausentes em '{args.db}': {', '.join(faltando)} (rode carga_sqlite.py antes).")
+
+contexto = contexto_banco(con)
+originais = indices_existentes(con)
+relatorio = {
+    'data': datetime.now().replace(microsecond=0).isoformat(),
+    'banco': args.db,
+    'sqlite': sqlite3.sqlite_version,
+    'python': platform.python_version(),
+    'seed': SEED,
+    'linhas_tabelas': {t: con.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in TABELAS},
+    'contexto': contexto,
+    'conjuntos': {},
+}
+
+print(f"Benchmark de índices em '{args.db}' "
+      f"({relatorio['linhas_tabelas']['transacoes']:,} transações, {args.repeticoes} repetições)...")
+
+try:
+    for conjunto in args.conjuntos:
+        remover_indices(con)
+        segundos, tamanho, comandos = criar_conjunto(con, CONJUNTOS_INDICES[conjunto])
+        print(f"\nConjunto '{conjunto}': {len(comandos)} índice(s), {segundos:.1f}s, {tamanho / 1024 ** 2:.1f} MB")
+
+        medidas = {'indices': comandos, 'criacao_s': round(segundos, 3), 'tamanho_bytes': tamanho, 'consultas': {}}
+        for nome, consulta in CONSULTAS.items():
+            repeticoes = args.repeticoes if consulta['tipo'] == 'pontual' else max(3, args.repeticoes // 10)
+            medida = medir_consulta(con, consulta, contexto, repeticoes)
+            medidas['consultas'][nome] = medida
+            print(f" -> {nome:<25} p50 {medida['p50_ms']:>9.3f} ms | p95 {medida['p95_ms']:>9.3f} ms | "
+                  f"p99 {medida['p99_ms']:>9.3f} ms | {medida['plano'][0]}")
+        relatorio['conjuntos'][conjunto] = medidas
+finally:
+    # Devolve o banco com os índices que tinha antes do benchmark
+    remover_indices(con)
+    for _, sql in originais:
+        con.execute(sql)
+
+# Os conjuntos só mudam o plano: o resultado de cada consulta tem de ser o mesmo
+for nome in CONSULTAS:
+    hashes = {medidas['consultas'][nome]['resultado_sha256'] for medidas in relatorio['conjuntos'].values()}
+    if len(hashes) > 1:
+        print(f"AVISO: a consulta '{nome}' devolveu resultados diferentes entre os conjuntos.")
+
+with open(args.saida, 'w', encoding='utf-8') as f:
+    json.dump(relatorio, f, indent=2, sort_keys=True, ensure_ascii=False)
+print(f"\n✅ Relatório gravado em '{args.saida}'.")
+
+if args.comparar:
+    with open(args.comparar, 'r', encoding='utf-8') as f:
+        comparar_relatorios(json.load(f), relatorio)
+
+con.close()
@@ -0,0 +1,85 @@
+import argparse
+import time
+import numpy as np
+from datas import hoje_em_dias, datetime_para_segundos
+from dominios import TIPOS_CONTA
+from modelo_carga import (SKEW_CONTAS, SKEW_DIAS, construir_alias, amostrar_alias, pesos_contas,
+                          preparar_modelo, sortear_contas, sortear_instantes)
+from datetime import datetime, timedelta
+
+# Benchmark do modelo de carga: custo do sorteio ponderado de contas (alias vs.
+# rng.choice com p= vs. busca binária na soma acumulada) e o perfil gerado
+# (concentração em contas quentes, dias da semana, horas e dias quentes).
+# Usa contas sintéticas em memória, então não depende de banco_fake/CONTAS.csv.
+
+# --- FUNÇÕES ---
+
+def contas_sinteticas(num_contas):
+    """Contas com tipo, saldo e abertura espalhada pelos últimos 10 anos."""
+    rng = np.random.default_rng()
+    return {
+        'conta_id': np.arange(1, num_contas + 1, dtype=np.int64),
+        'tipo_conta': rng.integers(0, len(TIPOS_CONTA), num_contas).astype(np.int8),
+        'saldo': rng.normal(10000, 15000, num_contas),
+        'data_abertura': (hoje_em_dias() - rng.integers(60, 3651, num_contas)).astype(np.int32),
+    }
+
+def cronometrar(nome, funcao, n):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    segundos = time.perf_counter() - inicio
+    print(f" -> {nome:<28} {n / segundos:>14,.0f} sorteios/seg ({segundos:.3f}s)")
+    return resultado
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+parser = argparse.ArgumentParser(description='Mede o sorteio ponderado e mostra o perfil do modelo de carga.')
+parser.add_argument('--contas', type=int, default=1_000_000, help='Contas sintéticas (padrão: %(default)s)')
+parser.add_argument('--sorteios', type=int, default=2_000_000, help='Sorteios por medição (padrão: %(default)s)')
+parser.add_argument('--skew-contas', type=float, default=SKEW_CONTAS, help='(padrão: %(default)s)')
+parser.add_argument('--skew-dias', type=float, default=SKEW_DIAS, help='(padrão: %(default)s)')
+args = parser.parse_args()
+
+rng = np.random.default_rng()
+contas_ref = contas_sinteticas(args.contas)
+pesos = pesos_contas(contas_ref, args.skew_contas)
+n = args.sorteios
+
+print(f"Sorteio ponderado entre {args.contas:,} contas ({n:,} sorteios):")
+inicio = time.perf_counter()
+prob, alias = construir_alias(pesos)
+print(f" -> Montagem das tabelas alias: {time.perf_counter() - inicio:.2f}s (uma vez por execução)")
+
+indices = cronometrar('alias', lambda: amostrar_alias(rng, prob, alias, n), n)
+acumulado = np.cumsum(pesos) / pesos.sum()
+cronometrar('soma acumulada + busca', lambda: np.searchsorted(acumulado, rng.random(n), side='right'), n)
+cronometrar('rng.choice(p=...)', lambda: rng.choice(len(pesos), n, p=pesos / pesos.sum()), n)
+
+# O alias precisa reproduzir os pesos: compara a frequência observada das contas mais pesadas
+frequencia = np.bincount(indices, minlength=len(pesos)) / n
+topo = np.argsort(pesos)[-5:]
+print(" -> Conferência (5 contas mais pesadas, esperado vs. observado):")
+for i in topo[::-1]:
+    print(f"    conta {i + 1:>9}: {pesos[i] / pesos.sum():.4%} vs. {frequencia[i]:.4%}")
+
+# Perfil gerado
+fim = datetime_para_segundos(datetime.now() - timedelta(days=7))
+janela_inicio = (contas_ref['data_abertura'].astype(np.int64) + 30) * 86400
+modelo = preparar_modelo(contas_ref, janela_inicio, fim, args.skew_contas, args.skew_dias)
+idx = sortear_contas(rng, modelo, n)
+instantes = sortear_instantes(rng, modelo, janela_inicio[idx], np.full(n, fim))
+assert ((instantes >= janela_inicio[idx]) & (instantes <= fim)).all(), "instante fora da janela da conta"
+
+por_conta = np.sort(np.bincount(idx, minlength=args.contas))[::-1]
+print(f"\nPerfil (skew_contas={args.skew_contas}, skew_dias={args.skew_dias}):")
+print(f" -> 1% das contas mais ativas: {por_conta[:max(1, args.contas // 100)].sum() / n:.1%} das transações")
+print(f" -> Conta mais ativa:          {por_conta[0] / n:.2%} das transações")
+
+dias = instantes // 86400
+por_dia = np.sort(np.bincount(dias - dias.min()))[::-1]
+print(f" -> Dia mais movimentado:      {por_dia[0] / n:.2%} das transações ({por_dia[0] / np.median(por_dia[por_dia > 0]):.1f}x a mediana)")
+
+semana = np.bincount((dias + 3) % 7, minlength=7) / n
+print(" -> Dias da semana (seg..dom): " + ' '.join(f"{p:.1%}" for p in semana))
+horas = np.bincount(instantes % 86400 // 3600, minlength=24) / n
+print(" -> Horas (0h..23h):           " + ' '.join(f"{p * 100:.1f}" for p in horas))
@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+from datas import dias_para_datetime, hoje_em_dias
+from escala import memoria_disponivel
+from registros import TabelaClientes, TabelaContas, TabelaCreditos
+
+# Benchmark de memória: clientes, contas e crédito em dicionários por registro
+# ({id: {campo: valor}}, datas como datetime) vs. registros.Tabela (colunas NumPy
+# indexadas pelo id denso). Cada (volume, forma) roda num subprocesso novo e mede o
+# RSS acrescentado pela estrutura (/proc/self/statm), o tempo de montagem e
+# consultas por id. Os dados são sintéticos, com as proporções do gerador.
+# Dicionários que não cabem na RAM disponível são estimados pelo maior volume medido.
+
+# --- CONFIGURAÇÃO ---
+VOLUMES = [12_000, 1_000_000, 10_000_000]
+CONTAS_POR_CLIENTE = 1.67
+CREDITOS_POR_CLIENTE = 0.8
+TAMANHO_BLOCO = 1_000_000   # Registros sintéticos gerados por vez
+NUM_CONSULTAS = 200_000
+FRACAO_RAM = 0.8            # Fração da MemAvailable que uma medição pode ocupar
+FORMAS = ['dicionarios', 'tabelas']
+
+# --- DADOS SINTÉTICOS ---
+
+def volumes_tabelas(num_clientes):
+    """(clientes, contas, créditos) do volume."""
+    return num_clientes, int(num_clientes * CONTAS_POR_CLIENTE), int(num_clientes * CREDITOS_POR_CLIENTE)
+
+def blocos_clientes(rng, total):
+    hoje = hoje_em_dias()
+    for inicio in range(0, total, TAMANHO_BLOCO):
+        n = min(TAMANHO_BLOCO, total - inicio)
+        yield {
+            'cliente_id': np.arange(inicio + 1, inicio + n + 1, dtype=np.int64),
+            'data_nascimento': (hoje - rng.integers(18 * 365, 80 * 365, n)).astype(np.int32),
+            'renda': np.round(rng.uniform(1500, 30000, n), 2),
+        }
+
+def blocos_contas(rng, total, num_clientes):
+    hoje = hoje_em_dias()
+    for inicio in range(0, total, TAMANHO_BLOCO):
+        n = min(TAMANHO_BLOCO, total - inicio)
+        yield {
+            'conta_id': np.arange(inicio + 1, inicio + n + 1, dtype=np.int64),
+            'cliente_id': rng.integers(1, num_clientes + 1, n),
+            'tipo_conta': rng.integers(0, 4, n).astype(np.int8),
+            'saldo': np.round(rng.uniform(0, 50000, n), 2),
+            'data_abertura': (hoje - rng.integers(30, 3650, n)).astype(np.int32),
+        }
+
+def blocos_creditos(rng, total, num_clientes):
+    hoje = hoje_em_dias()
+    for inicio in range(0, total, TAMANHO_BLOCO):
+        n = min(TAMANHO_BLOCO, total - inicio)
+        yield {
+            'credito_id': np.arange(inicio + 1, inicio + n + 1, dtype=np.int64),
+            'cliente_id': rng.integers(1, num_clientes + 1, n),
+            'valor_emprestado': np.round(rng.uniform(500, 50000, n), 2),
+            'taxa_juros': rng.choice([0.05, 0.08, 0.12, 0.15, 0.20], n),
+            'status': rng.integers(0, 4, n).astype(np.int8),
+            'data_aprovacao': (hoje - rng.integers(90, 800, n)).astype(np.int32),
+        }
+
+# --- FORMAS ---
+
+def dicionario_de_blocos(blocos, chave, datas):
+    """{id: {campo: valor}} com as colunas de data convertidas para datetime."""
+    registros = {}
+    for bloco in blocos:
+        nomes = list(bloco)
+        for valores in zip(*(bloco[nome].tolist() for nome in nomes)):
+            registro = dict(zip(nomes, valores))
+            for nome in datas:
+                registro[nome] = dias_para_datetime(registro[nome])
+            registros[registro[chave]] = registro
+    return registros
+
+def tabela_de_blocos(classe, blocos):
+    """Tabela com os blocos concatenados em colunas contíguas."""
+    colunas = {}
+    for bloco in blocos:
+        for nome, valores in bloco.items():
+            colunas.setdefault(nome, []).append(valores)
+    return classe({nome: np.concatenate(partes) for nome, partes in colunas.items()})
+
+def montar(forma, num_clientes, rng):
+    """Monta clientes, contas e créditos na forma pedida."""
+    n_clientes, n_contas, n_creditos = volumes_tabelas(num_clientes)
+    clientes = blocos_clientes(rng, n_clientes)
+    contas = blocos_contas(rng, n_contas, num_clientes)
+    creditos = blocos_creditos(rng, n_creditos, num_clientes)
+
+    if forma == 'dicionarios':
+        return (dicionario_de_blocos(clientes, 'cliente_id', ['data_nascimento']),
+                dicionario_de_blocos(contas, 'conta_id', ['data_abertura']),
+                dicionario_de_blocos(creditos, 'credito_id', ['data_aprovacao']))
+    return (tabela_de_blocos(TabelaClientes, clientes),
+            tabela_de_blocos(TabelaContas, contas),
+            tabela_de_blocos(TabelaCreditos, creditos))
+
+def consultar(forma, contas, ids):
+    """Lê saldo e abertura de cada conta_id (acesso por registro, como no modo por linha)."""
+    total = 0.0
+    if forma == 'dicionarios':
+        for conta_id in ids:
+            conta = contas[conta_id]
+            total += conta['saldo']
+            conta['data_abertura']
+    else:
+        for conta_id in ids:
+            conta = contas[conta_id]
+            total += conta.saldo
+            conta.abertura
+    return total
+
+# --- MEDIÇÃO ---
+
+def rss_bytes():
+    """RSS atual do processo."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+def medir_no_processo(forma, num_clientes):
+    """Mede a forma no processo atual; retorna o resultado como dicionário."""
+    rng = np.random.default_rng(42)
+    base = rss_bytes()
+
+    inicio = time.perf_counter()
+    clientes, contas, creditos = montar(forma, num_clientes, rng)
+    segundos_montagem = time.perf_counter() - inicio
+    memoria = rss_bytes() - base
+
+    ids = rng.integers(1, len(contas) + 1, NUM_CONSULTAS).tolist()
+    inicio = time.perf_counter()
+    consultar(forma, contas, ids)
+    segundos_consulta = time.perf_counter() - inicio
+
+    return {
+        'memoria': memoria,
+        'montagem': segundos_montagem,
+        'consultas_seg': NUM_CONSULTAS / segundos_consulta,
+    }
+
+def medir(forma, num_clientes):
+    """Roda a medição num subprocesso (RSS isolado)."""
+    saida = subprocess.run(
+        [sys.executable, __file__, '--filho', forma, str(num_clientes)],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(saida.stdout.splitlines()[-1])
+
+# --- EXECUÇÃO ---
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara a memória de dicionários por registro e de registros.Tabela.')
+    parser.add_argument('volumes', type=int, nargs='*', default=VOLUMES, help='Números de clientes (padrão: %(default)s)')
+    parser.add_argument('--filho', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho is not None:
+        forma, num_clientes = args.filho
+        print(json.dumps(medir_no_processo(forma, int(num_clientes))))
+        return
+
+    disponivel = memoria_disponivel() or 0
+    print(f"RAM disponível: {disponivel / 1024 ** 3:.1f} GB")
+    print(f"{'clientes':>12} {'forma':>12} {'memória':>12} {'bytes/cliente':>14} {'montagem':>10} {'consultas/s':>12}")
+
+    bytes_por_cliente = {}
+    for num_clientes in sorted(args.volumes):
+        for forma in FORMAS:
+            estimado = bytes_por_cliente.get(forma, 0) * num_clientes
+            if estimado > disponivel * FRACAO_RAM:
+                # Não cabe: estima pelo maior volume já medido (a memória cresce linearmente)
+                print(f"{num_clientes:>12,} {forma:>12} {estimado / 1024 ** 2:>9,.0f} MB "
+                      f"{bytes_por_cliente[forma]:>14,.0f} {'estimado (não cabe na RAM)':>24}")
+                continue
+
+            resultado = medir(forma, num_clientes)
+            bytes_por_cliente[forma] = resultado['memoria'] / num_clientes
+            print(f"{num_clientes:>12,} {forma:>12} {resultado['memoria'] / 1024 ** 2:>9,.1f} MB "
+                  f"{bytes_por_cliente[forma]:>14,.0f} {resultado['montagem']:>9.2f}s "
+                  f"{resultado['consultas_seg']:>12,.0f}")
+
+    if set(bytes_por_cliente) == set(FORMAS):
+        print(f"\nDicionários usam {bytes_por_cliente['dicionarios'] / bytes_por_cliente['tabelas']:.1f}x "
+              f"a memória das tabelas (por cliente, no maior volume medido de cada forma).")
+
+if __name__ == '__main__':
+    main()
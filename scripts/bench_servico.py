@@ -0,0 +1,189 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from contextlib import closing
+import numpy as np
+from caminhos import CAMINHO_DB
+from servico_consultas import HOST, PORTA, SEGMENTOS
+
+# Teste de carga do servico_consultas.py: N clientes simultâneos, cada um com a sua
+# conexão HTTP keep-alive, disparando pedidos em sequência (o próximo só depois da
+# resposta) durante --duracao segundos. Para cada nível de concorrência, mede a
+# latência de cada pedido e reporta vazão, p50, p99 e máximo, por rota e no total,
+# e a taxa de acerto do cache no período (lida de /estatisticas).
+# O mix de rotas imita os notebooks: extratos e posições de contas/clientes
+# sorteados entre os --ids-quentes primeiros (os mesmos clientes voltam sempre)
+# e as agregações de crédito por segmento, que se repetem muito.
+
+# --- CONFIGURAÇÃO ---
+DURACAO = 5.0
+NIVEIS = [1, 4, 16, 64]
+IDS_QUENTES = 500
+MIX = {'extrato': 0.5, 'posicao_cliente': 0.35, 'credito_segmento': 0.15}
+ESPERA_SUBIDA = 30.0
+
+# --- PEDIDOS ---
+
+def limites_ids(caminho_db):
+    """Maior conta_id e maior cliente_id do banco (para sortear ids existentes)."""
+    with closing(sqlite3.connect(f"file:{caminho_db}?mode=ro", uri=True)) as con:
+        max_conta = con.execute("SELECT MAX(conta_id) FROM contas").fetchone()[0]
+        max_cliente = con.execute("SELECT MAX(cliente_id) FROM clientes").fetchone()[0]
+    return max_conta, max_cliente
+
+def sortear_pedido(sorteio, max_conta, max_cliente, ids_quentes):
+    """(rota, caminho com a query string) de um pedido do mix."""
+    rota = sorteio.choices(list(MIX), weights=list(MIX.values()))[0]
+    if rota == 'extrato':
+        return rota, f"/extrato?conta_id={sorteio.randint(1, min(ids_quentes, max_conta))}"
+    if rota == 'posicao_cliente':
+        return rota, f"/posicao_cliente?cliente_id={sorteio.randint(1, min(ids_quentes, max_cliente))}"
+    return rota, f"/credito_segmento?segmento={sorteio.choice(list(SEGMENTOS))}"
+
+async def pedir(leitor, escritor, host, caminho):
+    """Um GET na conexão keep-alive; retorna (status, corpo em bytes)."""
+    escritor.write(f"GET {caminho} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1'))
+    await escritor.drain()
+    status = int((await leitor.readline()).split()[1])
+    tamanho = 0
+    while True:
+        linha = await leitor.readline()
+        if linha in (b'\r\n', b'\n', b''):
+            break
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        if nome.strip().lower() == 'content-length':
+            tamanho = int(valor)
+    return status, await leitor.readexactly(tamanho)
+
+async def cliente(indice, host, porta, limite, max_conta, max_cliente, ids_quentes, seed, resultados):
+    """Pedidos em sequência até o limite de tempo; guarda (rota, segundos, status) de cada um."""
+    sorteio = random.Random(seed * 1_000_003 + indice)
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    try:
+        while time.perf_counter() < limite:
+            rota, caminho = sortear_pedido(sorteio, max_conta, max_cliente, ids_quentes)
+            inicio = time.perf_counter()
+            status, _ = await pedir(leitor, escritor, host, caminho)
+            resultados.append((rota, time.perf_counter() - inicio, status))
+    finally:
+        escritor.close()
+
+async def estatisticas(host, porta):
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    try:
+        _, corpo = await pedir(leitor, escritor, host, '/estatisticas')
+    finally:
+        escritor.close()
+    return json.loads(corpo)
+
+async def rodada(args, clientes, max_conta, max_cliente):
+    """Um nível de concorrência: retorna os resultados, os segundos e as estatísticas do cache no período."""
+    antes = (await estatisticas(args.host, args.porta))['cache']
+    resultados = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        cliente(i, args.host, args.porta, inicio + args.duracao, max_conta, max_cliente, args.ids_quentes,
+                args.seed, resultados)
+        for i in range(clientes)
+    ))
+    segundos = time.perf_counter() - inicio
+    depois = (await estatisticas(args.host, args.porta))['cache']
+    cache = {chave: depois[chave] - antes[chave] for chave in ('acertos', 'falhas', 'compartilhados')}
+    return resultados, segundos, cache
+
+# --- RELATÓRIO ---
+
+def percentis(latencias):
+    ms = np.array(latencias) * 1000
+    return np.percentile(ms, 50), np.percentile(ms, 99), ms.max()
+
+def relatorio_nivel(clientes, resultados, segundos, cache):
+    latencias = [latencia for _, latencia, _ in resultados]
+    erros = sum(1 for _, _, status in resultados if status != 200)
+    p50, p99, maximo = percentis(latencias)
+    consultas = sum(cache.values())
+    acerto = (cache['acertos'] + cache['compartilhados']) / consultas if consultas else 0.0
+    print(f" {clientes:>8} {len(resultados):>9,} {len(resultados) / segundos:>10,.0f} {p50:>8.2f} {p99:>8.2f} "
+          f"{maximo:>8.2f} {acerto:>8.1%} {erros:>6,}")
+
+def relatorio_rotas(resultados):
+    print(f" {'rota':<18} {'pedidos':>9} {'p50 ms':>8} {'p99 ms':>8} {'máx ms':>8}")
+    for rota in MIX:
+        latencias = [latencia for nome, latencia, _ in resultados if nome == rota]
+        if latencias:
+            p50, p99, maximo = percentis(latencias)
+            print(f" {rota:<18} {len(latencias):>9,} {p50:>8.2f} {p99:>8.2f} {maximo:>8.2f}")
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+async def esperar_servico(host, porta, processo):
+    """Espera o serviço aceitar conexões (a subida pode criar índices)."""
+    limite = time.perf_counter() + ESPERA_SUBIDA
+    while time.perf_counter() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError('o serviço terminou durante a subida')
+        try:
+            await estatisticas(host, porta)
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"o serviço não respondeu em {ESPERA_SUBIDA:g}s")
+
+async def principal(args):
+    max_conta, max_cliente = limites_ids(args.db)
+    print(f"Teste de carga em http://{args.host}:{args.porta} ({args.duracao:g}s por nível, "
+          f"ids quentes: {args.ids_quentes:,} de {max_conta:,} contas e {max_cliente:,} clientes)...")
+
+    medicoes = []
+    for clientes in args.clientes:
+        resultados, segundos, cache = await rodada(args, clientes, max_conta, max_cliente)
+        medicoes.append((clientes, resultados, segundos, cache))
+        print(f" -> {clientes} cliente(s): {len(resultados):,} pedidos em {segundos:.1f}s")
+
+    print("\n--- LATÊNCIA POR NÍVEL DE CONCORRÊNCIA ---")
+    print(f" {'clientes':>8} {'pedidos':>9} {'pedidos/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'máx ms':>8} "
+          f"{'cache':>8} {'erros':>6}")
+    for medicao in medicoes:
+        relatorio_nivel(*medicao)
+
+    clientes, resultados, _, _ = medicoes[-1]
+    print(f"\n--- POR ROTA ({clientes} clientes) ---")
+    relatorio_rotas(resultados)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Teste de carga do serviço de consultas: p50/p99 com N clientes.')
+    parser.add_argument('--host', default=HOST, help='Endereço do serviço (padrão: %(default)s)')
+    parser.add_argument('--porta', type=int, default=PORTA, help='Porta do serviço (padrão: %(default)s)')
+    parser.add_argument('--db', default=CAMINHO_DB, help='Banco servido, para sortear ids (padrão: %(default)s)')
+    parser.add_argument('--clientes', type=int, nargs='+', default=NIVEIS,
+                        help='Níveis de clientes simultâneos (padrão: %(default)s)')
+    parser.add_argument('--duracao', type=float, default=DURACAO, help='Segundos por nível (padrão: %(default)s)')
+    parser.add_argument('--ids-quentes', type=int, default=IDS_QUENTES,
+                        help='Contas/clientes sorteados entre os N primeiros ids (padrão: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='Semente do sorteio dos pedidos (padrão: %(default)s)')
+    parser.add_argument('--subir', action='store_true',
+                        help='Sobe o servico_consultas.py para o teste (argumentos extras vão para ele depois de --)')
+    args, extras = parser.parse_known_args()
+    if extras and not args.subir:
+        parser.error(f"argumentos não reconhecidos: {' '.join(extras)}")
+
+    processo = None
+    if args.subir:
+        comando = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'servico_consultas.py'),
+                   '--db', args.db, '--host', args.host, '--porta', str(args.porta)]
+        comando += [extra for extra in extras if extra != '--']
+        processo = subprocess.Popen(comando, stdout=subprocess.DEVNULL)
+    try:
+        if processo is not None:
+            asyncio.run(esperar_servico(args.host, args.porta, processo))
+        asyncio.run(principal(args))
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
@@ -0,0 +1,64 @@
+import argparse
+import csv
+import io
+import random
+import time
+import numpy as np
+from datas import hoje_em_dias
+from motor_transacoes import gerar_transacao, preparar_contas, gerar_chunk_vetorizado, chunk_para_linhas
+from registros import TabelaContas
+
+# Benchmark: linhas/seg do loop por linha (original) vs. motor vetorizado.
+# Usa contas sintéticas em memória, então não depende de banco_fake/CONTAS.csv.
+
+# --- FUNÇÕES ---
+
+def contas_sinteticas(num_contas):
+    """Gera contas de referência (arrays) com aberturas espalhadas pelos últimos 10 anos."""
+    hoje_dias = hoje_em_dias()
+    return {
+        'conta_id': np.arange(1, num_contas + 1, dtype=np.int64),
+        'data_abertura': hoje_dias - np.random.default_rng().integers(30, 3651, num_contas).astype(np.int32),
+    }
+
+def medir_por_linha(contas_ref, num_linhas):
+    """Gera e serializa num_linhas com o loop original; retorna segundos."""
+    contas = TabelaContas(contas_ref)
+    writer = csv.writer(io.StringIO())
+
+    inicio = time.perf_counter()
+    dados_chunk = []
+    for i in range(1, num_linhas + 1):
+        conta = contas.em(random.randrange(len(contas)))
+        dados_chunk.append([i] + gerar_transacao(conta.conta_id, conta.abertura))
+    writer.writerows(dados_chunk)
+    return time.perf_counter() - inicio
+
+def medir_vetorizado(contas_ref, num_linhas):
+    """Gera e serializa num_linhas com o motor vetorizado; retorna segundos."""
+    rng = np.random.default_rng()
+    writer = csv.writer(io.StringIO())
+
+    inicio = time.perf_counter()
+    contas = preparar_contas(contas_ref)
+    colunas = gerar_chunk_vetorizado(rng, contas, num_linhas)
+    writer.writerows(chunk_para_linhas(colunas, 1))
+    return time.perf_counter() - inicio
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+parser = argparse.ArgumentParser(description='Compara linhas/seg dos motores de transações.')
+parser.add_argument('--linhas', type=int, default=100_000, help='Linhas por medição (padrão: %(default)s)')
+parser.add_argument('--contas', type=int, default=20_000, help='Contas sintéticas (padrão: %(default)s)')
+args = parser.parse_args()
+
+contas_ref = contas_sinteticas(args.contas)
+
+print(f"Benchmark com {args.linhas:,} transações e {args.contas:,} contas...")
+
+t_linha = medir_por_linha(contas_ref, args.linhas)
+t_vetor = medir_vetorizado(contas_ref, args.linhas)
+
+print(f" -> Por linha:   {args.linhas / t_linha:>12,.0f} linhas/seg ({t_linha:.2f}s)")
+print(f" -> Vetorizado:  {args.linhas / t_vetor:>12,.0f} linhas/seg ({t_vetor:.2f}s)")
+print(f" -> Ganho:       {t_linha / t_vetor:.1f}x")
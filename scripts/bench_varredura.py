@@ -0,0 +1,58 @@
+import argparse
+import os
+from caminhos import CAMINHO_DB
+from varredura_fraude import CONTAS_POR_LOTE, FONTES, REGRAS, adicionar_argumentos_regras, parametros_dos_argumentos, varrer
+
+# Benchmark da varredura de fraude: linhas/seg por regra e escalabilidade de 1 a N
+# processos. Cada rodada varre o banco inteiro sem gravar a tabela alertas, então
+# mede só a leitura por faixas de conta_id e as regras.
+
+# --- FUNÇÕES ---
+
+def contagens_workers(maximo):
+    """1, 2, 4, ... até maximo (sempre incluindo maximo)."""
+    contagens = []
+    n = 1
+    while n < maximo:
+        contagens.append(n)
+        n *= 2
+    return contagens + [maximo]
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+parser = argparse.ArgumentParser(description='Mede a varredura de fraude com 1 a N workers.')
+parser.add_argument('--db', default=CAMINHO_DB, help='Arquivo do banco (padrão: %(default)s)')
+parser.add_argument('--fonte', choices=FONTES, default='transacoes', help='Origem das transações (padrão: %(default)s)')
+parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1,
+                    help='Maior número de workers medido (padrão: nº de CPUs)')
+parser.add_argument('--contas-por-lote', type=int, default=CONTAS_POR_LOTE,
+                    help='Contas por lote (padrão: %(default)s)')
+adicionar_argumentos_regras(parser)
+args = parser.parse_args()
+
+regras = args.regra or list(REGRAS)
+parametros = parametros_dos_argumentos(args)
+print(f"Benchmark da varredura ({args.fonte}) em '{args.db}', {os.cpu_count()} CPU(s)...")
+
+resultados = []
+for workers in contagens_workers(args.max_workers):
+    resultado = varrer(args.db, args.fonte, regras, workers, args.contas_por_lote, parametros, gravar=False)
+    resultados.append((workers, resultado))
+    print(f" -> {workers} worker(s): {resultado['segundos']:.2f}s")
+
+linhas = resultados[0][1]['linhas']
+base = resultados[0][1]['segundos']
+print(f"\n--- ESCALABILIDADE ({linhas:,} transações) ---")
+print(f" {'workers':>7} {'segundos':>9} {'linhas/seg':>14} {'speedup':>8} {'eficiência':>10}")
+for workers, resultado in resultados:
+    speedup = base / max(resultado['segundos'], 1e-9)
+    print(f" {workers:>7} {resultado['segundos']:>9.2f} {linhas / max(resultado['segundos'], 1e-9):>14,.0f} "
+          f"{speedup:>7.2f}x {speedup / workers:>10.0%}")
+
+# Por regra: CPU somado nos workers, então a vazão de cada regra mal muda com o nº de processos
+print("\n--- LINHAS/SEG POR REGRA (CPU somado dos workers) ---")
+print(f" {'etapa':<20}" + ''.join(f" {f'{w} worker(s)':>14}" for w, _ in resultados) + f" {'alertas':>10}")
+for nome in ['leitura'] + regras:
+    tempos = [r['leitura'] if nome == 'leitura' else r['regras'][nome] for _, r in resultados]
+    alertas = '' if nome == 'leitura' else f"{resultados[0][1]['alertas'][nome]:>10,}"
+    print(f" {nome:<20}" + ''.join(f" {linhas / max(t, 1e-9):>14,.0f}" for t in tempos) + f" {alertas}")
@@ -0,0 +1,17 @@
+import os
+
+# Caminhos de entrada/saída do pipeline, num lugar só.
+# Todos são relativos ao diretório data/, de onde os scripts são executados
+# (ex.: cd data && python ../scripts/01_gerar_clientes.py).
+
+# --- CONFIGURAÇÃO ---
+DIRETORIO_DADOS = 'banco_fake'
+DIRETORIO_CACHE = os.path.join(DIRETORIO_DADOS, '.cache')
+
+ARQUIVO_CLIENTES = os.path.join(DIRETORIO_DADOS, 'clientes.csv')
+ARQUIVO_CONTAS = os.path.join(DIRETORIO_DADOS, 'CONTAS.csv')
+ARQUIVO_CREDITO = os.path.join(DIRETORIO_DADOS, 'CREDITO.csv')
+ARQUIVO_TRANSACOES = os.path.join(DIRETORIO_DADOS, 'TRANSACOES.csv')
+DIRETORIO_TRANSACOES_MENSAIS = os.path.join(DIRETORIO_DADOS, 'transacoes_mensais')
+
+CAMINHO_DB = 'banco_fake.db'
@@ -0,0 +1,181 @@
+import argparse
+import csv
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from itertools import islice
+from caminhos import ARQUIVO_CLIENTES, ARQUIVO_CONTAS, ARQUIVO_CREDITO, ARQUIVO_TRANSACOES, CAMINHO_DB
+from instrumentacao import adicionar_argumentos_instrumentacao, configurar_instrumentacao, etapa
+
+# Carga direta para o SQLite (etapa 5 do pipeline).
+# Recebe os chunks de linhas dos geradores 01–04 (ou lê os CSVs já gerados)
+# e insere com executemany em transações grandes, com PRAGMAs de carga.
+
+# --- CONFIGURAÇÃO ---
+ARQUIVO_INDICES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '05_otimizar_db.sql')
+LINHAS_POR_TRANSACAO = 500_000   # Linhas inseridas entre um COMMIT e outro
+CHUNK_LEITURA = 100_000          # Linhas por chunk ao ler um CSV existente
+
+# PRAGMAs usados só durante a carga (restaurados no final)
+PRAGMAS_CARGA = {
+    'journal_mode': 'OFF',
+    'synchronous': 'OFF',
+    'cache_size': -262144,  # Negativo = KiB, aqui 256 MB
+}
+
+# Colunas (nome, tipo SQLite) de cada tabela, na ordem dos CSVs
+ESQUEMAS = {
+    'clientes': [
+        ('cliente_id', 'INTEGER PRIMARY KEY'), ('nome_completo', 'TEXT'), ('data_nascimento', 'TEXT'),
+        ('ocupacao', 'TEXT'), ('renda_mensal', 'REAL'), ('cidade', 'TEXT'), ('estado', 'TEXT'), ('cpf', 'TEXT'),
+    ],
+    'contas': [
+        ('conta_id', 'INTEGER PRIMARY KEY'), ('cliente_id', 'INTEGER'), ('tipo_conta', 'TEXT'),
+        ('saldo_atual', 'REAL'), ('data_abertura', 'TEXT'),
+    ],
+    'credito': [
+        ('credito_id', 'INTEGER PRIMARY KEY'), ('cliente_id', 'INTEGER'), ('valor_emprestado', 'REAL'),
+        ('taxa_juros', 'REAL'), ('status', 'TEXT'), ('data_aprovacao', 'TEXT'),
+    ],
+    'transacoes': [
+        ('transacao_id', 'INTEGER PRIMARY KEY'), ('conta_id', 'INTEGER'), ('tipo', 'TEXT'),
+        ('valor', 'REAL'), ('data_hora', 'TEXT'), ('destino', 'TEXT'),
+    ],
+}
+
+# CSV de origem de cada tabela (usado quando a carga é feita a partir dos arquivos)
+ARQUIVOS_CSV = {
+    'clientes': ARQUIVO_CLIENTES,
+    'contas': ARQUIVO_CONTAS,
+    'credito': ARQUIVO_CREDITO,
+    'transacoes': ARQUIVO_TRANSACOES,
+}
+
+# --- FUNÇÕES ---
+
+def aplicar_pragmas_carga(con):
+    """Aplica PRAGMAS_CARGA e retorna os valores anteriores para restaurar depois."""
+    anteriores = {}
+    for nome, valor in PRAGMAS_CARGA.items():
+        atual = con.execute(f"PRAGMA {nome}").fetchone()[0]
+        # Em WAL (ex.: banco aberto pelo servico_consultas.py) o journal fica: sair do WAL
+        # exige o banco só para esta conexão, e os leitores seguem lendo durante a carga
+        if nome == 'journal_mode' and atual == 'wal':
+            continue
+        anteriores[nome] = atual
+        con.execute(f"PRAGMA {nome} = {valor}")
+    return anteriores
+
+def restaurar_pragmas(con, anteriores):
+    """Restaura os PRAGMAs salvos por aplicar_pragmas_carga()."""
+    for nome, valor in anteriores.items():
+        con.execute(f"PRAGMA {nome} = {valor}")
+
+@contextmanager
+def carga_em_massa(caminho_db=CAMINHO_DB):
+    """Abre o banco com PRAGMAs de carga e os restaura ao sair."""
+    # isolation_level=None: controlamos BEGIN/COMMIT manualmente
+    con = sqlite3.connect(caminho_db, isolation_level=None)
+    anteriores = aplicar_pragmas_carga(con)
+    try:
+        yield con
+    finally:
+        restaurar_pragmas(con, anteriores)
+        con.close()
+
+def tabela_existe(con, tabela):
+    return con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)).fetchone() is not None
+
+def preparar_tabela(con, tabela, nome_tabela=None):
+    """Recria a tabela vazia com o esquema de ESQUEMAS (nome_tabela: outro nome, ex.: uma partição)."""
+    colunas = ESQUEMAS[tabela]
+    nome_tabela = nome_tabela or tabela
+    con.execute(f"DROP TABLE IF EXISTS {nome_tabela}")
+    con.execute(f"CREATE TABLE {nome_tabela} ({', '.join(f'{nome} {tipo}' for nome, tipo in colunas)})")
+
+def inserir_linhas(con, tabela, linhas, nome_tabela=None):
+    """Insere um chunk de linhas com executemany (a transação fica a cargo de quem chama)."""
+    con.executemany(f"INSERT INTO {nome_tabela or tabela} VALUES ({', '.join('?' * len(ESQUEMAS[tabela]))})", linhas)
+
+def carregar_tabela(con, tabela, chunks):
+    """Recria a tabela e insere os chunks de linhas; retorna o total de linhas inseridas."""
+    preparar_tabela(con, tabela)
+
+    inicio = time.perf_counter()
+    total = 0
+    pendentes = 0
+
+    con.execute("BEGIN")
+    for chunk in chunks:
+        inserir_linhas(con, tabela, chunk)
+        total += len(chunk)
+        pendentes += len(chunk)
+
+        # Transações grandes, mas limitadas, para não inflar o journal em memória
+        if pendentes >= LINHAS_POR_TRANSACAO:
+            con.execute("COMMIT")
+            con.execute("BEGIN")
+            pendentes = 0
+    con.execute("COMMIT")
+
+    segundos = time.perf_counter() - inicio
+    print(f" -> Tabela '{tabela}': {total:,} linhas em {segundos:.1f}s "
+          f"({total / max(segundos, 1e-9):,.0f} linhas/seg)")
+    return total
+
+def anexar_tabela(con, tabela, chunks):
+    """Acrescenta os chunks a uma tabela existente numa transação; os índices são atualizados pelo INSERT."""
+    inicio = time.perf_counter()
+    total = 0
+
+    con.execute("BEGIN")
+    for chunk in chunks:
+        inserir_linhas(con, tabela, chunk)
+        total += len(chunk)
+    con.execute("COMMIT")
+
+    print(f" -> Tabela '{tabela}': +{total:,} linhas em {time.perf_counter() - inicio:.2f}s")
+    return total
+
+def criar_indices(con, caminho_sql=ARQUIVO_INDICES):
+    """Executa o 05_otimizar_db.sql (só depois que a carga terminou)."""
+    inicio = time.perf_counter()
+    with open(caminho_sql, 'r', encoding='utf-8') as f:
+        con.executescript(f.read())
+    print(f" -> Índices criados em {time.perf_counter() - inicio:.1f}s")
+
+def ler_csv_em_chunks(caminho, chunk_size=CHUNK_LEITURA):
+    """Lê um CSV gerado (pulando o cabeçalho) em chunks de linhas."""
+    with open(caminho, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                break
+            yield chunk
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+# Uso direto: carrega os CSVs já existentes em banco_fake/ para o banco
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Carrega os CSVs gerados para o SQLite.')
+    parser.add_argument('tabelas', nargs='*', default=list(ESQUEMAS),
+                        help='Tabelas a carregar (padrão: todas)')
+    parser.add_argument('--db', default=CAMINHO_DB, help='Arquivo do banco (padrão: %(default)s)')
+    adicionar_argumentos_instrumentacao(parser)
+    args = parser.parse_args()
+    configurar_instrumentacao(args)
+
+    print(f"Carregando {', '.join(args.tabelas)} em '{args.db}'...")
+
+    with carga_em_massa(args.db) as con:
+        for tabela in args.tabelas:
+            with etapa(f"carga_{tabela}") as medida:
+                carregar_tabela(con, tabela, medida.chunks(ler_csv_em_chunks(ARQUIVOS_CSV[tabela])))
+        if 'transacoes' in args.tabelas:
+            with etapa('indices'):
+                criar_indices(con)
+
+    print("\n✅ Carga concluída.")
@@ -0,0 +1,115 @@
+import json
+import os
+import random
+
+# Checkpoint da geração de transações em um único processo.
+# Depois de cada chunk o arquivo é sincronizado em disco e um arquivo ao lado
+# ('<saída>.checkpoint.json') registra as linhas escritas, o tamanho do arquivo
+# em bytes, o próximo transacao_id e o estado dos geradores aleatórios (NumPy,
+# random e Faker). Na retomada o arquivo é cortado nesse tamanho e a geração
+# continua exatamente de onde parou.
+
+# --- CONFIGURAÇÃO ---
+VERSAO_CHECKPOINT = 1
+
+# --- FUNÇÕES ---
+
+def caminho_checkpoint(caminho_saida):
+    """Arquivo de checkpoint que acompanha o arquivo de saída."""
+    return f"{caminho_saida}.checkpoint.json"
+
+def estado_aleatorio(rng, fake):
+    """Estado atual dos geradores aleatórios, em formato JSON."""
+    versao, interno, gauss = random.getstate()
+    versao_fake, interno_fake, gauss_fake = fake.random.getstate()
+    return {
+        'numpy': rng.bit_generator.state,
+        'random': [versao, list(interno), gauss],
+        'faker': [versao_fake, list(interno_fake), gauss_fake],
+    }
+
+def restaurar_estado_aleatorio(estado, rng, fake):
+    """Devolve os geradores aleatórios ao estado salvo em estado_aleatorio()."""
+    rng.bit_generator.state = estado['numpy']
+    versao, interno, gauss = estado['random']
+    random.setstate((versao, tuple(interno), gauss))
+    versao, interno, gauss = estado['faker']
+    fake.random.setstate((versao, tuple(interno), gauss))
+
+def ler_checkpoint(caminho_saida):
+    """Checkpoint do arquivo de saída; None se não existir."""
+    caminho = caminho_checkpoint(caminho_saida)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, 'r', encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('versao') != VERSAO_CHECKPOINT:
+        raise ValueError(f"Checkpoint '{caminho}' de versão incompatível.")
+    return checkpoint
+
+def salvar_checkpoint(caminho_saida, checkpoint):
+    """Grava o checkpoint de forma atômica (nunca fica um JSON pela metade)."""
+    caminho = caminho_checkpoint(caminho_saida)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+def remover_checkpoint(caminho_saida):
+    """Apaga o checkpoint (geração concluída)."""
+    caminho = caminho_checkpoint(caminho_saida)
+    if os.path.exists(caminho):
+        os.remove(caminho)
+
+def validar_retomada(checkpoint, parametros):
+    """Confere que a retomada usa os mesmos parâmetros da execução interrompida."""
+    diferentes = [
+        f"{nome}: {checkpoint['parametros'].get(nome)!r} -> {valor!r}"
+        for nome, valor in parametros.items()
+        if checkpoint['parametros'].get(nome) != valor
+    ]
+    if diferentes:
+        raise ValueError("Parâmetros diferentes da execução interrompida (" + '; '.join(diferentes) + ")")
+
+class EscritorComCheckpoint:
+    """Escreve cada chunk, sincroniza o arquivo e registra o checkpoint.
+
+    Recebe (linhas, estado aleatório) de gravar_com_estado(): o estado é capturado
+    no produtor, então funciona também atrás do EscritorAssincrono (thread de escrita).
+    """
+
+    def __init__(self, escritor, parametros, linhas_escritas=0):
+        self.escritor = escritor
+        self.caminho = escritor.caminho
+        self.parametros = parametros
+        self.linhas_escritas = linhas_escritas
+
+    def escrever(self, item):
+        linhas, estado = item
+        self.escritor.escrever(linhas)
+        self.linhas_escritas += len(linhas)
+        salvar_checkpoint(self.caminho, {
+            'versao': VERSAO_CHECKPOINT,
+            'parametros': self.parametros,
+            'linhas_escritas': self.linhas_escritas,
+            'deslocamento': self.escritor.sincronizar(),
+            'proximo_id': self.linhas_escritas + 1,
+            'estado_aleatorio': estado,
+        })
+
+    def fechar(self):
+        self.escritor.fechar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+def gravar_com_estado(chunks, escritor, rng, fake):
+    """Entrega cada chunk ao escritor junto com o estado aleatório logo após gerá-lo; repassa o chunk."""
+    for chunk in chunks:
+        escritor.escrever((chunk, estado_aleatorio(rng, fake)))
+        yield chunk
@@ -0,0 +1,199 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+from caminhos import ARQUIVO_CLIENTES, ARQUIVO_CONTAS, ARQUIVO_CREDITO, DIRETORIO_CACHE
+from datas import parsear_datas
+from dominios import ESTADOS, OCUPACOES, STATUS_CREDITO, TIPOS_CONTA
+
+# Acesso compartilhado aos arquivos mestre (clientes.csv, CONTAS.csv e CREDITO.csv).
+# Cada arquivo é lido uma única vez para arrays compactos (ids inteiros, datas em
+# dias desde 1970-01-01, valores float64) e salvo como .npy em banco_fake/.cache.
+# As próximas leituras abrem os .npy com memory-map, sem reprocessar o CSV.
+# O cache é invalidado quando o mtime/tamanho do CSV muda e o hash também.
+
+# --- CONFIGURAÇÃO ---
+VERSAO_CACHE = 2
+CODIGOS_TIPO_CONTA = {tipo: codigo for codigo, tipo in enumerate(TIPOS_CONTA)}
+CODIGOS_OCUPACAO = {ocupacao: codigo for codigo, ocupacao in enumerate(OCUPACOES)}
+CODIGOS_ESTADO = {estado: codigo for codigo, estado in enumerate(ESTADOS)}
+CODIGOS_STATUS_CREDITO = {status: codigo for codigo, status in enumerate(STATUS_CREDITO)}
+
+# --- FUNÇÕES AUXILIARES ---
+
+def hash_arquivo(caminho):
+    """SHA-1 do arquivo, lido em blocos de 16 MB."""
+    sha1 = hashlib.sha1()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(16 * 1024 * 1024), b''):
+            sha1.update(bloco)
+    return sha1.hexdigest()
+
+# --- CACHE ---
+
+def carregar_com_cache(caminho_csv, nome, parser):
+    """Retorna {coluna: array} do cache (memory-map) ou processa o CSV com parser() e grava o cache."""
+    diretorio = os.path.join(DIRETORIO_CACHE, f"ref_{nome}")
+    caminho_meta = os.path.join(diretorio, 'meta.json')
+
+    estado = os.stat(caminho_csv)
+    meta = None
+    if os.path.exists(caminho_meta):
+        with open(caminho_meta, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+    if meta and meta['versao'] == VERSAO_CACHE:
+        valido = meta['mtime_ns'] == estado.st_mtime_ns and meta['tamanho'] == estado.st_size
+        if not valido and meta['tamanho'] == estado.st_size and meta['sha1'] == hash_arquivo(caminho_csv):
+            # Arquivo só foi "tocado": o conteúdo é o mesmo, basta atualizar o mtime
+            meta['mtime_ns'] = estado.st_mtime_ns
+            with open(caminho_meta, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            valido = True
+
+        if valido:
+            return {
+                coluna: np.load(os.path.join(diretorio, f"{coluna}.npy"), mmap_mode='r')
+                for coluna in meta['colunas']
+            }
+
+    print(f"Processando '{caminho_csv}' para o cache de referência...")
+    colunas = parser(caminho_csv)
+
+    # Grava num diretório temporário e troca de uma vez (nunca deixa cache pela metade)
+    temporario = f"{diretorio}.{os.getpid()}.tmp"
+    os.makedirs(temporario, exist_ok=True)
+    for coluna, valores in colunas.items():
+        np.save(os.path.join(temporario, f"{coluna}.npy"), valores)
+    with open(os.path.join(temporario, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'versao': VERSAO_CACHE,
+            'mtime_ns': estado.st_mtime_ns,
+            'tamanho': estado.st_size,
+            'sha1': hash_arquivo(caminho_csv),
+            'colunas': list(colunas),
+        }, f)
+    shutil.rmtree(diretorio, ignore_errors=True)
+    os.replace(temporario, diretorio)
+
+    return colunas
+
+# --- PARSERS DOS ARQUIVOS MESTRE ---
+
+def processar_clientes(caminho):
+    """clientes.csv -> cliente_id, data_nascimento (dias), renda, ocupacao e estado (códigos)."""
+    ids, nascimentos, rendas, ocupacoes, estados = [], [], [], [], []
+    with open(caminho, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)  # Pula o cabeçalho
+        for row in reader:
+            ids.append(int(row[0]))
+            nascimentos.append(row[2])
+            rendas.append(float(row[4]))
+            ocupacoes.append(CODIGOS_OCUPACAO[row[3]])
+            estados.append(CODIGOS_ESTADO[row[6]])
+    return {
+        'cliente_id': np.array(ids, dtype=np.int64),
+        'data_nascimento': parsear_datas(nascimentos),
+        'renda': np.array(rendas, dtype=np.float64),
+        'ocupacao': np.array(ocupacoes, dtype=np.int8),
+        'estado': np.array(estados, dtype=np.int8),
+    }
+
+def processar_contas(caminho):
+    """CONTAS.csv -> conta_id, cliente_id, tipo_conta (código), saldo, data_abertura (dias)."""
+    ids, clientes, tipos, saldos, aberturas = [], [], [], [], []
+    with open(caminho, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)  # Pula o cabeçalho
+        for row in reader:
+            ids.append(int(row[0]))
+            clientes.append(int(row[1]))
+            tipos.append(CODIGOS_TIPO_CONTA[row[2]])
+            saldos.append(float(row[3]))
+            aberturas.append(row[4])
+    return {
+        'conta_id': np.array(ids, dtype=np.int64),
+        'cliente_id': np.array(clientes, dtype=np.int64),
+        'tipo_conta': np.array(tipos, dtype=np.int8),
+        'saldo': np.array(saldos, dtype=np.float64),
+        'data_abertura': parsear_datas(aberturas),
+    }
+
+def processar_credito(caminho):
+    """CREDITO.csv -> credito_id, cliente_id, valor_emprestado, taxa_juros, status (código), data_aprovacao (dias)."""
+    ids, clientes, valores, taxas, status, aprovacoes = [], [], [], [], [], []
+    with open(caminho, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)  # Pula o cabeçalho
+        for row in reader:
+            ids.append(int(row[0]))
+            clientes.append(int(row[1]))
+            valores.append(float(row[2]))
+            taxas.append(float(row[3]))
+            status.append(CODIGOS_STATUS_CREDITO[row[4]])
+            aprovacoes.append(row[5])
+    return {
+        'credito_id': np.array(ids, dtype=np.int64),
+        'cliente_id': np.array(clientes, dtype=np.int64),
+        'valor_emprestado': np.array(valores, dtype=np.float64),
+        'taxa_juros': np.array(taxas, dtype=np.float64),
+        'status': np.array(status, dtype=np.int8),
+        'data_aprovacao': parsear_datas(aprovacoes),
+    }
+
+# --- API PÚBLICA ---
+
+def carregar_clientes(caminho=ARQUIVO_CLIENTES):
+    """Clientes como arrays; None se o arquivo não existir."""
+    try:
+        clientes = carregar_com_cache(caminho, 'clientes', processar_clientes)
+    except FileNotFoundError:
+        print(f"ERRO: Arquivo de clientes não encontrado em '{caminho}'.")
+        return None
+    print(f"Lidos {len(clientes['cliente_id'])} clientes.")
+    return clientes
+
+def carregar_contas(caminho=ARQUIVO_CONTAS):
+    """Contas como arrays; None se o arquivo não existir."""
+    try:
+        contas = carregar_com_cache(caminho, 'contas', processar_contas)
+    except FileNotFoundError:
+        print(f"ERRO: Arquivo de contas não encontrado em '{caminho}'.")
+        return None
+    print(f"Lidas {len(contas['conta_id'])} contas ativas.")
+    return contas
+
+def carregar_credito(caminho=ARQUIVO_CREDITO):
+    """Operações de crédito como arrays; None se o arquivo não existir."""
+    try:
+        credito = carregar_com_cache(caminho, 'credito', processar_credito)
+    except FileNotFoundError:
+        print(f"ERRO: Arquivo de crédito não encontrado em '{caminho}'.")
+        return None
+    print(f"Lidas {len(credito['credito_id'])} operações de crédito.")
+    return credito
+
+def fatiar_referencia(referencia, tamanho_lote, primeira=0):
+    """Divide uma referência colunar em fatias de até tamanho_lote linhas (views, sem cópia).
+
+    primeira: linhas puladas no começo (ex.: já gravadas numa execução anterior).
+    """
+    total = len(next(iter(referencia.values())))
+    for inicio in range(primeira, total, tamanho_lote):
+        yield {coluna: valores[inicio:inicio + tamanho_lote] for coluna, valores in referencia.items()}
+
+def concatenar_referencias(referencias):
+    """Junta várias referências colunares (ex.: lotes de contas) numa só."""
+    referencias = list(referencias)
+    return {
+        coluna: np.concatenate([referencia[coluna] for referencia in referencias])
+        for coluna in referencias[0]
+    }
+
+def juntar_lotes(lotes):
+    """Junta vários lotes (linhas, referência) num só: as linhas em ordem e as referências concatenadas."""
+    lotes = list(lotes)
+    return [linha for linhas, _ in lotes for linha in linhas], concatenar_referencias(ref for _, ref in lotes)
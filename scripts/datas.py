@@ -0,0 +1,123 @@
+import calendar
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+import numpy as np
+
+# Formatação e leitura rápidas de datas e timestamps.
+# Datas circulam como inteiros (dias ou segundos desde 1970-01-01) e viram texto
+# só na saída, por consulta a tabelas pré-calculadas: dia -> 'YYYY-MM-DD' e
+# segundo do dia -> ' HH:MM:SS'. A leitura faz o caminho inverso com dicionários.
+# Assim nenhum gerador ou leitor chama strftime/strptime por linha.
+
+# --- CONFIGURAÇÃO ---
+EPOCA = datetime(1970, 1, 1)
+ORDINAL_EPOCA = date(1970, 1, 1).toordinal()
+SEGUNDOS_DIA = 86400
+
+# Faixa coberta pelas tabelas (fora dela, as funções caem no caminho lento do NumPy/datetime)
+DIA_MINIMO = date(1900, 1, 1).toordinal() - ORDINAL_EPOCA
+DIA_MAXIMO = date(2100, 12, 31).toordinal() - ORDINAL_EPOCA
+
+# Data de referência (--as-of): o "hoje" de todas as janelas de datas; None = relógio
+DATA_REFERENCIA = None
+
+def configurar_data_referencia(dia):
+    """Fixa o "hoje" dos geradores numa data (None volta ao relógio)."""
+    global DATA_REFERENCIA
+    DATA_REFERENCIA = dia
+
+def momento_referencia():
+    """Meia-noite da data de referência, ou o instante atual se não houver uma."""
+    if DATA_REFERENCIA is not None:
+        return datetime.combine(DATA_REFERENCIA, datetime.min.time())
+    return datetime.now()
+
+# --- TABELAS ---
+
+@lru_cache(maxsize=1)
+def tabela_dias():
+    """'YYYY-MM-DD' de cada dia da faixa (índice = dias - DIA_MINIMO)."""
+    dias = np.arange(DIA_MINIMO, DIA_MAXIMO + 1).astype('datetime64[D]')
+    return np.datetime_as_string(dias).astype(object)
+
+@lru_cache(maxsize=1)
+def tabela_horas():
+    """' HH:MM:SS' de cada segundo do dia (com o espaço que separa a data)."""
+    return np.array([
+        f" {h:02d}:{m:02d}:{s:02d}" for h in range(24) for m in range(60) for s in range(60)
+    ], dtype=object)
+
+@lru_cache(maxsize=1)
+def indice_dias():
+    """{'YYYY-MM-DD': dias} da faixa coberta."""
+    return {texto: dia for dia, texto in enumerate(tabela_dias().tolist(), DIA_MINIMO)}
+
+@lru_cache(maxsize=1)
+def indice_horas():
+    """{'HH:MM:SS': segundo do dia}."""
+    return {texto[1:]: segundo for segundo, texto in enumerate(tabela_horas().tolist())}
+
+# --- CONVERSÕES ESCALARES ---
+
+def hoje_em_dias(agora=None):
+    """Dia de hoje (da data de referência, ou de agora) em dias desde 1970-01-01."""
+    return ((agora or momento_referencia()) - EPOCA).days
+
+def datetime_para_segundos(momento):
+    """datetime (sem fuso) -> segundos desde 1970-01-01."""
+    return calendar.timegm(momento.timetuple())
+
+def dias_para_datetime(dias):
+    """Dias desde 1970-01-01 -> datetime (meia-noite)."""
+    return EPOCA + timedelta(days=int(dias))
+
+def data_para_dias(texto):
+    """'YYYY-MM-DD' -> dias desde 1970-01-01."""
+    dia = indice_dias().get(texto)
+    if dia is None:
+        return date.fromisoformat(texto).toordinal() - ORDINAL_EPOCA
+    return dia
+
+def formatar_data(dias):
+    """Dias desde 1970-01-01 -> 'YYYY-MM-DD'."""
+    if DIA_MINIMO <= dias <= DIA_MAXIMO:
+        return tabela_dias()[dias - DIA_MINIMO]
+    return date.fromordinal(dias + ORDINAL_EPOCA).isoformat()
+
+def formatar_data_hora(segundos):
+    """Segundos desde 1970-01-01 -> 'YYYY-MM-DD HH:MM:SS'."""
+    dias, resto = divmod(segundos, SEGUNDOS_DIA)
+    return formatar_data(dias) + tabela_horas()[resto]
+
+# --- CONVERSÕES EM LOTE ---
+
+def formatar_datas(dias):
+    """Array de dias -> array (object) de 'YYYY-MM-DD'."""
+    dias = np.asarray(dias, dtype=np.int64)
+    if len(dias) and (dias.min() < DIA_MINIMO or dias.max() > DIA_MAXIMO):
+        return np.datetime_as_string(dias.astype('datetime64[D]')).astype(object)
+    return tabela_dias()[dias - DIA_MINIMO]
+
+def formatar_datas_hora(segundos):
+    """Array de segundos -> array (object) de 'YYYY-MM-DD HH:MM:SS'."""
+    dias, resto = np.divmod(np.asarray(segundos, dtype=np.int64), SEGUNDOS_DIA)
+    return formatar_datas(dias) + tabela_horas()[resto]
+
+def parsear_datas(textos):
+    """Sequência de 'YYYY-MM-DD' -> array int32 de dias."""
+    indice = indice_dias()
+    try:
+        return np.fromiter((indice[texto] for texto in textos), dtype=np.int32, count=len(textos))
+    except KeyError:
+        return np.array(textos, dtype='datetime64[D]').astype(np.int32)
+
+def parsear_datas_hora(textos):
+    """Sequência de 'YYYY-MM-DD HH:MM:SS' -> array int64 de segundos."""
+    dias, horas = indice_dias(), indice_horas()
+    try:
+        return np.fromiter(
+            (dias[texto[:10]] * SEGUNDOS_DIA + horas[texto[11:]] for texto in textos),
+            dtype=np.int64, count=len(textos)
+        )
+    except KeyError:
+        return np.array([texto.replace(' ', 'T') for texto in textos], dtype='datetime64[s]').astype(np.int64)
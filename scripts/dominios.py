@@ -0,0 +1,22 @@
+import numpy as np
+
+# Domínios das colunas categóricas, compartilhados por geradores, escritores e cache.
+# A ordem importa: o índice na lista é o código usado nos arrays e nos dicionários Arrow.
+
+# Definições de Domínios para Renda e Ocupação (para simular realidade)
+OCUPACOES = [
+    'CLT', 'Autônomo', 'Funcionário Público', 
+    'Empresário', 'Estudante', 'Aposentado'
+]
+TIPOS_CONTA = ['Corrente', 'Poupança', 'Investimento', 'Empresarial']
+STATUS_CREDITO = ['Aprovado', 'Negado', 'Inadimplente', 'Pago']
+TIPOS_TRANSACAO = ['Depósito', 'Saque', 'TED', 'Pix', 'Compra Débito']
+CODIGOS_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS_TRANSACAO)}
+# Sinal de cada tipo no saldo: Depósito soma; Saque, TED, Pix e Compra Débito subtraem
+SINAIS = {tipo: (1.0 if tipo == 'Depósito' else -1.0) for tipo in TIPOS_TRANSACAO}
+SINAL_POR_CODIGO = np.array([SINAIS[tipo] for tipo in TIPOS_TRANSACAO])
+ESTADOS = [
+    'AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA',
+    'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO',
+]
+ESTABELECIMENTOS = ['Supermercado X', 'Farmácia Y', 'Posto Z', 'Loja de Roupas D', 'Restaurante F']
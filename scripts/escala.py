@@ -0,0 +1,124 @@
+import argparse
+
+# Fator de escala (SF) no estilo TPC: um único número dimensiona todas as tabelas.
+# SF=1 é o volume padrão do projeto (12 mil clientes, 10 milhões de transações);
+# clientes e transações crescem linearmente com o SF, contas e crédito saem das
+# regras dos geradores (médias por cliente usadas só nas estimativas do plano).
+# Os tamanhos de lote/chunk têm um teto pela memória disponível: numa máquina com
+# pouca RAM os chunks encolhem, nunca crescem além do padrão. A saída semeada não
+# depende deles: a seed vale por segmento fixo de linhas (ver reprodutibilidade.py).
+
+# --- CONFIGURAÇÃO ---
+CLIENTES_POR_SF = 12_000
+TRANSACOES_POR_SF = 10_000_000
+MINIMO_CLIENTES = 100          # Piso para SFs muito pequenos (o crédito precisa de clientes adultos)
+SF_PADRAO = 1.0
+ESCALAS_NOMEADAS = {
+    'small': 0.0001,           # 100 clientes e 1.000 transações: o antigo teste_gerar_transacoes.py
+}
+
+# Médias dos geradores: random.choice([1, 1, 1, 2, 2, 3]) contas e ~79% dos clientes com crédito
+CONTAS_POR_CLIENTE = 5 / 3
+CREDITOS_POR_CLIENTE = 0.79
+
+# Bytes por linha (lista de tuplas em memória, medido com tracemalloc; CSV no disco)
+BYTES_MEMORIA_LINHA = 450
+BYTES_CSV_TRANSACAO = 61
+BYTES_CSV_CLIENTE = 84
+VAZAO_TRANSACOES = 200_000     # Linhas/seg de referência no modo vetorizado gravando CSV (1 CPU)
+
+# Teto dos chunks: FRACAO_MEMORIA da RAM disponível dividida pelos chunks vivos ao mesmo tempo
+FRACAO_MEMORIA = 0.25
+CHUNKS_EM_MEMORIA = 4          # Gerado + convertido + fila do escritor assíncrono (2)
+MINIMO_CHUNK = 1_000
+
+# --- FATOR DE ESCALA ---
+
+def ler_sf(texto):
+    """Tipo do argparse para --sf: número positivo ou nome de ESCALAS_NOMEADAS."""
+    if texto in ESCALAS_NOMEADAS:
+        return ESCALAS_NOMEADAS[texto]
+    try:
+        sf = float(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"SF inválido: '{texto}' (use um número ou {', '.join(ESCALAS_NOMEADAS)})") from None
+    if sf <= 0:
+        raise argparse.ArgumentTypeError('SF precisa ser maior que zero')
+    return sf
+
+def adicionar_argumento_sf(parser):
+    """Acrescenta --sf ao parser do script."""
+    nomes = ', '.join(f"{nome}={sf:g}" for nome, sf in ESCALAS_NOMEADAS.items())
+    parser.add_argument('--sf', type=ler_sf, default=SF_PADRAO,
+                        help=f"Fator de escala: SF=1 são {CLIENTES_POR_SF:,} clientes e "
+                             f"{TRANSACOES_POR_SF:,} transações ({nomes}; padrão: %(default)s)")
+
+def num_clientes(sf):
+    return max(MINIMO_CLIENTES, round(CLIENTES_POR_SF * sf))
+
+def num_transacoes(sf):
+    return max(1, round(TRANSACOES_POR_SF * sf))
+
+def dimensionar(sf):
+    """Contagens do SF: clientes e transações exatos, contas e crédito estimados."""
+    clientes = num_clientes(sf)
+    return {
+        'clientes': clientes,
+        'contas': round(clientes * CONTAS_POR_CLIENTE),
+        'credito': round(clientes * CREDITOS_POR_CLIENTE),
+        'transacoes': num_transacoes(sf),
+    }
+
+# --- MEMÓRIA ---
+
+def memoria_disponivel():
+    """MemAvailable do sistema em bytes (None fora do Linux)."""
+    try:
+        with open('/proc/meminfo') as f:
+            for linha in f:
+                if linha.startswith('MemAvailable:'):
+                    return int(linha.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def tamanho_adaptado(padrao, total=None, bytes_por_linha=BYTES_MEMORIA_LINHA):
+    """Chunk/lote limitado pela memória disponível (nunca acima do padrão nem do total)."""
+    tamanho = padrao
+    disponivel = memoria_disponivel()
+    if disponivel is not None:
+        teto = int(disponivel * FRACAO_MEMORIA / CHUNKS_EM_MEMORIA / bytes_por_linha)
+        tamanho = min(tamanho, max(MINIMO_CHUNK, teto))
+    if total is not None:
+        tamanho = min(tamanho, max(1, total))
+    return tamanho
+
+# --- PLANO ---
+
+def plano(sf, chunk_padrao=100_000):
+    """Imprime as contagens, o chunk adaptado e as estimativas de disco e tempo do SF."""
+    contagens = dimensionar(sf)
+    chunk = tamanho_adaptado(chunk_padrao, contagens['transacoes'])
+    disponivel = memoria_disponivel()
+
+    print(f"SF={sf:g}")
+    print(f" -> Clientes:   {contagens['clientes']:>15,}")
+    print(f" -> Contas:     {contagens['contas']:>15,} (estimado)")
+    print(f" -> Crédito:    {contagens['credito']:>15,} (estimado)")
+    print(f" -> Transações: {contagens['transacoes']:>15,}")
+    if disponivel is not None:
+        print(f" -> Chunk de transações: {chunk:,} linhas "
+              f"(~{chunk * BYTES_MEMORIA_LINHA * CHUNKS_EM_MEMORIA / 1024 ** 2:,.0f} MB em voo; "
+              f"RAM disponível {disponivel / 1024 ** 3:.1f} GB)")
+    disco = contagens['transacoes'] * BYTES_CSV_TRANSACAO + contagens['clientes'] * BYTES_CSV_CLIENTE
+    print(f" -> CSVs: ~{disco / 1024 ** 3:,.2f} GB")
+    segundos = contagens['transacoes'] / VAZAO_TRANSACOES
+    tempo = f"{segundos / 60:,.1f} min" if segundos >= 120 else f"{segundos:.1f}s"
+    print(f" -> Tempo das transações: ~{tempo} (1 processo; divida por --workers)")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mostra as contagens e estimativas de um fator de escala.')
+    parser.add_argument('sf', type=ler_sf, nargs='*', default=[SF_PADRAO], help='Fatores de escala (padrão: 1)')
+    for sf in parser.parse_args().sf:
+        plano(sf)
@@ -0,0 +1,117 @@
+import queue
+import threading
+import time
+
+# Escrita de arquivos em segundo plano: o gerador entrega o chunk e segue
+# trabalhando enquanto uma thread dedicada serializa e grava no disco.
+# Com a fila limitada, o produtor preenche o chunk N+1 enquanto o N é gravado.
+# Os escritores medem o tempo de escrita e o tempo em que o produtor ficou
+# esperando o disco (espera de I/O), para separar geração de gravação.
+
+# --- CONFIGURAÇÃO ---
+CHUNKS_PENDENTES = 2   # Chunks na fila antes do produtor esperar (limita a RAM)
+
+_FIM = object()
+
+# --- ESCRITOR ---
+
+class EscritorAssincrono:
+    """Envolve qualquer escritor de escritores.py e grava seus chunks numa thread separada."""
+
+    def __init__(self, escritor, chunks_pendentes=CHUNKS_PENDENTES):
+        self.escritor = escritor
+        self.caminho = escritor.caminho
+        self.fila = queue.Queue(maxsize=chunks_pendentes)
+        self.erro = None
+        self.tempo_escrita = 0.0   # Tempo da thread gravando (sobreposto à geração)
+        self.tempo_espera = 0.0    # Tempo do produtor bloqueado esperando a fila/thread
+        self.thread = threading.Thread(target=self._gravar, name=f"escrita:{self.caminho}", daemon=True)
+        self.thread.start()
+
+    def _gravar(self):
+        while True:
+            linhas = self.fila.get()
+            if linhas is _FIM:
+                break
+            if self.erro is None:
+                inicio = time.perf_counter()
+                try:
+                    self.escritor.escrever(linhas)
+                except Exception as e:
+                    # Guarda o erro e continua esvaziando a fila para o produtor não travar
+                    self.erro = e
+                self.tempo_escrita += time.perf_counter() - inicio
+
+    def escrever(self, linhas):
+        if self.erro is not None:
+            raise self.erro
+        inicio = time.perf_counter()
+        self.fila.put(linhas)
+        self.tempo_espera += time.perf_counter() - inicio
+
+    def fechar(self):
+        """Espera a fila esvaziar, fecha o arquivo e repassa qualquer erro da thread."""
+        inicio = time.perf_counter()
+        self.fila.put(_FIM)
+        self.thread.join()
+        self.escritor.fechar()
+        self.tempo_espera += time.perf_counter() - inicio
+        if self.erro is not None:
+            raise self.erro
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+class EscritorCronometrado:
+    """Versão síncrona com as mesmas medidas: toda a escrita é espera do produtor."""
+
+    def __init__(self, escritor):
+        self.escritor = escritor
+        self.caminho = escritor.caminho
+        self.tempo_escrita = 0.0
+        self.tempo_espera = 0.0
+
+    def escrever(self, linhas):
+        inicio = time.perf_counter()
+        self.escritor.escrever(linhas)
+        self.tempo_escrita += time.perf_counter() - inicio
+        self.tempo_espera += time.perf_counter() - inicio
+
+    def fechar(self):
+        inicio = time.perf_counter()
+        self.escritor.fechar()
+        self.tempo_espera += time.perf_counter() - inicio
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+# --- MEDIÇÃO ---
+
+def cronometrar_chunks(chunks, tempos, chave='geracao'):
+    """Repassa os chunks somando em tempos[chave] o tempo gasto para produzir cada um."""
+    tempos.setdefault(chave, 0.0)
+    iterador = iter(chunks)
+    while True:
+        inicio = time.perf_counter()
+        try:
+            chunk = next(iterador)
+        except StopIteration:
+            return
+        finally:
+            tempos[chave] += time.perf_counter() - inicio
+        yield chunk
+
+def relatorio_io(tempos, escritor, total_segundos):
+    """Imprime geração vs. espera de I/O (e a escrita em segundo plano, se houver)."""
+    print("\n--- GERAÇÃO vs. I/O ---")
+    print(f" -> Geração:               {tempos.get('geracao', 0.0):>8.2f}s")
+    print(f" -> Espera de I/O:         {escritor.tempo_espera:>8.2f}s")
+    if isinstance(escritor, EscritorAssincrono):
+        print(f" -> Escrita (em paralelo): {escritor.tempo_escrita:>8.2f}s")
+    print(f" -> Total:                 {total_segundos:>8.2f}s")
@@ -0,0 +1,231 @@
+import csv
+import gzip
+import io
+import os
+from dominios import OCUPACOES, TIPOS_CONTA, STATUS_CREDITO, TIPOS_TRANSACAO
+
+# Camada de escrita plugável: CSV, Parquet ou Arrow IPC, escolhida por execução.
+# Todos os escritores recebem os mesmos chunks de linhas (listas/tuplas na ordem
+# do cabeçalho). Parquet e Arrow gravam cada chunk como um row group/record batch
+# com tipos reais: ids inteiros, valores float64, datas, timestamps e colunas
+# categóricas dicionarizadas.
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# zstd: compression.zstd (Python 3.14+) ou o pacote zstandard, se instalado
+try:
+    from compression import zstd
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+# --- CONFIGURAÇÃO ---
+FORMATOS = ['csv', 'parquet', 'arrow']
+EXTENSOES = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+# Compressão na hora (só CSV; Parquet já sai comprimido em zstd)
+COMPRESSOES = ['gzip', 'zstd']
+EXTENSOES_COMPRESSAO = {'gzip': '.gz', 'zstd': '.zst'}
+NIVEL_GZIP = 6
+NIVEL_ZSTD = 3
+TAMANHO_BUFFER = 8 * 1024 * 1024   # Buffer grande: menos chamadas de sistema por chunk
+
+# Domínios fixos das colunas dicionarizadas (o mesmo dicionário em todos os chunks)
+DOMINIOS = {
+    'ocupacao': OCUPACOES,
+    'tipo_conta': TIPOS_CONTA,
+    'status': STATUS_CREDITO,
+    'tipo': TIPOS_TRANSACAO,
+}
+
+# Colunas (nome, tipo lógico) de cada tabela, na ordem dos CSVs
+ESQUEMAS = {
+    'clientes': [
+        ('cliente_id', 'int'), ('nome_completo', 'texto'), ('data_nascimento', 'data'),
+        ('ocupacao', 'categoria'), ('renda_mensal', 'valor'), ('cidade', 'texto'),
+        ('estado', 'texto'), ('cpf', 'texto'),
+    ],
+    'contas': [
+        ('conta_id', 'int'), ('cliente_id', 'int'), ('tipo_conta', 'categoria'),
+        ('saldo_atual', 'valor'), ('data_abertura', 'data'),
+    ],
+    'credito': [
+        ('credito_id', 'int'), ('cliente_id', 'int'), ('valor_emprestado', 'valor'),
+        ('taxa_juros', 'valor'), ('status', 'categoria'), ('data_aprovacao', 'data'),
+    ],
+    'transacoes': [
+        ('transacao_id', 'int'), ('conta_id', 'int'), ('tipo', 'categoria'),
+        ('valor', 'valor'), ('data_hora', 'timestamp'), ('destino', 'texto'),
+    ],
+}
+
+# --- ARQUIVOS DE TEXTO ---
+
+def abrir_texto_comprimido(caminho, compressao, tamanho_buffer=TAMANHO_BUFFER):
+    """Abre um arquivo de texto para escrita comprimida em gzip ou zstd, com buffer grande."""
+    if compressao == 'gzip':
+        binario = gzip.GzipFile(caminho, 'wb', compresslevel=NIVEL_GZIP)
+    elif zstd is None:
+        raise RuntimeError("A compressão zstd requer Python 3.14+ ou o pacote zstandard (pip install zstandard).")
+    elif hasattr(zstd, 'ZstdFile'):
+        binario = zstd.ZstdFile(caminho, 'wb', level=NIVEL_ZSTD)
+    else:
+        binario = zstd.open(caminho, 'wb', cctx=zstd.ZstdCompressor(level=NIVEL_ZSTD))
+    return io.TextIOWrapper(io.BufferedWriter(binario, tamanho_buffer), encoding='utf-8', newline='')
+
+# --- ESCRITORES ---
+
+class EscritorCSV:
+    """Escreve os chunks com csv.writer, com o cabeçalho na primeira linha.
+
+    Com deslocamento, retoma um arquivo existente: corta tudo depois do byte
+    deslocamento (o último ponto bom) e continua escrevendo dali, sem cabeçalho.
+    Com compressao ('gzip' ou 'zstd'), comprime na hora (sem retomada).
+    tamanho_buffer menor serve para manter muitos arquivos abertos ao mesmo tempo.
+    """
+
+    def __init__(self, caminho, tabela, deslocamento=None, compressao=None, tamanho_buffer=TAMANHO_BUFFER):
+        self.caminho = caminho
+        if compressao is not None:
+            self.file = abrir_texto_comprimido(caminho, compressao, tamanho_buffer)
+        elif deslocamento is None:
+            self.file = open(caminho, 'w', newline='', encoding='utf-8', buffering=tamanho_buffer)
+        else:
+            with open(caminho, 'r+b') as f:
+                f.truncate(deslocamento)
+            self.file = open(caminho, 'a', newline='', encoding='utf-8', buffering=tamanho_buffer)
+
+        self.writer = csv.writer(self.file)
+        if deslocamento is None:
+            self.writer.writerow([nome for nome, _ in ESQUEMAS[tabela]])
+
+    def escrever(self, linhas):
+        self.writer.writerows(linhas)
+
+    def sincronizar(self):
+        """Garante em disco tudo o que foi escrito; retorna o tamanho do arquivo em bytes."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def fechar(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+class EscritorArrowBase:
+    """Converte chunks de linhas em tabelas Arrow tipadas; subclasses decidem o arquivo."""
+
+    def __init__(self, caminho, tabela):
+        if pa is None:
+            raise RuntimeError(f"O formato de '{caminho}' requer pyarrow (pip install pyarrow).")
+        self.caminho = caminho
+        self.colunas = ESQUEMAS[tabela]
+        self.dicionarios = {nome: pa.array(DOMINIOS[nome]) for nome, tipo in self.colunas if tipo == 'categoria'}
+        self.schema = pa.schema([(nome, self.tipo_arrow(nome, tipo)) for nome, tipo in self.colunas])
+
+    def tipo_arrow(self, nome, tipo):
+        if tipo == 'int':
+            return pa.int64()
+        if tipo == 'valor':
+            return pa.float64()
+        if tipo == 'data':
+            return pa.date32()
+        if tipo == 'timestamp':
+            return pa.timestamp('s')
+        if tipo == 'categoria':
+            return pa.dictionary(pa.int8(), pa.string())
+        return pa.string()
+
+    def converter_coluna(self, nome, tipo, valores):
+        if tipo in ('data', 'timestamp'):
+            return pa.array(valores, pa.string()).cast(self.tipo_arrow(nome, tipo))
+        if tipo == 'categoria':
+            dicionario = self.dicionarios[nome]
+            indices = pc.index_in(pa.array(valores, pa.string()), value_set=dicionario).cast(pa.int8())
+            return pa.DictionaryArray.from_arrays(indices, dicionario)
+        return pa.array(valores, self.tipo_arrow(nome, tipo))
+
+    def para_tabela(self, linhas):
+        """Transpõe o chunk (linhas -> colunas) e monta a tabela Arrow."""
+        colunas = list(zip(*linhas)) if linhas else [()] * len(self.colunas)
+        arrays = [
+            self.converter_coluna(nome, tipo, list(valores))
+            for (nome, tipo), valores in zip(self.colunas, colunas)
+        ]
+        return pa.Table.from_arrays(arrays, schema=self.schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+class EscritorParquet(EscritorArrowBase):
+    """Parquet com um row group por chunk (alinhado ao CHUNK_SIZE do gerador)."""
+
+    def __init__(self, caminho, tabela):
+        super().__init__(caminho, tabela)
+        self.writer = pq.ParquetWriter(caminho, self.schema, compression='zstd')
+
+    def escrever(self, linhas):
+        tabela = self.para_tabela(linhas)
+        self.writer.write_table(tabela, row_group_size=max(1, tabela.num_rows))
+
+    def fechar(self):
+        self.writer.close()
+
+class EscritorArrow(EscritorArrowBase):
+    """Arrow IPC (formato de arquivo), um record batch por chunk."""
+
+    def __init__(self, caminho, tabela):
+        super().__init__(caminho, tabela)
+        self.sink = pa.OSFile(caminho, 'wb')
+        self.writer = pa.ipc.new_file(self.sink, self.schema)
+
+    def escrever(self, linhas):
+        self.writer.write_table(self.para_tabela(linhas))
+
+    def fechar(self):
+        self.writer.close()
+        self.sink.close()
+
+ESCRITORES = {'csv': EscritorCSV, 'parquet': EscritorParquet, 'arrow': EscritorArrow}
+
+# --- FUNÇÕES ---
+
+def caminho_com_formato(caminho, formato, compressao=None):
+    """Troca a extensão do arquivo de saída pela do formato (e da compressão, se houver)."""
+    base, extensao = os.path.splitext(caminho)
+    if extensao in EXTENSOES_COMPRESSAO.values():
+        base = os.path.splitext(base)[0]
+    caminho = base + EXTENSOES[formato]
+    if compressao is not None:
+        caminho += EXTENSOES_COMPRESSAO[compressao]
+    return caminho
+
+def abrir_escritor(formato, caminho, tabela, compressao=None):
+    """Abre o escritor do formato para a tabela (o caminho recebe a extensão do formato)."""
+    if compressao is None:
+        return ESCRITORES[formato](caminho_com_formato(caminho, formato), tabela)
+    if formato != 'csv':
+        raise ValueError(f"A compressão '{compressao}' só vale para CSV.")
+    return EscritorCSV(caminho_com_formato(caminho, formato, compressao), tabela, compressao=compressao)
+
+def gravar_chunks(chunks, escritor):
+    """Escreve cada chunk no arquivo de saída e o repassa adiante (ex.: para a carga no SQLite)."""
+    for chunk in chunks:
+        escritor.escrever(chunk)
+        yield chunk
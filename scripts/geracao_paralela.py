@@ -0,0 +1,110 @@
+import csv
+import os
+import random
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import motor_transacoes
+from motor_transacoes import Segmentos, gerar_transacao, preparar_contas, chunk_para_linhas
+from registros import TabelaContas
+
+# Geração de transações em shards, um processo por shard.
+# Cada shard recebe uma faixa contígua de transacao_id e uma semente própria
+# derivada de (seed, índice do shard), então o resultado para um mesmo par
+# (seed, workers) é sempre o mesmo arquivo, byte a byte (o sorteio vetorizado é
+# feito em segmentos fixos, então o chunk adaptado à RAM não muda o resultado).
+
+# --- FUNÇÕES ---
+
+def dividir_em_shards(num_transacoes, workers):
+    """Divide 1..num_transacoes em faixas contíguas [(primeiro_id, quantidade), ...]."""
+    base, resto = divmod(num_transacoes, workers)
+    shards = []
+    primeiro_id = 1
+    for k in range(workers):
+        quantidade = base + (1 if k < resto else 0)
+        if quantidade:
+            shards.append((primeiro_id, quantidade))
+        primeiro_id += quantidade
+    return shards
+
+def semear_shard(seed, indice):
+    """Semeia random, Faker e NumPy do processo atual para o shard; retorna o Generator NumPy."""
+    semente = np.random.SeedSequence([seed, indice])
+    semente_int = int(semente.generate_state(1)[0])
+
+    random.seed(semente_int)
+    motor_transacoes.fake.seed_instance(semente_int)
+    return np.random.default_rng(semente)
+
+def gerar_shard(tarefa):
+    """Gera um shard inteiro num arquivo parcial; executado dentro do pool de processos."""
+    (indice, primeiro_id, quantidade, caminho_parte, contas_ref, data_maxima,
+     chunk_size, seed, modo, pool_nomes, modelo) = tarefa
+
+    rng = semear_shard(seed, indice)
+    if pool_nomes is not None:
+        # O pool vem do cache em disco, então cada worker só o lê
+        motor_transacoes.configurar_pool_destinos(*pool_nomes)
+    if modo == 'vetorizado':
+        contas = preparar_contas(contas_ref, data_maxima, modelo)
+        segmentos = Segmentos(contas, quantidade, rng, semear=False)
+    else:
+        contas = TabelaContas(contas_ref)
+
+    with open(caminho_parte, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+
+        escritos = 0
+        while escritos < quantidade:
+            n = min(chunk_size, quantidade - escritos)
+            transacao_id = primeiro_id + escritos
+
+            if modo == 'vetorizado':
+                colunas = segmentos.proximas(n)
+                writer.writerows(chunk_para_linhas(colunas, transacao_id))
+            else:
+                dados_chunk = []
+                for i in range(n):
+                    conta = contas.em(random.randrange(len(contas)))
+                    linha = gerar_transacao(conta.conta_id, conta.abertura, data_maxima)
+                    dados_chunk.append([transacao_id + i] + linha)
+                writer.writerows(dados_chunk)
+
+            escritos += n
+
+    return indice, quantidade
+
+def gerar_em_shards(caminho_saida, cabecalho, contas_ref, num_transacoes, chunk_size,
+                    workers, seed, data_maxima, modo='vetorizado', pool_nomes=None, modelo=None):
+    """Gera num_transacoes em paralelo e concatena as partes, em ordem, em caminho_saida.
+
+    pool_nomes, se informado, é (tamanho, expoente_zipf) repassado a configurar_pool_destinos().
+    modelo são os parâmetros do modelo de carga (só no modo vetorizado; None = uniforme).
+    """
+    shards = dividir_em_shards(num_transacoes, workers)
+    partes = [f"{caminho_saida}.part{k:03d}" for k in range(len(shards))]
+
+    tarefas = [
+        (k, primeiro_id, quantidade, partes[k], contas_ref, data_maxima, chunk_size, seed, modo, pool_nomes, modelo)
+        for k, (primeiro_id, quantidade) in enumerate(shards)
+    ]
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            concluidas = 0
+            for indice, quantidade in pool.map(gerar_shard, tarefas):
+                concluidas += quantidade
+                print(f" -> Shard {indice + 1}/{len(shards)} pronto "
+                      f"({concluidas / num_transacoes * 100:.1f}%)")
+
+        # Merge: cabeçalho + partes na ordem dos shards (transacao_id contíguo)
+        with open(caminho_saida, 'w', newline='', encoding='utf-8') as file:
+            csv.writer(file).writerow(cabecalho)
+            for caminho_parte in partes:
+                with open(caminho_parte, 'r', newline='', encoding='utf-8') as parte:
+                    shutil.copyfileobj(parte, file, 16 * 1024 * 1024)
+    finally:
+        for caminho_parte in partes:
+            if os.path.exists(caminho_parte):
+                os.remove(caminho_parte)
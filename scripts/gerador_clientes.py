@@ -0,0 +1,104 @@
+import random
+import numpy as np
+from faker import Faker
+from datas import formatar_data, hoje_em_dias
+from dominios import ESTADOS, OCUPACOES
+from dados_referencia import juntar_lotes
+from reprodutibilidade import CLIENTES_POR_SEGMENTO, semear_lote
+
+# --- CONFIGURAÇÃO ---
+LOCALE = 'pt_BR'
+
+# Inicializa o Faker
+fake = Faker(LOCALE)
+
+# --- FUNÇÕES ---
+
+# Definir a data mínima e máxima de nascimento (18 a 75 anos)
+def gerar_data_nascimento(hoje_dias):
+    """Sorteia o nascimento (dias desde 1970-01-01) de forma uniforme entre 75 e 18 anos atrás."""
+    return random.randint(hoje_dias - 365 * 75, hoje_dias - 365 * 18)
+
+# Definir a faixa de renda com alguma variação
+def gerar_renda():
+    # Renda base simulando 2k a 8k, com desvio padrão
+    return round(random.gauss(5000, 3000), 2)
+
+def gerar_lote_clientes(primeiro_id, quantidade):
+    """Gera os clientes primeiro_id..primeiro_id+quantidade-1; retorna (linhas, referência colunar)."""
+    dados_clientes = []
+    nascimentos = []
+    rendas = []
+    ocupacoes = []
+    estados = []
+    hoje_dias = hoje_em_dias()
+
+    for i in range(primeiro_id, primeiro_id + quantidade):
+        renda = gerar_renda()
+
+        # Simula distribuição realista: a maioria tem renda positiva
+        if renda < 1000:
+            # Pessoas com renda muito baixa (Estudantes, Aposentados com baixo benefício)
+            renda = random.randint(500, 1500)
+
+        # Ajusta a ocupação de forma semi-realista
+        if renda > 15000:
+            ocupacao = random.choice(['Empresário', 'CLT'])
+        elif renda < 2000:
+            ocupacao = random.choice(['Estudante', 'Aposentado'])
+        else:
+            ocupacao = random.choice(OCUPACOES)
+
+        data_nascimento = gerar_data_nascimento(hoje_dias)
+        renda = round(renda, 2)
+
+        # Monta a linha de dados
+        dados_clientes.append([
+            i,  # cliente_id
+            fake.name(),
+            formatar_data(data_nascimento),
+            ocupacao,
+            renda,
+            fake.city(),
+            fake.state_abbr(),
+            fake.cpf()
+        ])
+        nascimentos.append(data_nascimento)
+        rendas.append(renda)
+        ocupacoes.append(OCUPACOES.index(ocupacao))
+        estados.append(ESTADOS.index(dados_clientes[-1][6]))
+
+    # Mesmo formato de dados_referencia.carregar_clientes()
+    referencia = {
+        'cliente_id': np.arange(primeiro_id, primeiro_id + quantidade, dtype=np.int64),
+        'data_nascimento': np.array(nascimentos, dtype=np.int32),
+        'renda': np.array(rendas, dtype=np.float64),
+        'ocupacao': np.array(ocupacoes, dtype=np.int8),
+        'estado': np.array(estados, dtype=np.int8),
+    }
+    return dados_clientes, referencia
+
+def gerar_lote_clientes_segmentado(primeiro_id, quantidade):
+    """gerar_lote_clientes() segmento a segmento: com --seed, cada segmento de CLIENTES_POR_SEGMENTO
+    clientes é semeado pelo seu índice, então o tamanho do lote não muda a saída.
+
+    primeiro_id - 1 precisa ser múltiplo de CLIENTES_POR_SEGMENTO (ver reprodutibilidade.lote_alinhado).
+    """
+    fim = primeiro_id + quantidade
+    partes = []
+    for inicio in range(primeiro_id, fim, CLIENTES_POR_SEGMENTO):
+        semear_lote('clientes', (inicio - 1) // CLIENTES_POR_SEGMENTO, fake)
+        partes.append(gerar_lote_clientes(inicio, min(CLIENTES_POR_SEGMENTO, fim - inicio)))
+    return juntar_lotes(partes)
+
+def lotes_clientes(num_clientes, tamanho_lote, inicio=0):
+    """Gera os clientes sob demanda, em lotes de (linhas, referência) com até tamanho_lote clientes.
+
+    inicio: clientes já gravados, que são pulados (a geração continua no cliente inicio + 1).
+    """
+    for primeiro_id in range(inicio + 1, num_clientes + 1, tamanho_lote):
+        yield gerar_lote_clientes_segmentado(primeiro_id, min(tamanho_lote, num_clientes - primeiro_id + 1))
+
+def gerar_clientes(num_clientes):
+    """Gera todos os clientes de uma vez; retorna (linhas, referência colunar)."""
+    return gerar_lote_clientes(1, num_clientes)
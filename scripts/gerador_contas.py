@@ -0,0 +1,106 @@
+import random
+import numpy as np
+from dados_referencia import CODIGOS_TIPO_CONTA, fatiar_referencia, juntar_lotes
+from datas import formatar_data, hoje_em_dias
+from dominios import TIPOS_CONTA
+from reprodutibilidade import CLIENTES_POR_SEGMENTO, semear_lote
+
+# --- FUNÇÕES ---
+
+def gerar_data_abertura(data_nascimento, hoje_dias):
+    """Gera uma data de abertura de conta (dias) que é pelo menos 18 anos após o nascimento do cliente."""
+    
+    # O cliente só pode abrir conta após a maioridade (18 anos)
+    data_minima = data_nascimento + 365 * 18
+    data_maxima = hoje_dias - 30 # A conta não pode ter sido aberta hoje/nos últimos 30 dias
+    
+    # Se a data mínima for no futuro (cliente muito novo), ajusta para a data máxima.
+    if data_minima > data_maxima:
+        return data_maxima
+    
+    return random.randint(data_minima, data_maxima)
+
+def gerar_saldo(tipo_conta):
+    """Gera um saldo inicial baseado no tipo de conta."""
+    if tipo_conta == 'Corrente':
+        # Saldo com média próxima de 3k (pode ser negativo)
+        saldo = random.gauss(3000, 5000)
+    elif tipo_conta == 'Poupança':
+        # Saldo com média mais alta
+        saldo = random.gauss(8000, 6000)
+    elif tipo_conta == 'Investimento':
+        # Saldo com média muito alta
+        saldo = random.gauss(50000, 25000)
+    else: # Empresarial/Outros
+        saldo = random.gauss(15000, 10000)
+    
+    return round(saldo, 2)
+
+def gerar_lote_contas(clientes, primeiro_id):
+    """Gera as contas de um lote de clientes, numeradas a partir de primeiro_id; retorna (linhas, referência)."""
+    dados_contas = []
+    conta_id_counter = primeiro_id
+
+    ids_clientes = clientes['cliente_id'].tolist()
+    nascimentos = clientes['data_nascimento'].tolist()
+    aberturas = []
+    hoje_dias = hoje_em_dias()
+
+    for cliente_id, data_nascimento in zip(ids_clientes, nascimentos):
+
+        # Cada cliente terá aleatoriamente entre 1 e 3 contas
+        num_contas = random.choice([1, 1, 1, 2, 2, 3]) # Distribuição: mais clientes com 1 ou 2 contas
+        
+        for _ in range(num_contas):
+            tipo = random.choice(TIPOS_CONTA)
+            saldo = gerar_saldo(tipo)
+            data_abertura = gerar_data_abertura(data_nascimento, hoje_dias)
+            
+            dados_contas.append([
+                conta_id_counter,
+                cliente_id,
+                tipo,
+                saldo,
+                formatar_data(data_abertura)
+            ])
+            aberturas.append(data_abertura)
+            
+            conta_id_counter += 1
+
+    # Mesmo formato de dados_referencia.carregar_contas()
+    referencia = {
+        'conta_id': np.arange(primeiro_id, conta_id_counter, dtype=np.int64),
+        'cliente_id': np.array([linha[1] for linha in dados_contas], dtype=np.int64),
+        'tipo_conta': np.array([CODIGOS_TIPO_CONTA[linha[2]] for linha in dados_contas], dtype=np.int8),
+        'saldo': np.array([linha[3] for linha in dados_contas], dtype=np.float64),
+        'data_abertura': np.array(aberturas, dtype=np.int32),
+    }
+    return dados_contas, referencia
+
+def gerar_lote_contas_segmentado(clientes, primeiro_id, posicao):
+    """gerar_lote_contas() segmento a segmento: com --seed, cada segmento de CLIENTES_POR_SEGMENTO
+    clientes é semeado pelo seu índice, então o tamanho do lote não muda a saída.
+
+    posicao: clientes antes do lote (múltiplo de CLIENTES_POR_SEGMENTO).
+    """
+    partes = []
+    for k, segmento in enumerate(fatiar_referencia(clientes, CLIENTES_POR_SEGMENTO)):
+        semear_lote('contas', posicao // CLIENTES_POR_SEGMENTO + k)
+        partes.append(gerar_lote_contas(segmento, primeiro_id))
+        primeiro_id += len(partes[-1][0])
+    return juntar_lotes(partes)
+
+def lotes_contas(lotes_de_clientes, proximo_id=1, inicio=0):
+    """Gera as contas sob demanda, um lote de (linhas, referência) por lote de clientes recebido.
+
+    inicio: clientes antes do primeiro lote recebido (já gravados); a numeração continua em proximo_id.
+    """
+    for clientes in lotes_de_clientes:
+        dados_contas, referencia = gerar_lote_contas_segmentado(clientes, proximo_id, inicio)
+        proximo_id += len(dados_contas)
+        inicio += len(clientes['cliente_id'])
+        yield dados_contas, referencia
+
+def gerar_contas(clientes):
+    """Gera todas as contas de uma vez; retorna (linhas, referência colunar)."""
+    return gerar_lote_contas(clientes, 1)
@@ -0,0 +1,232 @@
+import random
+import numpy as np
+from dados_referencia import fatiar_referencia
+from datas import formatar_data, formatar_datas, hoje_em_dias
+from dominios import STATUS_CREDITO
+from reprodutibilidade import CLIENTES_POR_SEGMENTO, semear_lote
+
+# --- CONFIGURAÇÃO ---
+TAXAS_JUROS = [0.05, 0.08, 0.12, 0.15, 0.20] # 5% a 20%
+
+# Define o limite de idade para conceder crédito: 18 anos e 6 meses
+DIAS_IDADE_MINIMA_CREDITO = int(365 * 18.5) 
+
+# Pesos de status por faixa de score (score > 10000, > 5000, resto), na ordem de STATUS_CREDITO
+LIMITES_SCORE = np.array([5000, 10000], dtype=np.float64)
+PESOS_STATUS = np.array([
+    [20, 50, 5, 25],   # score <= 5000
+    [50, 15, 10, 25],  # 5000 < score <= 10000
+    [70, 0, 5, 25],    # score > 10000 (nunca negado)
+], dtype=np.float64)
+CDF_STATUS = np.cumsum(PESOS_STATUS, axis=1) / PESOS_STATUS.sum(axis=1, keepdims=True)
+CODIGOS_TAXA_ALTA = np.array([STATUS_CREDITO.index('Negado'), STATUS_CREDITO.index('Inadimplente')])
+
+# --- FUNÇÕES DE PREPARAÇÃO ---
+
+def montar_dados_risco(clientes, contas):
+    """Junta renda, nascimento e saldo total (soma das contas) por cliente, em arrays."""
+    ids = clientes['cliente_id']
+
+    # Soma os saldos por cliente (contas de clientes desconhecidos são ignoradas)
+    posicoes = np.searchsorted(ids, contas['cliente_id'])
+    conhecidos = posicoes < len(ids)
+    conhecidos[conhecidos] = ids[posicoes[conhecidos]] == contas['cliente_id'][conhecidos]
+    saldo_total = np.bincount(posicoes[conhecidos], weights=contas['saldo'][conhecidos], minlength=len(ids))
+
+    return {
+        'cliente_id': ids,
+        'renda': clientes['renda'],
+        'saldo_total': saldo_total,
+        'data_nascimento': clientes['data_nascimento'],
+    }
+
+# --- FUNÇÕES DE LÓGICA DE CRÉDITO ---
+
+def calcular_limite(renda, saldo):
+    """Calcula um limite de empréstimo baseado na renda e saldo."""
+    limite = (renda * random.uniform(0.5, 1.5)) + (saldo * random.uniform(0.1, 0.5))
+    return max(1000, round(limite / 500) * 500)
+
+def determinar_status(renda, saldo, limite):
+    """Simula a decisão de crédito e o status subsequente."""
+    score_base = renda + (saldo * 0.5)
+    
+    status = 'Negado'
+    if score_base > 10000:
+        status = random.choices(['Aprovado', 'Inadimplente', 'Pago'], weights=[70, 5, 25], k=1)[0]
+    elif score_base > 5000:
+        status = random.choices(['Aprovado', 'Negado', 'Inadimplente', 'Pago'], weights=[50, 15, 10, 25], k=1)[0]
+    else:
+        status = random.choices(['Aprovado', 'Negado', 'Inadimplente', 'Pago'], weights=[20, 50, 5, 25], k=1)[0]
+        
+    return status
+
+# --- MODO POR LINHA (ORIGINAL) ---
+
+def gerar_lote_credito_por_linha(dados_risco, primeiro_id):
+    """Loop original: uma decisão de crédito (módulo random) por cliente; datas em dias desde 1970-01-01."""
+    dados_credito = []
+    credito_id_counter = primeiro_id
+    hoje = hoje_em_dias()
+
+    for cliente_id, data_nascimento, renda, saldo in zip(
+        dados_risco['cliente_id'].tolist(), dados_risco['data_nascimento'].tolist(),
+        dados_risco['renda'].tolist(), dados_risco['saldo_total'].tolist()
+    ):
+        
+        # 🟢 REGRA DE NEGÓCIO: IGNORAR MENORES DE 18 ANOS E 6 MESES
+        data_minima_credito = data_nascimento + DIAS_IDADE_MINIMA_CREDITO
+        
+        if data_minima_credito > hoje:
+            # Cliente ainda não atingiu a idade mínima de 18,5 anos para crédito. Pula.
+            continue 
+            
+        # Apenas 80% dos clientes elegíveis terão alguma operação de crédito
+        if random.random() < 0.8:
+            
+            limite = calcular_limite(renda, saldo)
+            status = determinar_status(renda, saldo, limite)
+            
+            valor_emprestado = round(limite * random.uniform(0.5, 1.0), 2)
+            
+            if status == 'Inadimplente' or status == 'Negado':
+                taxa = random.choice(TAXAS_JUROS[2:])
+            else:
+                taxa = random.choice(TAXAS_JUROS[:3])
+            
+            # Data de aprovação (mínimo: data que fez 18,5 anos; máximo: 90 dias atrás)
+            data_maxima = hoje - 90
+            
+            # Garante que o início nunca seja maior que o fim (solução para o erro anterior)
+            data_inicio = max(data_minima_credito, data_maxima - 365*2) # Se a data_maxima for muito recente, usamos ela como início, retroagindo 2 anos
+            
+            if data_inicio > data_maxima:
+                 data_inicio = data_maxima - 30 # Se ainda falhar, garantimos um intervalo de 30 dias
+
+            data_aprovacao = formatar_data(random.randint(data_inicio, data_maxima))
+            
+            dados_credito.append([
+                credito_id_counter,
+                cliente_id,
+                valor_emprestado,
+                taxa,
+                status,
+                data_aprovacao
+            ])
+            
+            credito_id_counter += 1
+
+    return dados_credito
+
+# --- MODO VETORIZADO (POPULAÇÃO EM NUMPY) ---
+
+def avaliar_credito(rng, renda, saldo_total, data_nascimento, hoje=None):
+    """Decide o crédito de toda a população de uma vez, com as mesmas regras e distribuições do modo por linha.
+
+    Recebe arrays de renda, saldo total e nascimento (dias desde 1970-01-01) e retorna
+    as colunas das operações geradas; 'indice' aponta a posição do cliente nos arrays.
+    """
+    hoje_dias = hoje_em_dias(hoje)
+
+    renda = np.asarray(renda, dtype=np.float64)
+    saldo_total = np.asarray(saldo_total, dtype=np.float64)
+    data_minima = np.asarray(data_nascimento, dtype=np.int64) + DIAS_IDADE_MINIMA_CREDITO
+
+    # 1. Elegibilidade (18,5 anos completos) e os 80% dos elegíveis que têm operação
+    selecionados = (data_minima <= hoje_dias) & (rng.random(len(renda)) < 0.8)
+    indice = np.flatnonzero(selecionados)
+    renda, saldo, data_minima = renda[indice], saldo_total[indice], data_minima[indice]
+    n = len(indice)
+
+    # 2. Limite (calcular_limite): arredondado para múltiplos de 500, mínimo de 1000
+    limite = renda * rng.uniform(0.5, 1.5, n) + saldo * rng.uniform(0.1, 0.5, n)
+    limite = np.maximum(1000, np.round(limite / 500) * 500)
+
+    # 3. Status (determinar_status): faixa do score e sorteio pela CDF da faixa
+    faixa = np.searchsorted(LIMITES_SCORE, renda + saldo * 0.5, side='left')
+    status = (rng.random(n)[:, None] > CDF_STATUS[faixa]).sum(axis=1).astype(np.int8)
+
+    valor_emprestado = np.round(limite * rng.uniform(0.5, 1.0, n), 2)
+
+    # 4. Taxa: negados/inadimplentes sorteiam entre as 3 maiores, os demais entre as 3 menores
+    taxas = np.array(TAXAS_JUROS)
+    taxa_juros = taxas[np.where(np.isin(status, CODIGOS_TAXA_ALTA), 2, 0) + rng.integers(0, 3, n)]
+
+    # 5. Aprovação entre max(18,5 anos, máximo - 2 anos) e o máximo (90 dias atrás), em dias
+    data_maxima = hoje_dias - 90
+    inicio = np.maximum(data_minima, data_maxima - 365 * 2)
+    inicio = np.where(inicio > data_maxima, data_maxima - 30, inicio)
+    data_aprovacao = inicio + rng.integers(0, data_maxima - inicio + 1)
+
+    return {
+        'indice': indice,
+        'limite': limite,
+        'valor_emprestado': valor_emprestado,
+        'taxa_juros': taxa_juros,
+        'status': status,
+        'data_aprovacao': data_aprovacao,
+    }
+
+def credito_para_linhas(cliente_ids, colunas, primeiro_id):
+    """Converte as colunas de avaliar_credito() em linhas no esquema do CSV de crédito."""
+    n = len(colunas['indice'])
+    datas = formatar_datas(colunas['data_aprovacao'])
+
+    return list(zip(
+        range(primeiro_id, primeiro_id + n),
+        np.asarray(cliente_ids)[colunas['indice']].tolist(),
+        colunas['valor_emprestado'].tolist(),
+        colunas['taxa_juros'].tolist(),
+        np.array(STATUS_CREDITO, dtype=object)[colunas['status']].tolist(),
+        datas.tolist(),
+    ))
+
+def gerar_lote_credito_vetorizado(dados_risco, primeiro_id, rng=None):
+    """Gera as operações de crédito do lote com avaliar_credito()."""
+    if rng is None:
+        rng = np.random.default_rng()
+    colunas = avaliar_credito(rng, dados_risco['renda'], dados_risco['saldo_total'], dados_risco['data_nascimento'])
+    return credito_para_linhas(dados_risco['cliente_id'], colunas, primeiro_id)
+
+# --- GERAÇÃO EM LOTES ---
+
+def gerar_lote_credito(dados_risco, primeiro_id, modo='vetorizado', rng=None):
+    """Gera as operações de crédito de um lote de dados de risco, numeradas a partir de primeiro_id.
+
+    modo: 'vetorizado' (avaliar_credito em NumPy) ou 'linha' (loop original).
+    """
+    if modo == 'linha':
+        return gerar_lote_credito_por_linha(dados_risco, primeiro_id)
+    return gerar_lote_credito_vetorizado(dados_risco, primeiro_id, rng)
+
+def gerar_lote_credito_segmentado(dados_risco, primeiro_id, posicao, modo='vetorizado', rng=None):
+    """gerar_lote_credito() segmento a segmento: com --seed, cada segmento de CLIENTES_POR_SEGMENTO
+    clientes é semeado pelo seu índice, então o tamanho do lote não muda a saída.
+
+    posicao: clientes antes do lote (múltiplo de CLIENTES_POR_SEGMENTO).
+    """
+    linhas = []
+    for k, segmento in enumerate(fatiar_referencia(dados_risco, CLIENTES_POR_SEGMENTO)):
+        rng_segmento = semear_lote('credito', posicao // CLIENTES_POR_SEGMENTO + k)
+        linhas += gerar_lote_credito(segmento, primeiro_id + len(linhas), modo,
+                                     rng if rng_segmento is None else rng_segmento)
+    return linhas
+
+def lotes_credito(blocos_risco, modo='vetorizado', rng=None, proximo_id=1, inicio=0):
+    """Gera o crédito sob demanda, um lote de linhas por bloco de dados de risco recebido.
+
+    inicio: clientes antes do primeiro bloco recebido (já gravados); a numeração continua em proximo_id.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    for dados_risco in blocos_risco:
+        dados_credito = gerar_lote_credito_segmentado(dados_risco, proximo_id, inicio, modo, rng)
+        proximo_id += len(dados_credito)
+        inicio += len(dados_risco['cliente_id'])
+        yield dados_credito
+
+def gerar_credito(clientes, contas, modo='vetorizado'):
+    """Gera todas as operações de crédito de uma vez; retorna as linhas."""
+    dados_risco = montar_dados_risco(clientes, contas)
+    print(f"Lidos {len(dados_risco['cliente_id'])} clientes para análise de risco.")
+    return gerar_lote_credito(dados_risco, 1, modo)
@@ -0,0 +1,86 @@
+import csv
+import io
+import os
+from datetime import datetime, timedelta
+import numpy as np
+from carga_sqlite import tabela_existe
+from datas import momento_referencia
+from motor_transacoes import preparar_contas, gerar_chunk_vetorizado, chunk_para_linhas
+from particoes import tabelas_particionadas
+
+# Geração incremental de transações: em vez de regenerar todo o histórico, lê a
+# "marca d'água" (maior transacao_id e maior data_hora) do fim do CSV ou do banco
+# e gera só a janela nova, em ordem cronológica, para ser anexada ao arquivo e à
+# tabela (os índices do SQLite são atualizados pelo próprio INSERT).
+# A maior data_hora vem da cauda: no histórico completo cada chunk cobre a janela
+# inteira, então as últimas linhas chegam a poucas horas do fim; depois do primeiro
+# incremento as linhas estão em ordem de data_hora e a marca passa a ser exata.
+
+# --- CONFIGURAÇÃO ---
+TRANSACOES_POR_DIA = 30_000        # Volume do "feed diário"
+TAMANHO_CAUDA = 8 * 1024 * 1024    # Bytes lidos do fim do CSV (~1 chunk de transações)
+LINHAS_CAUDA = 100_000             # Linhas do fim da tabela usadas para a maior data_hora
+FORMATO_DATA_HORA = '%Y-%m-%d %H:%M:%S'
+
+# --- MARCA D'ÁGUA ---
+
+def marca_dagua_csv(caminho, tamanho_cauda=TAMANHO_CAUDA):
+    """(maior transacao_id, maior data_hora) das linhas no fim do CSV; None se não houver linhas."""
+    with open(caminho, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        tamanho = f.tell()
+        f.seek(max(0, tamanho - tamanho_cauda))
+        cauda = f.read()
+
+    linhas = cauda.decode('utf-8').splitlines()
+    # A primeira linha é o cabeçalho (arquivo pequeno) ou uma linha cortada pela metade
+    linhas = [linha for linha in csv.reader(io.StringIO('\n'.join(linhas[1:]))) if linha]
+    if not linhas:
+        return None
+    return int(linhas[-1][0]), max(linha[4] for linha in linhas)
+
+def marca_dagua_sqlite(con, particionado=False):
+    """(maior transacao_id, maior data_hora) da tabela de transações ou das partições mensais."""
+    if particionado:
+        tabelas = tabelas_particionadas(con)
+        if not tabelas:
+            return None
+        maior_id = max(con.execute(f"SELECT MAX(transacao_id) FROM {tabela}").fetchone()[0] or 0
+                       for tabela in tabelas)
+        # Partição mais nova: a maior data_hora é exata
+        return maior_id, con.execute(f"SELECT MAX(data_hora) FROM {tabelas[-1]}").fetchone()[0]
+
+    if not tabela_existe(con, 'transacoes'):
+        return None
+    maior_id = con.execute("SELECT MAX(transacao_id) FROM transacoes").fetchone()[0]
+    if maior_id is None:
+        return None
+    # Busca pela chave primária: só as últimas LINHAS_CAUDA linhas, sem varrer a tabela
+    consulta = "SELECT MAX(data_hora) FROM transacoes WHERE transacao_id > ?"
+    return maior_id, con.execute(consulta, (maior_id - LINHAS_CAUDA,)).fetchone()[0]
+
+# --- GERAÇÃO ---
+
+def janela_incremental(marca_data_hora, dias, agora=None):
+    """Janela (inicio, fim] de `dias` dias após a marca d'água, sem passar de agora (ou da data de referência); None se já está em dia."""
+    agora = agora or momento_referencia().replace(microsecond=0)
+    inicio = datetime.strptime(marca_data_hora, FORMATO_DATA_HORA) + timedelta(seconds=1)
+    fim = min(inicio + timedelta(days=dias), agora)
+    if fim <= inicio:
+        return None
+    return inicio, fim
+
+def chunks_janela(contas_ref, primeiro_id, inicio, fim, num_transacoes, chunk_size, rng=None, modelo=None):
+    """Transações de [inicio, fim] em ordem cronológica, numeradas a partir de primeiro_id."""
+    if rng is None:
+        rng = np.random.default_rng()
+    contas = preparar_contas(contas_ref, fim, modelo, data_minima=inicio)
+
+    # Um feed diário chega em ordem de data_hora: gera a janela inteira e ordena
+    colunas = gerar_chunk_vetorizado(rng, contas, num_transacoes)
+    ordem = np.argsort(colunas['data_hora'], kind='stable')
+    colunas = {nome: valores[ordem] for nome, valores in colunas.items()}
+
+    for deslocamento in range(0, num_transacoes, chunk_size):
+        parte = {nome: valores[deslocamento:deslocamento + chunk_size] for nome, valores in colunas.items()}
+        yield chunk_para_linhas(parte, primeiro_id + deslocamento)
@@ -0,0 +1,286 @@
+import argparse
+import csv
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from caminhos import CAMINHO_DB
+from carga_sqlite import (ARQUIVOS_CSV, ESQUEMAS, LINHAS_POR_TRANSACAO, carga_em_massa, criar_indices,
+                          preparar_tabela, tabela_existe)
+from instrumentacao import adicionar_argumentos_instrumentacao, configurar_instrumentacao, etapa
+
+# Ingestão rápida de CSVs já gerados (ex.: arquivos históricos de TRANSACOES.csv e
+# CONTAS.csv) para o SQLite. O arquivo é cortado em blocos de BLOCO_BYTES alinhados
+# em fim de linha; processos do pool leem cada bloco em binário, fazem o parse com o
+# csv e convertem as colunas pelos tipos de ESQUEMAS. Um único escritor recebe os
+# blocos em ordem (com poucos blocos em voo, memória limitada) e insere em lote com
+# executemany, dentro das transações grandes e dos PRAGMAs de carga_em_massa().
+# Integridade referencial: os ids de cada tabela pai (clientes, contas) ficam num
+# mapa de bits em memória (1 bit por id); cada bloco filho é conferido com uma
+# operação vetorizada, sem consulta por linha. Órfãos abortam a carga da tabela.
+# A carga vai para uma tabela de trabalho ('<tabela>_ingestao'), que só substitui a
+# tabela do banco depois que o arquivo inteiro passou pela conferência: um arquivo
+# com órfãos não apaga a tabela boa já carregada.
+
+# --- CONFIGURAÇÃO ---
+BLOCO_BYTES = 32 * 1024 ** 2
+BLOCOS_EM_VOO_POR_WORKER = 2
+EXEMPLOS_ORFAOS = 5
+
+# Ordem de carga (pais antes dos filhos) e a chave estrangeira de cada tabela filha
+ORDEM_TABELAS = ['clientes', 'contas', 'credito', 'transacoes']
+INTEGRIDADE = {
+    'contas': ('cliente_id', 'clientes'),
+    'credito': ('cliente_id', 'clientes'),
+    'transacoes': ('conta_id', 'contas'),
+}
+CONVERSORES = {'INTEGER': int, 'REAL': float, 'TEXT': None}   # TEXT já sai do csv como str
+SUFIXO_TRABALHO = '_ingestao'
+
+# --- MAPA DE BITS ---
+
+class MapaDeBits:
+    """Conjunto de ids inteiros não negativos com 1 bit por id (ordem de bits do np.packbits)."""
+
+    def __init__(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        self.tamanho = int(ids.max()) + 1 if len(ids) else 0
+        presentes = np.zeros(self.tamanho, dtype=bool)
+        presentes[ids] = True
+        self.bits = np.packbits(presentes)
+        self.num_ids = int(presentes.sum())
+
+    def __len__(self):
+        return self.num_ids
+
+    def contem(self, ids):
+        """Array booleano: quais ids estão no conjunto."""
+        ids = np.asarray(ids, dtype=np.int64)
+        dentro = (ids >= 0) & (ids < self.tamanho)
+        seguros = np.where(dentro, ids, 0)
+        bit = (self.bits[seguros >> 3] >> (7 - (seguros & 7))) & 1
+        return dentro & (bit == 1)
+
+def ids_do_banco(con, tabela):
+    """Mapa de bits com a chave primária de uma tabela já carregada no banco."""
+    chave = ESQUEMAS[tabela][0][0]
+    ids = np.fromiter((linha[0] for linha in con.execute(f"SELECT {chave} FROM {tabela}")), dtype=np.int64)
+    return MapaDeBits(ids)
+
+# --- BLOCOS ---
+
+def dividir_em_blocos(caminho, bloco_bytes=BLOCO_BYTES):
+    """Faixas [(inicio, fim), ...] de bytes do arquivo, após o cabeçalho, terminando em fim de linha."""
+    tamanho = os.path.getsize(caminho)
+    blocos = []
+    with open(caminho, 'rb') as f:
+        f.readline()
+        inicio = f.tell()
+        while inicio < tamanho:
+            f.seek(min(inicio + bloco_bytes, tamanho))
+            f.readline()   # Avança até o fim da linha cortada
+            fim = min(f.tell(), tamanho)
+            blocos.append((inicio, fim))
+            inicio = fim
+    return blocos
+
+class LinhaInvalida(Exception):
+    pass
+
+def posicao_da_linha(dados, inicio, linhas_antes):
+    """Byte do arquivo onde começa a linha física seguinte às `linhas_antes` primeiras do bloco."""
+    posicao = 0
+    for _ in range(linhas_antes):
+        posicao = dados.index(b'\n', posicao) + 1
+    return inicio + posicao
+
+def ler_bloco(tarefa):
+    """Lê e converte um bloco do CSV; executado dentro do pool de processos.
+
+    Retorna as colunas (listas) já com os tipos do esquema. Uma linha com outro número
+    de campos (ex.: arquivo cortado no meio da última linha, linhas coladas) ou um valor
+    que não converte levanta LinhaInvalida, com a posição no arquivo.
+    """
+    caminho, tabela, inicio, fim = tarefa
+    with open(caminho, 'rb') as f:
+        f.seek(inicio)
+        dados = f.read(fim - inicio)
+    esperados = len(ESQUEMAS[tabela])
+    leitor = csv.reader(io.StringIO(dados.decode('utf-8'), newline=''))
+    linhas = []
+    linhas_lidas = 0   # Linhas físicas antes da linha atual (um campo entre aspas pode ter quebra de linha)
+    for linha in leitor:
+        if len(linha) != esperados:
+            raise LinhaInvalida(f"'{caminho}', byte {posicao_da_linha(dados, inicio, linhas_lidas):,}: "
+                                f"{len(linha)} campo(s) em vez de {esperados} ({','.join(linha)[:80]!r})")
+        linhas.append(linha)
+        linhas_lidas = leitor.line_num
+    if not linhas:
+        return [[] for _ in ESQUEMAS[tabela]]
+    colunas = zip(*linhas)
+    convertidas = []
+    for coluna, (nome, tipo) in zip(colunas, ESQUEMAS[tabela]):
+        conversor = CONVERSORES[tipo.split()[0]]
+        try:
+            convertidas.append(list(coluna) if conversor is None else list(map(conversor, coluna)))
+        except ValueError as e:
+            raise LinhaInvalida(f"'{caminho}', bloco a partir do byte {inicio:,}: coluna {nome}: {e}") from None
+    return convertidas
+
+def blocos_em_paralelo(caminho, tabela, workers, bloco_bytes=BLOCO_BYTES):
+    """Colunas de cada bloco, na ordem do arquivo, com no máximo BLOCOS_EM_VOO_POR_WORKER blocos por worker em voo."""
+    tarefas = [(caminho, tabela, inicio, fim) for inicio, fim in dividir_em_blocos(caminho, bloco_bytes)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        em_voo = deque()
+        for tarefa in tarefas:
+            em_voo.append(pool.submit(ler_bloco, tarefa))
+            if len(em_voo) >= workers * BLOCOS_EM_VOO_POR_WORKER:
+                yield em_voo.popleft().result()
+        while em_voo:
+            yield em_voo.popleft().result()
+
+# --- INGESTÃO ---
+
+class IntegridadeViolada(Exception):
+    pass
+
+def conferir_orfaos(tabela, colunas, pais):
+    """Levanta IntegridadeViolada se a chave estrangeira do bloco tiver ids fora do mapa de bits do pai."""
+    coluna, tabela_pai = INTEGRIDADE[tabela]
+    posicao = [nome for nome, _ in ESQUEMAS[tabela]].index(coluna)
+    ids = np.array(colunas[posicao], dtype=np.int64)
+    orfaos = ids[~pais.contem(ids)]
+    if len(orfaos):
+        exemplos = ', '.join(map(str, np.unique(orfaos)[:EXEMPLOS_ORFAOS].tolist()))
+        raise IntegridadeViolada(f"{len(orfaos):,} linhas de '{tabela}' com {coluna} inexistente em "
+                                 f"'{tabela_pai}' (ex.: {exemplos})")
+
+def ingerir_tabela(con, tabela, caminho, workers, pais=None, validar_somente=False, bloco_bytes=BLOCO_BYTES, medida=None):
+    """Carrega (ou só valida) um CSV; retorna o mapa de bits dos ids da tabela para as tabelas filhas.
+
+    A carga é feita em '<tabela>_ingestao' e só troca de lugar com a tabela do banco no final.
+    """
+    inicio = time.perf_counter()
+    trabalho = f"{tabela}{SUFIXO_TRABALHO}"
+    if not validar_somente:
+        preparar_tabela(con, tabela, trabalho)
+        con.execute("BEGIN")
+    marcadores = ', '.join('?' * len(ESQUEMAS[tabela]))
+    ids = []
+    total, pendentes = 0, 0
+
+    try:
+        for colunas in blocos_em_paralelo(caminho, tabela, workers, bloco_bytes):
+            if pais is not None:
+                conferir_orfaos(tabela, colunas, pais)
+            ids.append(np.array(colunas[0], dtype=np.int64))
+            n = len(colunas[0])
+            if not validar_somente:
+                con.executemany(f"INSERT INTO {trabalho} VALUES ({marcadores})", zip(*colunas))
+                pendentes += n
+                if pendentes >= LINHAS_POR_TRANSACAO:
+                    con.execute("COMMIT")
+                    con.execute("BEGIN")
+                    pendentes = 0
+            total += n
+            if medida is not None:
+                medida.linhas += n
+    except BaseException:
+        if not validar_somente:
+            # Os lotes já confirmados estão só na tabela de trabalho: a tabela do banco fica como estava
+            if con.in_transaction:
+                con.execute("ROLLBACK")
+            con.execute(f"DROP TABLE IF EXISTS {trabalho}")
+        raise
+    if not validar_somente:
+        con.execute("COMMIT")
+        con.execute("BEGIN")
+        con.execute(f"DROP TABLE IF EXISTS {tabela}")
+        con.execute(f"ALTER TABLE {trabalho} RENAME TO {tabela}")
+        con.execute("COMMIT")
+
+    segundos = time.perf_counter() - inicio
+    acao = 'validada' if validar_somente else 'carregada'
+    print(f" -> Tabela '{tabela}' {acao}: {total:,} linhas em {segundos:.1f}s "
+          f"({total / max(segundos, 1e-9):,.0f} linhas/seg)")
+    return MapaDeBits(np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64))
+
+def ingerir(tabelas, caminho_db=CAMINHO_DB, workers=1, validar_somente=False, integridade=True,
+            bloco_bytes=BLOCO_BYTES, arquivos=None):
+    """Ingere as tabelas na ordem pai -> filho; pais fora da lista vêm do banco.
+
+    Retorna False se houve órfãos ou linhas mal formadas (a tabela do banco fica como estava).
+    """
+    arquivos = {**ARQUIVOS_CSV, **(arquivos or {})}
+    tabelas = sorted(tabelas, key=ORDEM_TABELAS.index)
+    mapas = {}
+    with carga_em_massa(caminho_db) as con:
+        if integridade:
+            # Pais fora da lista precisam já estar no banco (conferido antes de carregar qualquer tabela)
+            faltando = sorted({INTEGRIDADE[tabela][1] for tabela in tabelas if tabela in INTEGRIDADE}
+                              - set(tabelas), key=ORDEM_TABELAS.index)
+            faltando = [tabela_pai for tabela_pai in faltando if not tabela_existe(con, tabela_pai)]
+            if faltando:
+                print(f"ERRO: tabela(s) {', '.join(faltando)} ausente(s) em '{caminho_db}': carregue "
+                      f"{', '.join(faltando)} primeiro (ou inclua na lista, ou use --sem-integridade).")
+                return False
+        for tabela in tabelas:
+            pais = None
+            if integridade and tabela in INTEGRIDADE:
+                tabela_pai = INTEGRIDADE[tabela][1]
+                if tabela_pai not in mapas:
+                    mapas[tabela_pai] = ids_do_banco(con, tabela_pai)
+                    print(f" -> {len(mapas[tabela_pai]):,} ids de '{tabela_pai}' lidos do banco")
+                pais = mapas[tabela_pai]
+            try:
+                with etapa(f"ingestao_{tabela}") as medida:
+                    mapas[tabela] = ingerir_tabela(con, tabela, arquivos[tabela], workers, pais,
+                                                   validar_somente, bloco_bytes, medida)
+            except IntegridadeViolada as e:
+                print(f"ERRO de integridade referencial: {e}.")
+                return False
+            except LinhaInvalida as e:
+                print(f"ERRO de formato: {e}.")
+                return False
+        if not validar_somente and 'transacoes' in tabelas:
+            with etapa('indices'):
+                criar_indices(con)
+    return True
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ingere CSVs gerados no SQLite em paralelo, com checagem de integridade.')
+    parser.add_argument('tabelas', nargs='*', default=ORDEM_TABELAS,
+                        help=f"Tabelas a ingerir, entre {', '.join(ORDEM_TABELAS)} (padrão: todas)")
+    parser.add_argument('--db', default=CAMINHO_DB, help='Arquivo do banco (padrão: %(default)s)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processos de parse (padrão: nº de CPUs)')
+    parser.add_argument('--bloco-mb', type=int, default=BLOCO_BYTES // 1024 ** 2,
+                        help='Tamanho de cada bloco lido pelos workers, em MB (padrão: %(default)s)')
+    parser.add_argument('--arquivo', action='append', default=[], metavar='TABELA=CAMINHO',
+                        help='CSV de origem de uma tabela (ex.: transacoes=arquivo/TRANSACOES_2019.csv)')
+    parser.add_argument('--validar', action='store_true', help='Só confere a integridade referencial, sem carregar')
+    parser.add_argument('--sem-integridade', action='store_true', help='Não confere as chaves estrangeiras')
+    adicionar_argumentos_instrumentacao(parser)
+    args = parser.parse_args()
+    configurar_instrumentacao(args)
+
+    desconhecidas = [tabela for tabela in args.tabelas if tabela not in ORDEM_TABELAS]
+    if desconhecidas:
+        parser.error(f"tabela(s) desconhecida(s): {', '.join(desconhecidas)}")
+    arquivos = {}
+    for item in args.arquivo:
+        tabela, _, caminho = item.partition('=')
+        if tabela not in ORDEM_TABELAS or not caminho:
+            parser.error(f"--arquivo espera TABELA=CAMINHO com TABELA em {', '.join(ORDEM_TABELAS)}")
+        arquivos[tabela] = caminho
+
+    print(f"Ingerindo {', '.join(args.tabelas)} em '{args.db}' com {args.workers} worker(s)...")
+    ok = ingerir(args.tabelas, args.db, args.workers, args.validar, not args.sem_integridade,
+                 args.bloco_mb * 1024 ** 2, arquivos)
+    if not ok:
+        raise SystemExit(1)
+    print("\n✅ Ingestão concluída.")
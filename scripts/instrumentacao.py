@@ -0,0 +1,314 @@
+import cProfile
+import json
+import os
+import platform
+import pstats
+import resource
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+# Instrumentação leve das etapas dos scripts: tempo de parede, tempo de CPU (do
+# processo e dos subprocessos já encerrados, como os workers), linhas/seg, bytes
+# escritos (/proc/self/io) e RSS, por etapa e por chunk; o pico de RSS é o de cada
+# etapa, não o da vida do processo. Cada etapa imprime uma linha de resumo; com
+# --metricas ARQUIVO as medidas também vão para um JSON lines (uma linha por
+# evento, com a versão do código) para acompanhar o desempenho dos geradores
+# entre versões. --perfil cprofile|amostragem envolve as etapas num
+# profiler e lista as funções mais quentes (Faker, formatação de datas, csv...).
+
+# --- CONFIGURAÇÃO ---
+PERFIS = ['cprofile', 'amostragem']
+TOP_FUNCOES = 15
+INTERVALO_AMOSTRAGEM = 0.005   # Segundos entre amostras da pilha no profiler por amostragem
+
+# Estado configurado por configurar_instrumentacao() (padrão: só o resumo na tela)
+SCRIPT = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+ARQUIVO_METRICAS = None
+PERFIL = None
+ETAPAS_PERFIL = None
+TOP = TOP_FUNCOES
+
+def adicionar_argumentos_instrumentacao(parser):
+    """Acrescenta --metricas, --perfil, --perfil-etapa e --perfil-top ao parser do script."""
+    parser.add_argument('--metricas', metavar='ARQUIVO',
+                        help='Anexa as métricas de cada etapa e chunk em JSON lines')
+    parser.add_argument('--perfil', choices=PERFIS,
+                        help='Roda as etapas sob cProfile ou sob um profiler por amostragem e lista as funções mais quentes')
+    parser.add_argument('--perfil-etapa', action='append', metavar='ETAPA',
+                        help='Limita o --perfil a esta etapa (pode repetir; padrão: todas)')
+    parser.add_argument('--perfil-top', type=int, default=TOP_FUNCOES,
+                        help='Funções listadas pelo --perfil (padrão: %(default)s)')
+
+def configurar_instrumentacao(args):
+    """Ativa as métricas/perfil pedidos na linha de comando."""
+    global ARQUIVO_METRICAS, PERFIL, ETAPAS_PERFIL, TOP
+    ARQUIVO_METRICAS = args.metricas
+    PERFIL = args.perfil
+    ETAPAS_PERFIL = set(args.perfil_etapa) if args.perfil_etapa else None
+    TOP = args.perfil_top
+
+# --- LEITURAS DO PROCESSO ---
+
+@lru_cache(maxsize=1)
+def versao_codigo():
+    """Commit do repositório dos scripts (ou 'desconhecida' fora de um checkout git)."""
+    try:
+        saida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                               capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return 'desconhecida'
+    return saida.stdout.strip() or 'desconhecida'
+
+def tempo_cpu():
+    """CPU (usuário + sistema) do processo e dos filhos já aguardados, em segundos."""
+    proprio = resource.getrusage(resource.RUSAGE_SELF)
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return proprio.ru_utime + proprio.ru_stime + filhos.ru_utime + filhos.ru_stime
+
+def bytes_escritos():
+    """Bytes passados a write() pelo processo (wchar de /proc/self/io); None fora do Linux."""
+    try:
+        with open('/proc/self/io') as f:
+            for linha in f:
+                if linha.startswith('wchar:'):
+                    return int(linha.split()[1])
+    except OSError:
+        pass
+    return None
+
+def rss_kb():
+    """RSS atual em KB (None fora do Linux)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        return None
+
+def pico_rss_kb():
+    """Maior RSS desde o último zerar_pico_rss() (VmHWM), em KB; fora do Linux, o pico da vida do processo."""
+    try:
+        with open('/proc/self/status') as f:
+            for linha in f:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def zerar_pico_rss():
+    """Volta o VmHWM ao RSS atual (escreve 5 em /proc/self/clear_refs); False se não for possível."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def registrar(evento):
+    """Anexa um evento ao arquivo de métricas (se configurado)."""
+    if ARQUIVO_METRICAS is None:
+        return
+    evento = {
+        'momento': datetime.now().isoformat(timespec='seconds'),
+        'script': SCRIPT,
+        'versao': versao_codigo(),
+        'python': platform.python_version(),
+        **evento,
+    }
+    with open(ARQUIVO_METRICAS, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(evento, ensure_ascii=False) + '\n')
+
+# --- PROFILERS ---
+
+class PerfilCProfile:
+    """cProfile da thread principal; top = funções por tempo próprio."""
+
+    def __init__(self):
+        self.perfil = cProfile.Profile()
+
+    def iniciar(self):
+        self.perfil.enable()
+
+    def parar(self):
+        self.perfil.disable()
+
+    def top(self, n):
+        estatisticas = pstats.Stats(self.perfil).stats
+        linhas = sorted(estatisticas.items(), key=lambda item: item[1][2], reverse=True)[:n]
+        return [
+            {
+                'funcao': f"{os.path.basename(arquivo)}:{linha}({nome})",
+                'chamadas': chamadas,
+                'tempo_proprio': round(proprio, 4),
+                'tempo_acumulado': round(acumulado, 4),
+            }
+            for (arquivo, linha, nome), (_, chamadas, proprio, acumulado, _) in linhas
+        ]
+
+class PerfilAmostragem:
+    """Amostra a pilha da thread principal a cada INTERVALO_AMOSTRAGEM; custo quase nulo no código medido."""
+
+    def __init__(self, intervalo=INTERVALO_AMOSTRAGEM):
+        self.intervalo = intervalo
+        self.proprias = Counter()      # Função no topo da pilha
+        self.acumuladas = Counter()    # Função em qualquer ponto da pilha
+        self.amostras = 0
+        self.alvo = threading.main_thread().ident
+        self.parada = threading.Event()
+        self.thread = None
+
+    def _amostrar(self):
+        while not self.parada.wait(self.intervalo):
+            quadro = sys._current_frames().get(self.alvo)
+            if quadro is None:
+                continue
+            self.amostras += 1
+            self.proprias[self._nome(quadro)] += 1
+            vistas = set()
+            while quadro is not None:
+                vistas.add(self._nome(quadro))
+                quadro = quadro.f_back
+            self.acumuladas.update(vistas)
+
+    @staticmethod
+    def _nome(quadro):
+        codigo = quadro.f_code
+        return f"{os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno}({codigo.co_name})"
+
+    def iniciar(self):
+        self.thread = threading.Thread(target=self._amostrar, name='amostragem', daemon=True)
+        self.thread.start()
+
+    def parar(self):
+        self.parada.set()
+        self.thread.join()
+
+    def top(self, n):
+        return [
+            {
+                'funcao': funcao,
+                'amostras': amostras,
+                'fracao_propria': round(amostras / max(self.amostras, 1), 4),
+                'fracao_acumulada': round(self.acumuladas[funcao] / max(self.amostras, 1), 4),
+            }
+            for funcao, amostras in self.proprias.most_common(n)
+        ]
+
+PROFILERS = {'cprofile': PerfilCProfile, 'amostragem': PerfilAmostragem}
+
+def imprimir_top(nome, funcoes):
+    print(f"\n--- FUNÇÕES MAIS QUENTES ({nome}, {PERFIL}) ---")
+    for funcao in funcoes:
+        if 'tempo_proprio' in funcao:
+            print(f" {funcao['tempo_proprio']:>9.3f}s {funcao['tempo_acumulado']:>9.3f}s "
+                  f"{funcao['chamadas']:>11,}  {funcao['funcao']}")
+        else:
+            print(f" {funcao['fracao_propria']:>8.1%} {funcao['fracao_acumulada']:>8.1%}  {funcao['funcao']}")
+
+# --- ETAPAS ---
+
+# Etapas em andamento (uma etapa pode rodar dentro de outra): zerar o VmHWM para a
+# etapa nova apagaria o pico das de fora, então elas guardam o valor antes
+ETAPAS_ATIVAS = []
+
+class Etapa:
+    """Medidas de uma etapa em andamento; chunks() conta as linhas e mede cada chunk.
+
+    O pico de RSS é o da etapa: o VmHWM é zerado no início. Sem /proc/self/clear_refs,
+    vale o maior RSS amostrado no início, a cada chunk e no fim.
+    """
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.linhas = 0
+        self.num_chunks = 0
+        self.inicio = time.perf_counter()
+        self.cpu = tempo_cpu()
+        self.bytes = bytes_escritos()
+        pico_anterior = pico_rss_kb()
+        for ativa in ETAPAS_ATIVAS:
+            ativa.pico = max(ativa.pico, pico_anterior)
+        self.pico_zerado = zerar_pico_rss()
+        self.pico = rss_kb() or 0
+
+    def amostrar_rss(self):
+        atual = rss_kb()
+        if atual is not None:
+            self.pico = max(self.pico, atual)
+        return atual
+
+    def pico_rss(self):
+        """Maior RSS da etapa até agora, em KB."""
+        self.amostrar_rss()
+        return max(self.pico, pico_rss_kb()) if self.pico_zerado else self.pico
+
+    def chunks(self, chunks):
+        """Repassa os chunks registrando linhas, tempo, CPU, bytes e RSS de cada ciclo (gerar + entregar)."""
+        anterior = (time.perf_counter(), tempo_cpu(), bytes_escritos())
+        for chunk in chunks:
+            yield chunk
+            agora = (time.perf_counter(), tempo_cpu(), bytes_escritos())
+            self.linhas += len(chunk)
+            self.num_chunks += 1
+            rss = self.amostrar_rss()
+            if ARQUIVO_METRICAS is not None:
+                parede = agora[0] - anterior[0]
+                registrar({
+                    'evento': 'chunk',
+                    'etapa': self.nome,
+                    'chunk': self.num_chunks,
+                    'linhas': len(chunk),
+                    'parede_s': round(parede, 4),
+                    'cpu_s': round(agora[1] - anterior[1], 4),
+                    'linhas_seg': round(len(chunk) / max(parede, 1e-9), 1),
+                    'bytes_escritos': None if agora[2] is None else agora[2] - anterior[2],
+                    'rss_kb': rss,
+                })
+            anterior = agora
+
+    def resumo(self):
+        parede = time.perf_counter() - self.inicio
+        bytes_ = bytes_escritos()
+        return {
+            'evento': 'etapa',
+            'etapa': self.nome,
+            'linhas': self.linhas,
+            'chunks': self.num_chunks,
+            'parede_s': round(parede, 4),
+            'cpu_s': round(tempo_cpu() - self.cpu, 4),
+            'linhas_seg': round(self.linhas / max(parede, 1e-9), 1),
+            'bytes_escritos': None if bytes_ is None or self.bytes is None else bytes_ - self.bytes,
+            'pico_rss_kb': self.pico_rss(),
+        }
+
+@contextmanager
+def etapa(nome):
+    """Mede o bloco como uma etapa: resumo na tela, evento nas métricas e perfil se pedido."""
+    medida = Etapa(nome)
+    ETAPAS_ATIVAS.append(medida)
+    perfil = None
+    if PERFIL is not None and (ETAPAS_PERFIL is None or nome in ETAPAS_PERFIL):
+        perfil = PROFILERS[PERFIL]()
+        perfil.iniciar()
+    try:
+        yield medida
+    finally:
+        if perfil is not None:
+            perfil.parar()
+        ETAPAS_ATIVAS.remove(medida)
+        resumo = medida.resumo()
+        escritos = '' if resumo['bytes_escritos'] is None else f", {resumo['bytes_escritos'] / 1024 ** 2:,.1f} MB escritos"
+        vazao = f", {resumo['linhas_seg']:,.0f} linhas/seg" if resumo['linhas'] else ''
+        print(f" -> [{nome}] {resumo['parede_s']:.2f}s parede, {resumo['cpu_s']:.2f}s CPU{vazao}"
+              f"{escritos}, pico RSS {resumo['pico_rss_kb'] / 1024:,.0f} MB")
+        registrar(resumo)
+        if perfil is not None:
+            funcoes = perfil.top(TOP)
+            imprimir_top(nome, funcoes)
+            registrar({'evento': 'perfil', 'etapa': nome, 'profiler': PERFIL, 'funcoes': funcoes})
@@ -0,0 +1,269 @@
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+from contextlib import ExitStack
+from itertools import chain
+from carga_sqlite import carga_em_massa, carregar_tabela
+from dados_referencia import hash_arquivo
+from escritores import ESQUEMAS, gravar_chunks
+
+# Manifesto de conteúdo dos CSVs gerados: ao lado de cada arquivo, um
+# '<arquivo>.manifest.json' com os parâmetros da geração (seed, as-of, volumes,
+# impressão digital das entradas) e, por chunk, as linhas, a faixa de ids, a faixa
+# de bytes no arquivo e o SHA-256 desses bytes (e, nos arquivos gerados por lote de
+# clientes, o tamanho do lote: é dele que sai o ponto de retomada).
+# Numa nova execução com --seed e os mesmos parâmetros, os chunks cujo conteúdo no
+# disco ainda confere com o manifesto são mantidos: a geração começa no primeiro
+# chunk que falta (ou que mudou), e o arquivo é cortado ali. Um conjunto de dados
+# completo e conhecido sai quase de graça (só a leitura para conferir os hashes).
+# `python manifesto.py A.manifest.json B.manifest.json` compara dois arquivos chunk a chunk.
+
+# --- CONFIGURAÇÃO ---
+VERSAO_MANIFESTO = 2
+
+# --- ARQUIVO DO MANIFESTO ---
+
+def caminho_manifesto(caminho_saida):
+    """Arquivo de manifesto que acompanha o arquivo de saída."""
+    return f"{caminho_saida}.manifest.json"
+
+def ler_manifesto(caminho_saida):
+    """Manifesto do arquivo de saída; None se não existir ou for de outra versão."""
+    caminho = caminho_manifesto(caminho_saida)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, 'r', encoding='utf-8') as f:
+        manifesto = json.load(f)
+    return manifesto if manifesto.get('versao') == VERSAO_MANIFESTO else None
+
+def salvar_manifesto(caminho_saida, manifesto):
+    """Grava o manifesto de forma atômica."""
+    caminho = caminho_manifesto(caminho_saida)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=1)
+    os.replace(temporario, caminho)
+
+def remover_manifesto(caminho_saida):
+    """Apaga o manifesto (o arquivo foi reescrito sem ele e o conteúdo não é mais o descrito)."""
+    caminho = caminho_manifesto(caminho_saida)
+    if os.path.exists(caminho):
+        os.remove(caminho)
+
+def resumo_chunks(chunks):
+    """SHA-256 do arquivo inteiro a partir dos hashes dos chunks (sem reler os dados)."""
+    sha = hashlib.sha256()
+    for chunk in chunks:
+        sha.update(chunk['sha256'].encode('ascii'))
+    return sha.hexdigest()
+
+def impressao_digital(caminho):
+    """Identidade do conteúdo de um arquivo de entrada: o resumo do seu manifesto, se ainda
+    corresponde ao arquivo (tamanho e mtime), ou o SHA-1 do arquivo lido por inteiro."""
+    manifesto = ler_manifesto(caminho)
+    estado = os.stat(caminho)
+    if (manifesto is not None and manifesto.get('completo')
+            and manifesto['tamanho'] == estado.st_size and manifesto['mtime_ns'] == estado.st_mtime_ns):
+        return manifesto['resumo']
+    return hash_arquivo(caminho)
+
+# --- CONFERÊNCIA ---
+
+def chunks_reaproveitaveis(caminho_saida, parametros):
+    """Chunks do início do arquivo que podem ser mantidos e se o arquivo já estava completo.
+
+    Só vale com seed (sem ela a geração não se repete) e com os mesmos parâmetros;
+    cada chunk é conferido relendo seus bytes e comparando o SHA-256.
+    """
+    manifesto = ler_manifesto(caminho_saida)
+    if parametros.get('seed') is None or manifesto is None or not os.path.exists(caminho_saida):
+        return [], False
+    if manifesto['parametros'] != parametros:
+        print(f" -> Manifesto de '{caminho_saida}' com outros parâmetros: gerando do zero")
+        return [], False
+
+    validos = []
+    tamanho = os.path.getsize(caminho_saida)
+    with open(caminho_saida, 'rb') as f:
+        if f.read(manifesto['cabecalho_bytes']) != cabecalho_csv(manifesto['tabela']):
+            return [], False
+        for chunk in manifesto['chunks']:
+            if chunk['fim'] > tamanho:
+                break
+            f.seek(chunk['inicio'])
+            if hashlib.sha256(f.read(chunk['fim'] - chunk['inicio'])).hexdigest() != chunk['sha256']:
+                break
+            validos.append(chunk)
+
+    completo = manifesto.get('completo', False) and len(validos) == len(manifesto['chunks'])
+    print(f" -> Manifesto de '{caminho_saida}': {len(validos):,} de {len(manifesto['chunks']):,} chunks conferidos"
+          f"{' (arquivo completo, nada a gerar)' if completo else ''}")
+    return validos, completo
+
+def ler_chunks(caminho_saida, chunks):
+    """Linhas (texto, como no CSV) dos chunks mantidos, para cargas que precisam delas."""
+    with open(caminho_saida, 'rb') as f:
+        for chunk in chunks:
+            f.seek(chunk['inicio'])
+            dados = f.read(chunk['fim'] - chunk['inicio']).decode('utf-8')
+            yield list(csv.reader(io.StringIO(dados, newline='')))
+
+# --- ESCRITA ---
+
+def cabecalho_csv(tabela):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([nome for nome, _ in ESQUEMAS[tabela]])
+    return buffer.getvalue().encode('utf-8')
+
+class EscritorComManifesto:
+    """CSV com manifesto: cada chunk é serializado, gravado e registrado com o SHA-256 dos seus bytes.
+
+    chunks_mantidos: chunks conferidos de uma execução anterior; o arquivo é cortado
+    depois do último e a escrita continua dali. O manifesto é gravado ao fechar, com
+    completo=True só se concluir() foi chamado (geração terminou) e nenhuma escrita falhou.
+    lote: clientes por chunk, registrado em cada chunk novo (o lote muda com a RAM da
+    máquina, então não entra nos parâmetros).
+    """
+
+    def __init__(self, caminho, tabela, parametros, chunks_mantidos=(), lote=None):
+        self.caminho = caminho
+        self.tabela = tabela
+        self.parametros = parametros
+        self.lote = lote
+        self.chunks = list(chunks_mantidos)
+        self.completo = False
+        self.falhou = False
+        cabecalho = cabecalho_csv(tabela)
+        self.cabecalho_bytes = len(cabecalho)
+        if self.chunks:
+            with open(caminho, 'r+b') as f:
+                f.truncate(self.chunks[-1]['fim'])
+            self.file = open(caminho, 'ab')
+        else:
+            self.file = open(caminho, 'wb')
+            self.file.write(cabecalho)
+        self.posicao = self.file.tell()
+
+    def escrever(self, linhas):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(linhas)
+        dados = buffer.getvalue().encode('utf-8')
+        try:
+            self.file.write(dados)
+        except Exception:
+            # Ex.: disco cheio atrás do EscritorAssincrono: o manifesto não pode sair completo
+            self.falhou = True
+            raise
+        self.chunks.append({
+            'indice': len(self.chunks),
+            'linhas': len(linhas),
+            'primeiro_id': int(linhas[0][0]) if linhas else None,
+            'proximo_id': int(linhas[-1][0]) + 1 if linhas else None,
+            'inicio': self.posicao,
+            'fim': self.posicao + len(dados),
+            'sha256': hashlib.sha256(dados).hexdigest(),
+        })
+        if self.lote is not None:
+            self.chunks[-1]['lote'] = self.lote
+        self.posicao += len(dados)
+
+    def concluir(self):
+        """Marca a geração como terminada (o manifesto sai com completo=True)."""
+        self.completo = True
+
+    def fechar(self):
+        self.file.close()
+        estado = os.stat(self.caminho)
+        salvar_manifesto(self.caminho, {
+            'versao': VERSAO_MANIFESTO,
+            'tabela': self.tabela,
+            'parametros': self.parametros,
+            'completo': self.completo and not self.falhou,
+            'cabecalho_bytes': self.cabecalho_bytes,
+            'linhas': sum(chunk['linhas'] for chunk in self.chunks),
+            'tamanho': estado.st_size,
+            'mtime_ns': estado.st_mtime_ns,
+            'resumo': resumo_chunks(self.chunks),
+            'chunks': self.chunks,
+        })
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+def proximo_id(chunks):
+    """Primeiro id depois dos chunks mantidos (1 se não há nenhum)."""
+    return chunks[-1]['proximo_id'] if chunks else 1
+
+def publicar_com_manifesto(gerar, tabela, caminho, parametros, carregar_sqlite=False, medida=None, lote=None):
+    """Como saida.publicar() para CSV, reaproveitando os chunks conferidos pelo manifesto.
+
+    gerar(inicio, proximo_id) devolve os chunks que faltam a partir do cliente inicio + 1
+    (com lote, os chunks mantidos somam os lotes registrados neles; sem lote, inicio é o
+    número de chunks mantidos).
+    Com carregar_sqlite, os chunks mantidos são lidos do arquivo para a carga.
+    medida (instrumentacao.etapa) registra só os chunks gerados nesta execução.
+    Retorna (total de linhas, caminho do arquivo).
+    """
+    mantidos, completo = chunks_reaproveitaveis(caminho, parametros)
+    inicio = len(mantidos) if lote is None else sum(chunk['lote'] for chunk in mantidos)
+    novos = iter(()) if completo else gerar(inicio, proximo_id(mantidos))
+    if medida is not None:
+        novos = medida.chunks(novos)
+
+    with ExitStack() as pilha:
+        escritor = pilha.enter_context(EscritorComManifesto(caminho, tabela, parametros, mantidos, lote))
+        novos = gravar_chunks(novos, escritor)
+        if carregar_sqlite:
+            con = pilha.enter_context(carga_em_massa())
+            total = carregar_tabela(con, tabela, chain(ler_chunks(caminho, mantidos), novos))
+        else:
+            total = sum(chunk['linhas'] for chunk in mantidos) + sum(len(chunk) for chunk in novos)
+        escritor.concluir()
+
+    return total, caminho
+
+# --- COMPARAÇÃO ---
+
+def comparar_manifestos(caminho_a, caminho_b):
+    """Imprime os chunks que diferem entre dois manifestos; retorna quantos diferem."""
+    manifestos = []
+    for caminho in (caminho_a, caminho_b):
+        with open(caminho, 'r', encoding='utf-8') as f:
+            manifestos.append(json.load(f))
+    a, b = manifestos
+
+    parametros = sorted(set(a['parametros']) | set(b['parametros']))
+    for nome in parametros:
+        if a['parametros'].get(nome) != b['parametros'].get(nome):
+            print(f" -> Parâmetro {nome}: {a['parametros'].get(nome)!r} vs {b['parametros'].get(nome)!r}")
+
+    diferentes = 0
+    for indice in range(max(len(a['chunks']), len(b['chunks']))):
+        chunk_a = a['chunks'][indice] if indice < len(a['chunks']) else None
+        chunk_b = b['chunks'][indice] if indice < len(b['chunks']) else None
+        if chunk_a is None or chunk_b is None or chunk_a['sha256'] != chunk_b['sha256']:
+            diferentes += 1
+            ids = chunk_a or chunk_b
+            print(f" -> Chunk {indice}: ids {ids['primeiro_id']}..{ids['proximo_id'] - 1} "
+                  f"{'só em um dos arquivos' if chunk_a is None or chunk_b is None else 'com conteúdo diferente'}")
+
+    if a['resumo'] == b['resumo']:
+        print(f"Idênticos: {len(a['chunks']):,} chunks, {a['linhas']:,} linhas.")
+    else:
+        print(f"{diferentes:,} chunk(s) diferente(s).")
+    return diferentes
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compara dois arquivos gerados pelos manifestos, chunk a chunk.')
+    parser.add_argument('manifesto_a', help='Manifesto (ou arquivo de dados com .manifest.json ao lado)')
+    parser.add_argument('manifesto_b')
+    args = parser.parse_args()
+    caminhos = [caminho if caminho.endswith('.json') else caminho_manifesto(caminho)
+                for caminho in (args.manifesto_a, args.manifesto_b)]
+    comparar_manifestos(*caminhos)
@@ -0,0 +1,154 @@
+import numpy as np
+from datas import SEGUNDOS_DIA
+from dominios import TIPOS_CONTA
+
+# Modelo de carga para as transações: em vez de contas e instantes uniformes,
+# algumas contas concentram o movimento (peso por tipo de conta, saldo e um fator
+# "conta quente" com cauda Zipf) e o tempo segue o calendário real: dia da semana,
+# dias de pagamento, dias quentes e o perfil de horas do dia.
+# As contas são sorteadas pelo método alias (O(1) por sorteio, qualquer número de
+# contas). O dia é sorteado na janela de cada conta pela soma acumulada dos pesos.
+# O sorteio das contas e dos dias quentes usa uma semente fixa: as mesmas contas
+# e os mesmos dias são quentes em todas as execuções e em todos os shards.
+
+# --- CONFIGURAÇÃO ---
+CARGAS = ['realista', 'uniforme']
+SEED_MODELO = 20240501
+
+# Skew padrão: expoente Zipf das contas quentes e intensidade dos dias quentes (0 = desliga)
+SKEW_CONTAS = 0.8
+SKEW_DIAS = 1.0
+NUM_DIAS_QUENTES = 12
+
+# Atividade relativa por tipo de conta (indexada pelo código de TIPOS_CONTA)
+ATIVIDADE_TIPO_CONTA = {'Corrente': 1.0, 'Poupança': 0.25, 'Investimento': 0.15, 'Empresarial': 3.0}
+PESO_TIPO_CONTA = np.array([ATIVIDADE_TIPO_CONTA[tipo] for tipo in TIPOS_CONTA])
+
+# Segunda a domingo (o dia 0 da época, 1970-01-01, foi uma quinta-feira)
+PESO_DIA_SEMANA = np.array([1.0, 0.95, 0.95, 1.0, 1.25, 1.1, 0.6])
+
+# Dias de pagamento: salário no início do mês e adiantamento no dia 20
+PESO_DIA_MES = np.ones(32)
+PESO_DIA_MES[[5, 6, 7]] = 1.6
+PESO_DIA_MES[20] = 1.4
+
+# Perfil das 24 horas: madrugada quase parada, picos no almoço e no fim da tarde
+PESO_HORA = np.array([
+    0.2, 0.1, 0.05, 0.05, 0.05, 0.1, 0.3, 0.6, 1.0, 1.2, 1.3, 1.4,
+    1.6, 1.4, 1.2, 1.2, 1.3, 1.5, 1.7, 1.6, 1.3, 1.0, 0.7, 0.4,
+])
+
+# --- MÉTODO ALIAS ---
+
+def construir_alias(pesos):
+    """Tabelas (prob, alias) do método alias de Vose para os pesos (O(n) uma única vez)."""
+    pesos = np.asarray(pesos, dtype=np.float64)
+    n = len(pesos)
+    escala = pesos * (n / pesos.sum())
+
+    prob = np.ones(n)
+    alias = np.arange(n)
+    pequenos = np.flatnonzero(escala < 1.0).tolist()
+    grandes = np.flatnonzero(escala >= 1.0).tolist()
+    escala = escala.tolist()
+
+    while pequenos and grandes:
+        menor, maior = pequenos.pop(), grandes[-1]
+        prob[menor] = escala[menor]
+        alias[menor] = maior
+        escala[maior] -= 1.0 - escala[menor]
+        if escala[maior] < 1.0:
+            pequenos.append(grandes.pop())
+
+    # Sobras (só por arredondamento) ficam com probabilidade 1
+    return prob, alias
+
+def amostrar_alias(rng, prob, alias, n):
+    """Sorteia n índices com as tabelas do método alias: um inteiro e um uniforme por sorteio."""
+    indices = rng.integers(0, len(prob), n)
+    return np.where(rng.random(n) < prob[indices], indices, alias[indices])
+
+# --- PESOS ---
+
+def pesos_contas(contas_ref, skew_contas=SKEW_CONTAS):
+    """Peso de atividade de cada conta: tipo x saldo x fator Zipf de conta quente."""
+    n = len(contas_ref['conta_id'])
+    pesos = np.ones(n)
+
+    if 'tipo_conta' in contas_ref:
+        pesos *= PESO_TIPO_CONTA[np.asarray(contas_ref['tipo_conta'], dtype=np.int64)]
+    if 'saldo' in contas_ref:
+        # Cresce devagar com o saldo: 1x sem saldo, ~3x com 10 mil
+        pesos *= 1 + np.log10(1 + np.maximum(np.asarray(contas_ref['saldo']), 0)) / 2
+
+    if skew_contas > 0:
+        # Ranking fixo de "contas quentes": a conta de rank r pesa 1/r^skew
+        ranks = np.random.default_rng(SEED_MODELO).permutation(n) + 1
+        pesos *= ranks.astype(np.float64) ** -skew_contas
+
+    return pesos
+
+def pesos_dias(primeiro_dia, ultimo_dia, skew_dias=SKEW_DIAS, num_dias_quentes=NUM_DIAS_QUENTES):
+    """Peso de cada dia entre primeiro_dia e ultimo_dia (dias desde 1970-01-01)."""
+    dias = np.arange(primeiro_dia, ultimo_dia + 1)
+    dia_semana = (dias + 3) % 7
+    dia_mes = dias - dias.astype('datetime64[D]').astype('datetime64[M]').astype('datetime64[D]').astype(np.int64) + 1
+
+    pesos = PESO_DIA_SEMANA[dia_semana] * PESO_DIA_MES[dia_mes]
+
+    if skew_dias > 0 and num_dias_quentes > 0:
+        # Dias quentes (Black Friday, pane em outro banco...): 10^skew vezes o movimento normal
+        quentes = np.random.default_rng(SEED_MODELO + 1).choice(len(dias), min(num_dias_quentes, len(dias)), replace=False)
+        pesos[quentes] *= 10.0 ** skew_dias
+
+    return pesos
+
+# --- MODELO ---
+
+def configurar_carga(carga, skew_contas=SKEW_CONTAS, skew_dias=SKEW_DIAS):
+    """Parâmetros do modelo para a linha de comando ('uniforme' = None, o sorteio original)."""
+    if carga == 'uniforme':
+        return None
+    return {'skew_contas': skew_contas, 'skew_dias': skew_dias}
+
+def preparar_modelo(contas_ref, inicio, fim, skew_contas=SKEW_CONTAS, skew_dias=SKEW_DIAS):
+    """Pré-calcula as tabelas do modelo para as contas (janelas [inicio, fim] em segundos)."""
+    primeiro_dia = int(inicio.min()) // SEGUNDOS_DIA
+    ultimo_dia = int(fim) // SEGUNDOS_DIA
+
+    prob, alias = construir_alias(pesos_contas(contas_ref, skew_contas))
+
+    # Soma acumulada dos pesos dos dias, com um zero à frente: massa de [a, b] = acum[b+1] - acum[a]
+    acumulado = np.concatenate([[0.0], np.cumsum(pesos_dias(primeiro_dia, ultimo_dia, skew_dias))])
+
+    return {
+        'prob': prob,
+        'alias': alias,
+        'primeiro_dia': primeiro_dia,
+        'dias_acumulados': acumulado,
+        'horas_acumuladas': np.cumsum(PESO_HORA) / PESO_HORA.sum(),
+    }
+
+def sortear_contas(rng, modelo, n):
+    """Índices de n contas, ponderados pela atividade."""
+    return amostrar_alias(rng, modelo['prob'], modelo['alias'], n)
+
+def sortear_instantes(rng, modelo, inicio, fim):
+    """Um instante (segundos) por par (inicio, fim), seguindo o calendário e o perfil de horas."""
+    n = len(inicio)
+    acumulado = modelo['dias_acumulados']
+    a = inicio // SEGUNDOS_DIA - modelo['primeiro_dia']
+    b = fim // SEGUNDOS_DIA - modelo['primeiro_dia']
+
+    # Dia: uniforme na massa acumulada da janela da conta -> busca binária na soma acumulada
+    alvo = acumulado[a] + rng.random(n) * (acumulado[b + 1] - acumulado[a])
+    dia = np.clip(np.searchsorted(acumulado, alvo, side='right') - 1, a, b) + modelo['primeiro_dia']
+
+    # Hora pelo perfil do dia, segundo uniforme dentro da hora
+    hora = np.searchsorted(modelo['horas_acumuladas'], rng.random(n), side='right')
+    instante = dia * SEGUNDOS_DIA + np.minimum(hora, 23) * 3600 + rng.integers(0, 3600, n)
+
+    # Primeiro/último dia da janela podem ser parciais: rebate o instante para dentro de [inicio, fim]
+    fora = (instante < inicio) | (instante > fim)
+    instante[fora] = inicio[fora] + (instante[fora] - inicio[fora]) % (fim[fora] - inicio[fora] + 1)
+    return instante
@@ -0,0 +1,274 @@
+import random
+from datetime import timedelta
+import numpy as np
+from faker import Faker
+from datas import SEGUNDOS_DIA, datetime_para_segundos, momento_referencia, formatar_data_hora, formatar_datas_hora
+from modelo_carga import preparar_modelo, sortear_contas, sortear_instantes
+from dominios import TIPOS_TRANSACAO, ESTABELECIMENTOS
+from pool_nomes import carregar_pool_nomes, distribuicao_zipf, amostrar_nomes, sortear_nome
+from reprodutibilidade import TRANSACOES_POR_SEGMENTO, com_seed, semear_lote
+
+# --- CONFIGURAÇÃO ---
+LOCALE = 'pt_BR'
+
+fake = Faker(LOCALE)
+CABECALHO_TRANSACOES = ['transacao_id', 'conta_id', 'tipo', 'valor', 'data_hora', 'destino']
+
+# Faixas de valor (mín, máx) por tipo, na mesma ordem de TIPOS_TRANSACAO
+VALOR_MINIMO = np.array([50, 10, 100, 100, 10], dtype=np.float64)
+VALOR_MAXIMO = np.array([5000, 500, 10000, 10000, 500], dtype=np.float64)
+
+# Índices dos tipos usados na seleção vetorizada do destino
+IDX_TED = TIPOS_TRANSACAO.index('TED')
+IDX_PIX = TIPOS_TRANSACAO.index('Pix')
+IDX_COMPRA = TIPOS_TRANSACAO.index('Compra Débito')
+
+# Pool de nomes para TED/Pix (None = fake.name() a cada linha)
+POOL_DESTINOS = None
+CDF_DESTINOS = None
+
+def configurar_pool_destinos(tamanho, expoente_zipf=0.0):
+    """Passa a sortear destinos de TED/Pix de um pool em cache (tamanho 0 desativa)."""
+    global POOL_DESTINOS, CDF_DESTINOS
+    if tamanho <= 0:
+        POOL_DESTINOS, CDF_DESTINOS = None, None
+        return
+    POOL_DESTINOS = carregar_pool_nomes(tamanho)
+    CDF_DESTINOS = distribuicao_zipf(tamanho, expoente_zipf)
+
+# --- MODO POR LINHA (ORIGINAL) ---
+
+def gerar_destino(tipo):
+    """Simula o destino ou origem da transação."""
+    if tipo in ['TED', 'Pix']:
+        if POOL_DESTINOS is not None:
+            return sortear_nome(POOL_DESTINOS, CDF_DESTINOS)
+        return fake.name()
+    elif tipo == 'Compra Débito':
+        return random.choice(ESTABELECIMENTOS)
+    else:
+        return 'Interno'
+
+def gerar_transacao(conta_id, data_abertura, data_maxima=None):
+    """Gera uma única linha de transação (data_maxima fixa torna a saída reprodutível)."""
+
+    # 1. Definir o tipo e valor
+    tipo = random.choice(TIPOS_TRANSACAO)
+
+    if tipo in ['Saque', 'Compra Débito']:
+        valor = round(random.uniform(10, 500), 2)
+    elif tipo == 'Depósito':
+        valor = round(random.uniform(50, 5000), 2)
+    else: # TED, Pix
+        valor = round(random.uniform(100, 10000), 2)
+
+    # 2. Definir a Data/Hora
+    if data_maxima is None:
+        data_maxima = momento_referencia() - timedelta(days=7)
+    fim = datetime_para_segundos(data_maxima)
+    data_inicio_valida = datetime_para_segundos(data_abertura) + 30 * SEGUNDOS_DIA
+
+    data_inicio = data_inicio_valida
+    if data_inicio_valida > fim:
+        # Se a conta é muito nova, ajusta o início (garante que o fim > início)
+        data_inicio = fim - SEGUNDOS_DIA
+
+    data_hora = formatar_data_hora(random.randint(data_inicio, fim))
+
+    # 3. Gerar a linha
+    return [
+        conta_id,
+        tipo,
+        valor,
+        data_hora,
+        gerar_destino(tipo)
+    ]
+
+# --- MODO VETORIZADO (LOTE EM NUMPY) ---
+
+def preparar_contas(contas_ref, data_maxima=None, modelo=None, data_minima=None):
+    """Converte as contas de referência (arrays) na janela [abertura+30d, agora-7d] em segundos epoch.
+
+    modelo: parâmetros de modelo_carga.configurar_carga() (None = contas e instantes uniformes).
+    data_minima: corta o início de todas as janelas (geração incremental de um período novo).
+    """
+    if data_maxima is None:
+        data_maxima = momento_referencia() - timedelta(days=7)
+
+    fim = datetime_para_segundos(data_maxima)
+
+    ids = np.asarray(contas_ref['conta_id'], dtype=np.int64)
+    inicio = (np.asarray(contas_ref['data_abertura'], dtype=np.int64) + 30) * SEGUNDOS_DIA
+
+    # Mesma regra do modo por linha: conta muito nova recua o início para 1 dia antes do fim
+    inicio = np.where(inicio > fim, fim - SEGUNDOS_DIA, inicio)
+    if data_minima is not None:
+        inicio = np.maximum(inicio, datetime_para_segundos(data_minima))
+
+    contas = {'ids': ids, 'inicio': inicio, 'amplitude': fim - inicio}
+    if modelo is not None:
+        contas['modelo'] = preparar_modelo(contas_ref, inicio, fim, **modelo)
+    return contas
+
+def gerar_chunk_vetorizado(rng, contas, n):
+    """Gera um bloco de n transações como arrays colunares (sem transacao_id)."""
+
+    modelo = contas.get('modelo')
+
+    # 1. Conta (uniforme, como random.choice no modo por linha, ou pelo modelo de carga) e tipo (uniforme)
+    if modelo is None:
+        idx_conta = rng.integers(0, len(contas['ids']), n)
+    else:
+        idx_conta = sortear_contas(rng, modelo, n)
+    idx_tipo = rng.integers(0, len(TIPOS_TRANSACAO), n)
+
+    # 2. Valor uniforme dentro da faixa do tipo
+    valor = np.round(rng.uniform(VALOR_MINIMO[idx_tipo], VALOR_MAXIMO[idx_tipo]), 2)
+
+    # 3. Data/Hora em segundos dentro da janela da conta (uniforme ou pelo calendário do modelo)
+    inicio = contas['inicio'][idx_conta]
+    if modelo is None:
+        data_hora = inicio + rng.integers(0, contas['amplitude'][idx_conta] + 1)
+    else:
+        data_hora = sortear_instantes(rng, modelo, inicio, inicio + contas['amplitude'][idx_conta])
+
+    # 4. Destino: nomes apenas para TED/Pix, estabelecimento para compras, 'Interno' no resto
+    destino = np.full(n, 'Interno', dtype=object)
+
+    mascara_compra = idx_tipo == IDX_COMPRA
+    destino[mascara_compra] = np.array(ESTABELECIMENTOS, dtype=object)[
+        rng.integers(0, len(ESTABELECIMENTOS), int(mascara_compra.sum()))
+    ]
+
+    mascara_nome = (idx_tipo == IDX_TED) | (idx_tipo == IDX_PIX)
+    num_nomes = int(mascara_nome.sum())
+    if POOL_DESTINOS is not None:
+        destino[mascara_nome] = amostrar_nomes(rng, POOL_DESTINOS, num_nomes, CDF_DESTINOS)
+    else:
+        destino[mascara_nome] = [fake.name() for _ in range(num_nomes)]
+
+    return {
+        'conta_id': contas['ids'][idx_conta],
+        'tipo': idx_tipo,
+        'valor': valor,
+        'data_hora': data_hora,
+        'destino': destino
+    }
+
+def chunk_para_linhas(colunas, primeiro_id):
+    """Converte o bloco colunar em linhas no esquema do CSV de transações."""
+    n = len(colunas['conta_id'])
+    tipos = np.array(TIPOS_TRANSACAO, dtype=object)[colunas['tipo']]
+
+    return list(zip(
+        range(primeiro_id, primeiro_id + n),
+        colunas['conta_id'].tolist(),
+        tipos.tolist(),
+        colunas['valor'].tolist(),
+        formatar_datas_hora(colunas['data_hora']).tolist(),
+        colunas['destino'].tolist()
+    ))
+
+# --- GERAÇÃO EM CHUNKS ---
+
+class Segmentos:
+    """Transações colunares sorteadas em segmentos fixos de TRANSACOES_POR_SEGMENTO linhas.
+
+    proximas(n) entrega as n linhas seguintes recortando (ou juntando) segmentos, então
+    o sorteio não depende do tamanho dos chunks pedidos. Com semear, cada segmento é
+    semeado pelo seu índice e a leitura pode começar no meio de um (retomada); sem,
+    todos saem do rng dado, em sequência.
+    """
+
+    def __init__(self, contas, total, rng, inicio=0, semear=True):
+        self.contas = contas
+        self.total = total
+        self.rng = rng
+        self.semear = semear
+        self.posicao = inicio
+        self.indice = None
+        self.colunas = None
+
+    def sortear(self, indice):
+        rng_segmento = semear_lote('transacoes', indice, fake) if self.semear else None
+        n = min(TRANSACOES_POR_SEGMENTO, self.total - indice * TRANSACOES_POR_SEGMENTO)
+        self.colunas = gerar_chunk_vetorizado(self.rng if rng_segmento is None else rng_segmento, self.contas, n)
+        self.indice = indice
+
+    def proximas(self, n):
+        partes = []
+        while n > 0:
+            indice, deslocamento = divmod(self.posicao, TRANSACOES_POR_SEGMENTO)
+            if indice != self.indice:
+                self.sortear(indice)
+            tamanho = min(n, len(self.colunas['tipo']) - deslocamento)
+            partes.append({nome: valores[deslocamento:deslocamento + tamanho] for nome, valores in self.colunas.items()})
+            self.posicao += tamanho
+            n -= tamanho
+        if len(partes) == 1:
+            return partes[0]
+        return {nome: np.concatenate([parte[nome] for parte in partes]) for nome in partes[0]}
+
+def chunks_por_linha(contas, num_transacoes, chunk_size, inicio=0, data_maxima=None):
+    """Loop original: uma chamada de gerar_transacao() por linha, entregue em chunks.
+
+    contas: registros.TabelaContas com as contas de referência.
+    inicio: linhas já escritas numa execução anterior (retomada); a numeração continua dali.
+    """
+    dados_chunk = []
+    transacao_id_counter = inicio + 1
+
+    # Com --seed, cada segmento fixo de linhas é semeado pelo seu índice (não o chunk, que
+    # encolhe com pouca RAM); retomando no meio de um segmento, as linhas dele que já
+    # estavam no arquivo são sorteadas de novo e descartadas
+    base = inicio - inicio % TRANSACOES_POR_SEGMENTO
+    if base < inicio and semear_lote('transacoes', base // TRANSACOES_POR_SEGMENTO, fake) is not None:
+        for _ in range(base, inicio):
+            conta = contas.em(random.randrange(len(contas)))
+            gerar_transacao(conta.conta_id, conta.abertura, data_maxima)
+
+    # Loop principal de GERAÇÃO EM CHUNKS
+    for i in range(inicio + 1, num_transacoes + 1):
+
+        if (i - 1) % TRANSACOES_POR_SEGMENTO == 0:
+            semear_lote('transacoes', (i - 1) // TRANSACOES_POR_SEGMENTO, fake)
+
+        # Seleção aleatória de uma conta ID para distribuir as transações
+        # (randrange consome o gerador como random.choice: a saída semeada não muda)
+        conta = contas.em(random.randrange(len(contas)))
+
+        # Gera e formata a linha de transação
+        transacao_linha = gerar_transacao(conta.conta_id, conta.abertura, data_maxima)
+        dados_chunk.append([transacao_id_counter] + transacao_linha)
+        transacao_id_counter += 1
+
+        # Verifica se atingiu o tamanho do CHUNK ou se é a última iteração
+        if i % chunk_size == 0 or i == num_transacoes:
+
+            # 🚀 ENTREGA O BLOCO (arquivo e/ou SQLite)
+            yield dados_chunk
+            dados_chunk = [] # Limpa a lista da memória RAM
+
+            # Feedback de progresso
+            print(f" -> Escritos: {i / 1_000_000:.1f}M registros ({i / num_transacoes * 100:.1f}%)")
+
+def chunks_vetorizado(contas_ref, num_transacoes, chunk_size, rng=None, inicio=0, data_maxima=None, modelo=None):
+    """Gera cada chunk_size como arrays colunares e entrega o bloco de uma vez.
+
+    inicio: linhas já escritas numa execução anterior (retomada); a numeração continua dali.
+    Com --seed, as linhas saem de Segmentos semeados: a saída não depende do chunk_size.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    contas = preparar_contas(contas_ref, data_maxima, modelo)
+    segmentos = Segmentos(contas, num_transacoes, rng, inicio) if com_seed() else None
+
+    escritos = inicio
+    while escritos < num_transacoes:
+        n = min(chunk_size, num_transacoes - escritos)
+
+        colunas = gerar_chunk_vetorizado(rng, contas, n) if segmentos is None else segmentos.proximas(n)
+        yield chunk_para_linhas(colunas, escritos + 1)
+        escritos += n
+
+        print(f" -> Escritos: {escritos / 1_000_000:.1f}M registros ({escritos / num_transacoes * 100:.1f}%)")
@@ -0,0 +1,325 @@
+import argparse
+import csv
+import glob
+import gzip
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from caminhos import CAMINHO_DB, DIRETORIO_TRANSACOES_MENSAIS
+from carga_sqlite import LINHAS_POR_TRANSACAO, preparar_tabela, inserir_linhas, tabela_existe
+from datas import momento_referencia
+from escritores import EscritorCSV, abrir_escritor, caminho_com_formato
+
+# Transações particionadas por mês de data_hora.
+# Arquivos: um por mês em banco_fake/transacoes_mensais/ (TRANSACOES_YYYY_MM.csv,
+# .parquet ou .arrow). SQLite: uma tabela por mês (transacoes_YYYY_MM) com índice
+# (conta_id, data_hora) e um catálogo com o intervalo de cada partição.
+# As consultas por período vão só às partições que o período toca: "últimos 90
+# dias da conta" lê 3 ou 4 meses, não os 10 anos de histórico.
+# No SQLite são tabelas no mesmo banco e não bancos anexados: o ATTACH é limitado
+# a 10 bancos por conexão e o histórico tem ~120 meses.
+
+# --- CONFIGURAÇÃO ---
+COLUNA_DATA_HORA = 4              # Posição de data_hora nas linhas de transação
+PREFIXO_ARQUIVO = 'TRANSACOES_'
+PREFIXO_TABELA = 'transacoes_'
+PADRAO_TABELA = 'transacoes_[0-9][0-9][0-9][0-9]_[0-9][0-9]'   # GLOB do SQLite
+TABELA_CATALOGO = 'particoes_transacoes'
+LINHAS_PENDENTES = 200_000        # Linhas acumuladas antes de descarregar nos arquivos do mês
+BUFFER_PARTICAO = 256 * 1024      # Buffer por arquivo (são ~120 arquivos abertos ao mesmo tempo)
+JANELA_DIAS = 90                  # Consulta típica: últimos 90 dias por conta
+
+# --- CHAVES E INTERVALOS ---
+
+def texto_momento(momento):
+    """Data/instante como texto comparável com data_hora ('YYYY-MM-DD HH:MM:SS')."""
+    if isinstance(momento, datetime):
+        return momento.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(momento, date):
+        return momento.isoformat()
+    return momento
+
+def limites_mes(mes):
+    """Intervalo [início, fim) do mês 'YYYY_MM', como datas 'YYYY-MM-DD'."""
+    ano, numero = int(mes[:4]), int(mes[5:7])
+    seguinte = (ano + 1, 1) if numero == 12 else (ano, numero + 1)
+    return f"{ano:04d}-{numero:02d}-01", f"{seguinte[0]:04d}-{seguinte[1]:02d}-01"
+
+def separar_por_mes(linhas):
+    """Agrupa as linhas do chunk pelo mês de data_hora: {'YYYY_MM': [linhas]}."""
+    grupos = defaultdict(list)
+    for linha in linhas:
+        grupos[linha[COLUNA_DATA_HORA][:7]].append(linha)
+    return {mes.replace('-', '_'): grupo for mes, grupo in grupos.items()}
+
+# --- ARQUIVOS ---
+
+def caminho_particao(diretorio, mes, formato='csv', compressao=None):
+    """Arquivo da partição do mês 'YYYY_MM'."""
+    return caminho_com_formato(os.path.join(diretorio, PREFIXO_ARQUIVO + mes), formato, compressao)
+
+class EscritorParticionado:
+    """Escreve as transações num arquivo por mês de data_hora, abertos sob demanda.
+
+    As linhas de cada mês são acumuladas até LINHAS_PENDENTES no total e então
+    descarregadas juntas: menos escritas pequenas e row groups maiores no Parquet.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_TRANSACOES_MENSAIS, formato='csv', compressao=None, tabela='transacoes'):
+        os.makedirs(diretorio, exist_ok=True)
+        # Partições de uma execução anterior seriam misturadas com as novas
+        for antigo in glob.glob(os.path.join(diretorio, PREFIXO_ARQUIVO + '*')):
+            os.remove(antigo)
+        self.caminho = diretorio
+        self.formato = formato
+        self.compressao = compressao
+        self.tabela = tabela
+        self.escritores = {}
+        self.pendentes = defaultdict(list)
+        self.num_pendentes = 0
+
+    def abrir_particao(self, mes):
+        caminho = caminho_particao(self.caminho, mes, self.formato, self.compressao)
+        if self.formato == 'csv':
+            return EscritorCSV(caminho, self.tabela, compressao=self.compressao, tamanho_buffer=BUFFER_PARTICAO)
+        return abrir_escritor(self.formato, caminho, self.tabela)
+
+    def escrever(self, linhas):
+        for mes, grupo in separar_por_mes(linhas).items():
+            self.pendentes[mes].extend(grupo)
+        self.num_pendentes += len(linhas)
+        if self.num_pendentes >= LINHAS_PENDENTES:
+            self.descarregar()
+
+    def descarregar(self):
+        for mes, grupo in self.pendentes.items():
+            if mes not in self.escritores:
+                self.escritores[mes] = self.abrir_particao(mes)
+            self.escritores[mes].escrever(grupo)
+        self.pendentes.clear()
+        self.num_pendentes = 0
+
+    def fechar(self):
+        self.descarregar()
+        for escritor in self.escritores.values():
+            escritor.fechar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+def arquivos_do_intervalo(diretorio, inicio, fim):
+    """Arquivos de partição cujo mês cruza o intervalo [inicio, fim).
+
+    Mesma poda do catálogo no SQLite: o mês [início, fim) entra se começa antes de fim
+    e termina depois de inicio (com fim no dia 1º, o mês de fim fica de fora).
+    """
+    inicio, fim = texto_momento(inicio), texto_momento(fim)
+    arquivos = []
+    for caminho in sorted(glob.glob(os.path.join(diretorio, PREFIXO_ARQUIVO + '*'))):
+        inicio_mes, fim_mes = limites_mes(os.path.basename(caminho)[len(PREFIXO_ARQUIVO):len(PREFIXO_ARQUIVO) + 7])
+        if inicio_mes < fim and fim_mes > inicio:
+            arquivos.append(caminho)
+    return arquivos
+
+def consultar_arquivos(diretorio, inicio, fim, conta_id=None):
+    """Linhas das partições CSV (ou CSV.gz) no intervalo [inicio, fim), opcionalmente de uma conta."""
+    inicio, fim = texto_momento(inicio), texto_momento(fim)
+    conta = None if conta_id is None else str(conta_id)
+    for caminho in arquivos_do_intervalo(diretorio, inicio, fim):
+        if caminho.endswith('.csv.gz'):
+            f = gzip.open(caminho, 'rt', newline='', encoding='utf-8')
+        elif caminho.endswith('.csv'):
+            f = open(caminho, 'r', newline='', encoding='utf-8')
+        else:
+            raise ValueError(f"'{caminho}': consultar_arquivos só lê partições CSV (use arquivos_do_intervalo).")
+        with f:
+            reader = csv.reader(f)
+            next(reader)
+            for linha in reader:
+                if inicio <= linha[COLUNA_DATA_HORA] < fim and (conta is None or linha[1] == conta):
+                    yield linha
+
+# --- SQLITE ---
+
+def tabelas_particionadas(con):
+    """Tabelas de partição existentes no banco, em ordem de mês."""
+    consulta = "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ? ORDER BY name"
+    return [nome for (nome,) in con.execute(consulta, (PADRAO_TABELA,))]
+
+def carregar_particoes(con, chunks):
+    """Recria as partições mensais e insere os chunks de transações; retorna o total de linhas."""
+    for tabela in tabelas_particionadas(con):
+        con.execute(f"DROP TABLE {tabela}")
+    con.execute(f"DROP TABLE IF EXISTS {TABELA_CATALOGO}")
+    con.execute(f"CREATE TABLE {TABELA_CATALOGO} "
+                "(particao TEXT PRIMARY KEY, tabela TEXT, inicio TEXT, fim TEXT, linhas INTEGER)")
+
+    inicio = time.perf_counter()
+    linhas_por_mes = defaultdict(int)
+    total = 0
+    pendentes = 0
+
+    con.execute("BEGIN")
+    for chunk in chunks:
+        for mes, grupo in separar_por_mes(chunk).items():
+            tabela = PREFIXO_TABELA + mes
+            if mes not in linhas_por_mes:
+                preparar_tabela(con, 'transacoes', tabela)
+            inserir_linhas(con, 'transacoes', grupo, tabela)
+            linhas_por_mes[mes] += len(grupo)
+        total += len(chunk)
+        pendentes += len(chunk)
+
+        if pendentes >= LINHAS_POR_TRANSACAO:
+            con.execute("COMMIT")
+            con.execute("BEGIN")
+            pendentes = 0
+
+    con.executemany(f"INSERT INTO {TABELA_CATALOGO} VALUES (?, ?, ?, ?, ?)", [
+        (mes.replace('_', '-'), PREFIXO_TABELA + mes, *limites_mes(mes), linhas)
+        for mes, linhas in sorted(linhas_por_mes.items())
+    ])
+    con.execute("COMMIT")
+
+    segundos = time.perf_counter() - inicio
+    print(f" -> {len(linhas_por_mes)} partições mensais: {total:,} linhas em {segundos:.1f}s "
+          f"({total / max(segundos, 1e-9):,.0f} linhas/seg)")
+    return total
+
+def indexar_particao(con, tabela):
+    con.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabela}_conta_data ON {tabela} (conta_id, data_hora)")
+
+def indexar_particoes(con):
+    """Índice (conta_id, data_hora) em cada partição (só depois que a carga terminou)."""
+    inicio = time.perf_counter()
+    for tabela in tabelas_particionadas(con):
+        indexar_particao(con, tabela)
+    print(f" -> Índices das partições criados em {time.perf_counter() - inicio:.1f}s")
+
+def anexar_particoes(con, chunks):
+    """Acrescenta transações às partições existentes; meses novos ganham tabela já indexada.
+
+    Os índices das partições existentes são atualizados pelo próprio INSERT.
+    """
+    existentes = set(tabelas_particionadas(con))
+    linhas_por_mes = defaultdict(int)
+    total = 0
+
+    con.execute("BEGIN")
+    for chunk in chunks:
+        for mes, grupo in separar_por_mes(chunk).items():
+            tabela = PREFIXO_TABELA + mes
+            if tabela not in existentes:
+                preparar_tabela(con, 'transacoes', tabela)
+                indexar_particao(con, tabela)
+                existentes.add(tabela)
+            inserir_linhas(con, 'transacoes', grupo, tabela)
+            linhas_por_mes[mes] += len(grupo)
+        total += len(chunk)
+
+    con.executemany(f"INSERT INTO {TABELA_CATALOGO} VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (particao) DO UPDATE SET linhas = linhas + excluded.linhas", [
+        (mes.replace('_', '-'), PREFIXO_TABELA + mes, *limites_mes(mes), linhas)
+        for mes, linhas in sorted(linhas_por_mes.items())
+    ])
+    con.execute("COMMIT")
+    return total
+
+def particoes_do_intervalo(con, inicio, fim):
+    """Tabelas de partição que cruzam o intervalo [inicio, fim) (poda pelo catálogo)."""
+    consulta = f"SELECT tabela FROM {TABELA_CATALOGO} WHERE fim > ? AND inicio < ? ORDER BY particao"
+    return [tabela for (tabela,) in con.execute(consulta, (texto_momento(inicio), texto_momento(fim)))]
+
+def consultar_intervalo(con, inicio, fim, conta_id=None, colunas='*'):
+    """Transações no intervalo [inicio, fim), opcionalmente de uma conta, lendo só as partições tocadas."""
+    inicio, fim = texto_momento(inicio), texto_momento(fim)
+    tabelas = particoes_do_intervalo(con, inicio, fim)
+    if not tabelas:
+        return []
+
+    filtro = "data_hora >= ? AND data_hora < ?"
+    parametros = (inicio, fim)
+    if conta_id is not None:
+        filtro = "conta_id = ? AND " + filtro
+        parametros = (conta_id,) + parametros
+
+    # Uma consulta por partição (o SQLite limita os SELECTs de um UNION ALL a 500); como os
+    # meses são disjuntos e vêm em ordem, juntar os resultados já ordenados mantém a ordem
+    linhas = []
+    for tabela in tabelas:
+        linhas.extend(con.execute(f"SELECT {colunas} FROM {tabela} WHERE {filtro} ORDER BY data_hora", parametros))
+    return linhas
+
+def fim_dos_dados(con):
+    """Instante logo depois da transação mais recente (MAX(data_hora) da partição mais nova).
+
+    É o "agora" das janelas: os dados terminam antes do --as-of da geração, não no relógio.
+    None se não há partições com linhas.
+    """
+    tabelas = tabelas_particionadas(con)
+    if not tabelas:
+        return None
+    ultimo = con.execute(f"SELECT MAX(data_hora) FROM {tabelas[-1]}").fetchone()[0]
+    return None if ultimo is None else datetime.fromisoformat(ultimo) + timedelta(seconds=1)
+
+def ultimos_dias(con, conta_id, dias=JANELA_DIAS, agora=None):
+    """Transações da conta nos últimos `dias` dias até `agora` (padrão: o fim dos dados)."""
+    agora = agora or fim_dos_dados(con) or momento_referencia().replace(microsecond=0)
+    return consultar_intervalo(con, agora - timedelta(days=dias), agora, conta_id)
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+# Uso direto: compara a consulta "últimos N dias da conta" nas partições e na tabela única
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Consulta por período nas partições mensais de transações.')
+    parser.add_argument('--db', default=CAMINHO_DB, help='Arquivo do banco (padrão: %(default)s)')
+    parser.add_argument('--dias', type=int, default=JANELA_DIAS, help='Janela da consulta (padrão: %(default)s)')
+    parser.add_argument('--contas', type=int, default=200, help='Contas consultadas (padrão: %(default)s)')
+    parser.add_argument('--arquivos', action='store_true',
+                        help='Consulta também as partições CSV em ' + DIRETORIO_TRANSACOES_MENSAIS)
+    args = parser.parse_args()
+
+    con = sqlite3.connect(args.db)
+    todas = tabelas_particionadas(con)
+    if not todas:
+        raise SystemExit(f"Nenhuma partição em '{args.db}'. Gere com: python 04_gerar_transacoes.py --particionar --sqlite")
+
+    agora = fim_dos_dados(con) or momento_referencia().replace(microsecond=0)
+    tocadas = particoes_do_intervalo(con, agora - timedelta(days=args.dias), agora)
+    print(f"Últimos {args.dias} dias até {texto_momento(agora)}: {len(tocadas)} de {len(todas)} partições "
+          f"({', '.join(tocadas)})")
+
+    # Contas com movimento recente (da partição mais nova)
+    contas = [c for (c,) in con.execute(f"SELECT DISTINCT conta_id FROM {todas[-1]} LIMIT ?", (args.contas,))]
+
+    inicio = time.perf_counter()
+    linhas = sum(len(ultimos_dias(con, conta, args.dias, agora)) for conta in contas)
+    segundos = time.perf_counter() - inicio
+    print(f" -> Particionado:  {len(contas)} contas, {linhas:,} linhas em {segundos * 1000:.1f} ms "
+          f"({segundos / len(contas) * 1000:.2f} ms/conta)")
+
+    # Mesma consulta na tabela única, se existir (índice só em conta_id: lê o histórico todo da conta)
+    if tabela_existe(con, 'transacoes'):
+        consulta = ("SELECT * FROM transacoes WHERE conta_id = ? AND data_hora >= ? AND data_hora < ? "
+                    "ORDER BY data_hora")
+        janela = (texto_momento(agora - timedelta(days=args.dias)), texto_momento(agora))
+        inicio = time.perf_counter()
+        linhas_unica = sum(len(con.execute(consulta, (conta,) + janela).fetchall()) for conta in contas)
+        segundos_unica = time.perf_counter() - inicio
+        print(f" -> Tabela única:  {len(contas)} contas, {linhas_unica:,} linhas em {segundos_unica * 1000:.1f} ms "
+              f"({segundos_unica / len(contas) * 1000:.2f} ms/conta)")
+
+    if args.arquivos:
+        inicio = time.perf_counter()
+        arquivos = arquivos_do_intervalo(DIRETORIO_TRANSACOES_MENSAIS, agora - timedelta(days=args.dias), agora)
+        linhas = sum(1 for _ in consultar_arquivos(DIRETORIO_TRANSACOES_MENSAIS, agora - timedelta(days=args.dias),
+                                                   agora, contas[0]))
+        print(f" -> Arquivos:      {len(arquivos)} partições lidas para a conta {contas[0]}: "
+              f"{linhas:,} linhas em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    con.close()
@@ -0,0 +1,210 @@
+import argparse
+import time
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+import numpy as np
+from caminhos import ARQUIVO_CLIENTES, ARQUIVO_CONTAS, ARQUIVO_CREDITO, ARQUIVO_TRANSACOES
+from carga_sqlite import carga_em_massa, carregar_tabela, criar_indices, inserir_linhas, preparar_tabela
+from dados_referencia import concatenar_referencias
+from datas import momento_referencia
+from escala import adicionar_argumento_sf, num_clientes, num_transacoes, tamanho_adaptado
+from escrita_assincrona import EscritorAssincrono
+from instrumentacao import adicionar_argumentos_instrumentacao, configurar_instrumentacao, etapa
+from escritores import FORMATOS, abrir_escritor, gravar_chunks
+from manifesto import EscritorComManifesto
+from gerador_clientes import gerar_lote_clientes_segmentado
+from gerador_contas import gerar_lote_contas_segmentado
+from gerador_credito import gerar_lote_credito_segmentado, montar_dados_risco
+from modelo_carga import CARGAS, SKEW_CONTAS, SKEW_DIAS, configurar_carga
+from motor_transacoes import configurar_pool_destinos, chunks_vetorizado
+from reprodutibilidade import (CLIENTES_POR_SEGMENTO, adicionar_argumentos_reprodutibilidade,
+                               configurar_reprodutibilidade, lote_alinhado, parametros_reprodutibilidade)
+
+# Pipeline completo num único processo: clientes -> contas -> crédito -> transações.
+# Cada etapa entrega à seguinte a sua referência colunar (arrays NumPy) em memória,
+# então nada é escrito e relido do disco entre as etapas. Os arquivos de saída são
+# opcionais e gravados em segundo plano; a carga no SQLite também é opcional.
+# Clientes, contas e crédito andam juntos, lote a lote de clientes, com memória limitada.
+
+# --- CONFIGURAÇÃO ---
+# Clientes e transações vêm do fator de escala (--sf); chunk e lote são tetos (encolhem com pouca RAM)
+CHUNK_SIZE = 100_000
+TAMANHO_LOTE = 50_000
+TAMANHO_POOL_NOMES = 50_000
+
+# --- FUNÇÕES ---
+
+class Etapas:
+    """Destinos (arquivo assíncrono e/ou SQLite) e tempos acumulados de cada tabela do pipeline."""
+
+    def __init__(self, args, pilha, con):
+        self.args = args
+        self.pilha = pilha
+        self.con = con
+        self.escritores = {}
+        self.manifestos = []
+        self.tempos = {}
+        self.linhas = {}
+
+    def abrir_arquivo(self, tabela, caminho):
+        """Escritor do arquivo da tabela; em CSV, com manifesto por lote (para comparar execuções)."""
+        if self.args.formato != 'csv':
+            return abrir_escritor(self.args.formato, caminho, tabela)
+        parametros = {**parametros_reprodutibilidade(), 'pipeline': True, 'clientes': self.args.clientes,
+                      'transacoes': self.args.transacoes}
+        escritor = EscritorComManifesto(caminho, tabela, parametros)
+        self.manifestos.append(escritor)
+        return escritor
+
+    def concluir(self):
+        """Marca os manifestos como completos (chamado só se o pipeline terminou sem erro)."""
+        for escritor in self.manifestos:
+            escritor.concluir()
+
+    def abrir(self, tabela, caminho):
+        """Prepara os destinos da tabela antes do primeiro lote."""
+        self.tempos[tabela] = 0.0
+        self.linhas[tabela] = 0
+        if not self.args.sem_arquivos:
+            # O arquivo só é fechado no fim do pipeline: a escrita continua durante as próximas etapas
+            escritor = self.abrir_arquivo(tabela, caminho)
+            self.escritores[tabela] = self.pilha.enter_context(EscritorAssincrono(escritor))
+        if self.con is not None:
+            preparar_tabela(self.con, tabela)
+
+    def entregar(self, tabela, linhas, inicio):
+        """Entrega um lote da tabela e soma o tempo desde inicio (geração + entrega)."""
+        if tabela in self.escritores:
+            self.escritores[tabela].escrever(linhas)
+        if self.con is not None:
+            self.con.execute("BEGIN")
+            inserir_linhas(self.con, tabela, linhas)
+            self.con.execute("COMMIT")
+        self.tempos[tabela] += time.perf_counter() - inicio
+        self.linhas[tabela] += len(linhas)
+
+def relatorio(tempos):
+    """Imprime o tempo e a vazão de cada etapa."""
+    print("\n--- TEMPOS POR ETAPA ---")
+    for etapa, segundos, linhas in tempos:
+        vazao = f"{linhas / max(segundos, 1e-9):>12,.0f} linhas/seg" if linhas else ''
+        print(f" -> {etapa:<20} {segundos:>8.2f}s {linhas:>14,} {vazao}")
+    print(f" -> {'TOTAL':<20} {sum(t[1] for t in tempos):>8.2f}s")
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+def main():
+    parser = argparse.ArgumentParser(description='Executa o pipeline completo num único processo.')
+    adicionar_argumento_sf(parser)
+    parser.add_argument('--clientes', type=int, default=None, help='Número de clientes (padrão: o do --sf)')
+    parser.add_argument('--transacoes', type=int, default=None, help='Número de transações (padrão: o do --sf)')
+    parser.add_argument('--chunk', type=int, default=None,
+                        help=f'Linhas por chunk de transações (padrão: {CHUNK_SIZE:,}, menos se faltar RAM)')
+    parser.add_argument('--lote', type=int, default=None,
+                        help=f'Clientes por lote de clientes/contas/crédito, em múltiplos de {CLIENTES_POR_SEGMENTO:,} '
+                             f'(padrão: {TAMANHO_LOTE:,}, menos se faltar RAM)')
+    parser.add_argument('--pool-nomes', type=int, default=TAMANHO_POOL_NOMES,
+                        help='Tamanho do pool de nomes de destino, 0 desativa (padrão: %(default)s)')
+    parser.add_argument('--carga', choices=CARGAS, default='realista',
+                        help='Modelo de contas e instantes das transações (padrão: %(default)s)')
+    parser.add_argument('--skew-contas', type=float, default=SKEW_CONTAS, help='Expoente Zipf das contas quentes (padrão: %(default)s)')
+    parser.add_argument('--skew-dias', type=float, default=SKEW_DIAS, help='Intensidade dos dias quentes (padrão: %(default)s)')
+    parser.add_argument('--formato', choices=FORMATOS, default='csv', help='Formato dos arquivos (padrão: %(default)s)')
+    parser.add_argument('--sem-arquivos', action='store_true', help='Não escreve os arquivos de saída')
+    parser.add_argument('--sqlite', action='store_true', help='Carrega todas as tabelas no banco SQLite')
+    adicionar_argumentos_reprodutibilidade(parser)
+    adicionar_argumentos_instrumentacao(parser)
+    args = parser.parse_args()
+    configurar_instrumentacao(args)
+    configurar_reprodutibilidade(args)
+
+    if args.clientes is None:
+        args.clientes = num_clientes(args.sf)
+    if args.transacoes is None:
+        args.transacoes = num_transacoes(args.sf)
+    if args.chunk is None:
+        args.chunk = tamanho_adaptado(CHUNK_SIZE, args.transacoes)
+    if args.lote is None:
+        args.lote = tamanho_adaptado(TAMANHO_LOTE, args.clientes)
+    args.lote = lote_alinhado(args.lote)
+
+    if args.sem_arquivos and not args.sqlite:
+        print("Aviso: sem arquivos e sem --sqlite, os dados serão gerados e descartados (útil para medir).")
+
+    if args.pool_nomes > 0:
+        configurar_pool_destinos(args.pool_nomes)
+
+    with ExitStack() as pilha:
+        con = pilha.enter_context(carga_em_massa()) if args.sqlite else None
+        etapas = Etapas(args, pilha, con)
+        etapas.abrir('clientes', ARQUIVO_CLIENTES)
+        etapas.abrir('contas', ARQUIVO_CONTAS)
+        etapas.abrir('credito', ARQUIVO_CREDITO)
+
+        # 1-3. Clientes, contas e crédito lote a lote: cada lote de clientes gera as contas
+        # e o crédito desses mesmos clientes, então só um lote fica em memória por vez.
+        # Das contas guardamos apenas a referência colunar (compacta) para as transações.
+        print(f"[1-3/4] Gerando {args.clientes:,} clientes, contas e crédito em lotes de {args.lote:,}...")
+        referencias_contas = []
+        proxima_conta, proximo_credito = 1, 1
+        rng_credito = np.random.default_rng()
+
+        with etapa('clientes_contas_credito') as medida:
+            for primeiro_id in range(1, args.clientes + 1, args.lote):
+                # Com --seed, cada segmento fixo de clientes de cada etapa é semeado pelo seu
+                # índice (como nos scripts 01-03), qualquer que seja o lote
+                inicio = time.perf_counter()
+                linhas, clientes = gerar_lote_clientes_segmentado(primeiro_id,
+                                                                  min(args.lote, args.clientes - primeiro_id + 1))
+                etapas.entregar('clientes', linhas, inicio)
+
+                inicio = time.perf_counter()
+                linhas, contas = gerar_lote_contas_segmentado(clientes, proxima_conta, primeiro_id - 1)
+                proxima_conta += len(linhas)
+                referencias_contas.append(contas)
+                etapas.entregar('contas', linhas, inicio)
+
+                inicio = time.perf_counter()
+                linhas = gerar_lote_credito_segmentado(montar_dados_risco(clientes, contas), proximo_credito,
+                                                       primeiro_id - 1, rng=rng_credito)
+                proximo_credito += len(linhas)
+                etapas.entregar('credito', linhas, inicio)
+                medida.linhas += len(clientes['cliente_id'])
+
+        tempos = [(tabela, etapas.tempos[tabela], etapas.linhas[tabela]) for tabela in ('clientes', 'contas', 'credito')]
+        contas = concatenar_referencias(referencias_contas)
+        del referencias_contas, linhas
+
+        # 4. Transações (motor vetorizado sobre a referência de contas)
+        with etapa('transacoes') as medida:
+            inicio = time.perf_counter()
+            print(f"[4/4] Gerando {args.transacoes:,} transações...")
+            modelo = configurar_carga(args.carga, args.skew_contas, args.skew_dias)
+            data_maxima = None
+            if args.seed is not None:
+                # Janela até a meia-noite (do --as-of ou de hoje) - 7 dias, como no 04_gerar_transacoes.py
+                data_maxima = datetime.combine(momento_referencia().date(), datetime.min.time()) - timedelta(days=7)
+            chunks = medida.chunks(chunks_vetorizado(contas, args.transacoes, args.chunk,
+                                                     data_maxima=data_maxima, modelo=modelo))
+            if not args.sem_arquivos:
+                escritor = pilha.enter_context(
+                    EscritorAssincrono(etapas.abrir_arquivo('transacoes', ARQUIVO_TRANSACOES))
+                )
+                chunks = gravar_chunks(chunks, escritor)
+            if con is not None:
+                total = carregar_tabela(con, 'transacoes', chunks)
+                criar_indices(con)
+            else:
+                total = sum(len(chunk) for chunk in chunks)
+            tempos.append(('transacoes', time.perf_counter() - inicio, total))
+        etapas.concluir()
+
+        # Fechar a pilha espera as escritas em segundo plano que ainda estão na fila
+        inicio = time.perf_counter()
+    tempos.append(('espera da escrita', time.perf_counter() - inicio, 0))
+
+    relatorio(tempos)
+    print("\n✅ Pipeline concluído.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import bisect
+import os
+import random
+from functools import lru_cache
+import numpy as np
+from faker import Faker
+from caminhos import DIRETORIO_CACHE
+
+# Pool pré-calculado de nomes para o destino de TED/Pix.
+# fake.name() é uma das chamadas mais caras do Faker; geramos o pool uma vez,
+# guardamos em disco (chave: locale, seed, tamanho) e depois só sorteamos índices.
+
+# --- CONFIGURAÇÃO ---
+LOCALE = 'pt_BR'
+TAMANHO_POOL = 50_000
+SEED_POOL = 0
+
+# --- FUNÇÕES ---
+
+def caminho_cache(tamanho, locale, seed):
+    """Arquivo de cache do pool para a combinação (locale, seed, tamanho)."""
+    return os.path.join(DIRETORIO_CACHE, f"nomes_{locale}_s{seed}_n{tamanho}.txt")
+
+def carregar_pool_nomes(tamanho=TAMANHO_POOL, locale=LOCALE, seed=SEED_POOL):
+    """Lê o pool do cache em disco ou gera e grava se ainda não existir."""
+    caminho = caminho_cache(tamanho, locale, seed)
+
+    if os.path.exists(caminho):
+        with open(caminho, 'r', encoding='utf-8') as f:
+            nomes = f.read().splitlines()
+        if len(nomes) == tamanho:
+            return np.array(nomes, dtype=object)
+        print(f"Cache de nomes '{caminho}' incompleto. Regenerando...")
+
+    print(f"Gerando pool de {tamanho:,} nomes ({locale}, seed={seed})...")
+    fake_pool = Faker(locale)
+    fake_pool.seed_instance(seed)
+    nomes = [fake_pool.name() for _ in range(tamanho)]
+
+    # Escrita atômica: outro processo nunca vê o arquivo pela metade
+    os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(nomes))
+    os.replace(temporario, caminho)
+
+    return np.array(nomes, dtype=object)
+
+@lru_cache(maxsize=8)
+def distribuicao_zipf(tamanho, expoente):
+    """Função de distribuição acumulada com peso 1/rank^expoente (None = uniforme)."""
+    if expoente <= 0:
+        return None
+    pesos = 1.0 / np.arange(1, tamanho + 1, dtype=np.float64) ** expoente
+    cdf = np.cumsum(pesos)
+    return cdf / cdf[-1]
+
+def amostrar_nomes(rng, nomes, n, cdf=None):
+    """Sorteia n nomes do pool de uma vez (uniforme ou pela cdf Zipf)."""
+    if cdf is None:
+        indices = rng.integers(0, len(nomes), n)
+    else:
+        indices = np.searchsorted(cdf, rng.random(n), side='right')
+    return nomes[indices]
+
+def sortear_nome(nomes, cdf=None):
+    """Sorteia um único nome do pool com o módulo random (modo por linha)."""
+    if cdf is None:
+        return nomes[random.randrange(len(nomes))]
+    return nomes[min(bisect.bisect_right(cdf, random.random()), len(nomes) - 1)]
@@ -0,0 +1,223 @@
+import argparse
+import sqlite3
+import time
+import numpy as np
+from acumulacao import SomaPorChave, colunas_transacoes
+from caminhos import ARQUIVO_CONTAS, ARQUIVO_TRANSACOES, CAMINHO_DB
+from carga_sqlite import carga_em_massa, ler_csv_em_chunks
+from dados_referencia import carregar_contas
+from datas import SEGUNDOS_DIA, formatar_datas, formatar_datas_hora
+from dominios import SINAL_POR_CODIGO
+from instrumentacao import adicionar_argumentos_instrumentacao, configurar_instrumentacao, etapa
+
+# Livro-razão das contas: aplica as transações como valores com sinal (Depósito
+# soma; Saque, Compra Débito, TED e Pix subtraem) sobre o saldo de abertura, que
+# é o saldo_atual do CONTAS.csv. Uma única passada pelos chunks, em qualquer ordem:
+# o movimento é somado por conta e por (conta, dia) e o saldo corrido de cada dia
+# sai da soma acumulada no final.
+# Resultado em duas tabelas de resumo no SQLite:
+#   saldos_contas  - saldo de abertura, movimento, saldo_atual final (consulta O(1) por conta)
+#   saldos_diarios - movimento e saldo no fim de cada dia com transações, por conta
+# Transações novas (geração incremental) atualizam as tabelas sem reprocessar o histórico.
+
+# --- CONFIGURAÇÃO ---
+DIAS_CHAVE = 1 << 16            # Chave (conta, dia) = índice_conta * DIAS_CHAVE + dia (dias até 2149)
+LINHAS_POR_INSERT = 100_000
+
+ESQUEMAS_RAZAO = {
+    'saldos_contas': """
+        CREATE TABLE saldos_contas (
+            conta_id INTEGER PRIMARY KEY, saldo_abertura REAL, movimento REAL, saldo_atual REAL,
+            num_transacoes INTEGER, ultima_transacao TEXT)""",
+    'saldos_diarios': """
+        CREATE TABLE saldos_diarios (
+            conta_id INTEGER, dia TEXT, movimento REAL, num_transacoes INTEGER, saldo_fim_dia REAL,
+            PRIMARY KEY (conta_id, dia)) WITHOUT ROWID""",
+}
+
+# --- ACUMULAÇÃO ---
+
+class Razao:
+    """Acumula o movimento das transações por conta e por (conta, dia), chunk a chunk."""
+
+    def __init__(self, contas_ref):
+        ordem = np.argsort(contas_ref['conta_id'])
+        self.ids = np.asarray(contas_ref['conta_id'], dtype=np.int64)[ordem]
+        self.abertura = np.asarray(contas_ref['saldo'], dtype=np.float64)[ordem]
+        n = len(self.ids)
+        self.movimento = np.zeros(n)
+        self.num_transacoes = np.zeros(n, dtype=np.int64)
+        self.ultima = np.full(n, -1, dtype=np.int64)
+        self.por_dia = SomaPorChave()   # (conta, dia) -> movimento, nº de transações
+
+    def acumular(self, linhas):
+        """Soma um chunk de linhas de transação (valores como texto do CSV ou tipados do gerador)."""
+        if not linhas:
+            return
+        idx, tipo, valor, segundos = colunas_transacoes(self.ids, linhas)
+        delta = SINAL_POR_CODIGO[tipo] * valor
+
+        n = len(self.ids)
+        self.movimento += np.bincount(idx, weights=delta, minlength=n)
+        self.num_transacoes += np.bincount(idx, minlength=n)
+        np.maximum.at(self.ultima, idx, segundos)
+
+        self.por_dia.adicionar(idx * DIAS_CHAVE + segundos // SEGUNDOS_DIA, delta, np.ones(len(idx)))
+
+    def diarios(self):
+        """Arrays por (conta, dia), ordenados: índice da conta, dia, movimento, nº de transações e saldo no fim do dia."""
+        somas = self.por_dia.somas()
+        if somas is None:
+            vazio = np.zeros(0, dtype=np.int64)
+            return {'idx': vazio, 'dia': vazio, 'movimento': np.zeros(0), 'num': vazio, 'saldo': np.zeros(0)}
+        chave, movimento, num = somas
+        num = num.astype(np.int64)
+        idx, dia = chave // DIAS_CHAVE, chave % DIAS_CHAVE
+
+        # Saldo corrido: soma acumulada reiniciada no primeiro dia de cada conta
+        acumulado = np.cumsum(movimento)
+        inicio_conta = np.r_[True, idx[1:] != idx[:-1]]
+        grupo = np.cumsum(inicio_conta) - 1
+        base = (acumulado - movimento)[inicio_conta]
+        saldo = self.abertura[idx] + acumulado - base[grupo]
+        return {'idx': idx, 'dia': dia, 'movimento': movimento, 'num': num, 'saldo': saldo}
+
+def registrar_chunks(chunks, razao):
+    """Acumula cada chunk no livro-razão e o repassa adiante (ex.: para o arquivo e o SQLite)."""
+    for chunk in chunks:
+        razao.acumular(chunk)
+        yield chunk
+
+# --- TABELAS NO SQLITE ---
+
+def inserir_em_blocos(con, tabela, colunas):
+    """Insere as colunas (listas) em blocos de LINHAS_POR_INSERT."""
+    total = len(colunas[0])
+    marcadores = ', '.join('?' * len(colunas))
+    for inicio in range(0, total, LINHAS_POR_INSERT):
+        fim = inicio + LINHAS_POR_INSERT
+        con.executemany(f"INSERT INTO {tabela} VALUES ({marcadores})", zip(*(c[inicio:fim] for c in colunas)))
+
+def gravar_razao(con, razao):
+    """Recria saldos_contas e saldos_diarios a partir do livro-razão acumulado."""
+    inicio = time.perf_counter()
+    for tabela, ddl in ESQUEMAS_RAZAO.items():
+        con.execute(f"DROP TABLE IF EXISTS {tabela}")
+        con.execute(ddl)
+
+    con.execute("BEGIN")
+    ultima = np.full(len(razao.ids), None, dtype=object)
+    com_transacao = razao.ultima >= 0
+    ultima[com_transacao] = formatar_datas_hora(razao.ultima[com_transacao])
+    inserir_em_blocos(con, 'saldos_contas', [
+        razao.ids.tolist(),
+        np.round(razao.abertura, 2).tolist(),
+        np.round(razao.movimento, 2).tolist(),
+        np.round(razao.abertura + razao.movimento, 2).tolist(),
+        razao.num_transacoes.tolist(),
+        ultima.tolist(),
+    ])
+
+    diarios = razao.diarios()
+    inserir_em_blocos(con, 'saldos_diarios', [
+        razao.ids[diarios['idx']].tolist(),
+        formatar_datas(diarios['dia']).tolist(),
+        np.round(diarios['movimento'], 2).tolist(),
+        diarios['num'].tolist(),
+        np.round(diarios['saldo'], 2).tolist(),
+    ])
+    con.execute("COMMIT")
+
+    print(f" -> Livro-razão: {len(razao.ids):,} contas e {len(diarios['dia']):,} saldos diários "
+          f"em {time.perf_counter() - inicio:.1f}s")
+
+def atualizar_razao(con, razao):
+    """Aplica um livro-razão de transações novas sobre as tabelas existentes (sem reprocessar o histórico).
+
+    Cada (conta, dia) soma o movimento no dia e desloca o saldo desse dia e dos
+    seguintes; um dia novo parte do saldo do último dia anterior (ou da abertura).
+    """
+    inicio = time.perf_counter()
+    diarios = razao.diarios()
+    contas = razao.ids[diarios['idx']].tolist()
+    dias = formatar_datas(diarios['dia']).tolist()
+
+    con.execute("BEGIN")
+    for conta_id, dia, movimento, num in zip(contas, dias, diarios['movimento'].tolist(), diarios['num'].tolist()):
+        existe = con.execute("SELECT 1 FROM saldos_diarios WHERE conta_id = ? AND dia = ?", (conta_id, dia)).fetchone()
+        if existe:
+            con.execute("UPDATE saldos_diarios SET movimento = ROUND(movimento + ?, 2), "
+                        "num_transacoes = num_transacoes + ? WHERE conta_id = ? AND dia = ?",
+                        (movimento, num, conta_id, dia))
+        else:
+            anterior = con.execute(
+                "SELECT saldo_fim_dia FROM saldos_diarios WHERE conta_id = ? AND dia < ? ORDER BY dia DESC LIMIT 1",
+                (conta_id, dia)).fetchone()
+            if anterior is None:
+                anterior = con.execute("SELECT saldo_abertura FROM saldos_contas WHERE conta_id = ?",
+                                       (conta_id,)).fetchone()
+            con.execute("INSERT INTO saldos_diarios VALUES (?, ?, ?, ?, ?)",
+                        (conta_id, dia, round(movimento, 2), num, anterior[0]))
+        con.execute("UPDATE saldos_diarios SET saldo_fim_dia = ROUND(saldo_fim_dia + ?, 2) "
+                    "WHERE conta_id = ? AND dia >= ?", (movimento, conta_id, dia))
+
+    tocadas = np.flatnonzero(razao.num_transacoes)
+    ultima = formatar_datas_hora(razao.ultima[tocadas]).tolist()
+    con.executemany(
+        "UPDATE saldos_contas SET movimento = ROUND(movimento + ?, 2), saldo_atual = ROUND(saldo_atual + ?, 2), "
+        "num_transacoes = num_transacoes + ?, ultima_transacao = MAX(COALESCE(ultima_transacao, ''), ?) "
+        "WHERE conta_id = ?",
+        zip(razao.movimento[tocadas].tolist(), razao.movimento[tocadas].tolist(),
+            razao.num_transacoes[tocadas].tolist(), ultima, razao.ids[tocadas].tolist()))
+    con.execute("COMMIT")
+
+    print(f" -> Livro-razão atualizado: {len(tocadas):,} contas e {len(dias):,} dias "
+          f"em {time.perf_counter() - inicio:.2f}s")
+
+def razao_existe(con):
+    consulta = "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('saldos_contas', 'saldos_diarios')"
+    return con.execute(consulta).fetchone()[0] == 2
+
+def saldo_conta(con, conta_id, dia=None):
+    """Saldo atual da conta ou no fim do dia 'YYYY-MM-DD' (busca pela chave, sem varrer transações)."""
+    if dia is None:
+        linha = con.execute("SELECT saldo_atual FROM saldos_contas WHERE conta_id = ?", (conta_id,)).fetchone()
+        return None if linha is None else linha[0]
+    linha = con.execute("SELECT saldo_fim_dia FROM saldos_diarios WHERE conta_id = ? AND dia <= ? "
+                        "ORDER BY dia DESC LIMIT 1", (conta_id, dia)).fetchone()
+    if linha is None:
+        linha = con.execute("SELECT saldo_abertura FROM saldos_contas WHERE conta_id = ?", (conta_id,)).fetchone()
+    return None if linha is None else linha[0]
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+# Uso direto: monta o livro-razão a partir do TRANSACOES.csv já gerado
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Calcula os saldos das contas a partir das transações.')
+    parser.add_argument('--db', default=CAMINHO_DB, help='Arquivo do banco (padrão: %(default)s)')
+    parser.add_argument('--conta', type=int, default=None, help='Só consulta o saldo desta conta')
+    parser.add_argument('--dia', default=None, help="Com --conta: saldo no fim do dia 'YYYY-MM-DD'")
+    adicionar_argumentos_instrumentacao(parser)
+    args = parser.parse_args()
+    configurar_instrumentacao(args)
+
+    if args.conta is not None:
+        con = sqlite3.connect(args.db)
+        if not razao_existe(con):
+            raise SystemExit("Livro-razão ainda não calculado: rode python razao.py sem --conta.")
+        print(f"Conta {args.conta}: saldo {saldo_conta(con, args.conta, args.dia)}")
+        con.close()
+    else:
+        contas_ref = carregar_contas(ARQUIVO_CONTAS)
+        if contas_ref is not None:
+            print(f"Calculando o livro-razão a partir de '{ARQUIVO_TRANSACOES}'...")
+            inicio = time.perf_counter()
+            razao = Razao(contas_ref)
+            with etapa('razao') as medida:
+                for chunk in medida.chunks(ler_csv_em_chunks(ARQUIVO_TRANSACOES)):
+                    razao.acumular(chunk)
+            print(f" -> Passada pelas transações: {razao.num_transacoes.sum():,} linhas "
+                  f"em {time.perf_counter() - inicio:.1f}s")
+            with etapa('gravar_razao'), carga_em_massa(args.db) as con:
+                gravar_razao(con, razao)
+            print("\n✅ Livro-razão concluído.")
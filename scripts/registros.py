@@ -0,0 +1,170 @@
+import numpy as np
+from datas import dias_para_datetime
+from dominios import STATUS_CREDITO, TIPOS_CONTA
+
+# Camada de registros tipados sobre as referências colunares (dict de arrays).
+# Uma Tabela guarda as colunas como estão (arrays NumPy ou memory-maps do cache) e
+# localiza a linha pelo id: como os ids são 1..N, a posição é id - 1, sem índice
+# auxiliar; ids fora desse padrão caem numa busca binária (arquivos ordenados por id).
+# O acesso por linha devolve uma "view" com __slots__ (tabela + posição, 48 bytes)
+# que lê os campos sob demanda, em vez de um dicionário por registro.
+
+# --- CONFIGURAÇÃO ---
+BLOCO_VERIFICACAO = 1_000_000   # Ids conferidos por vez ao detectar a numeração densa
+
+# --- REGISTROS (VIEWS DE LINHA) ---
+
+class Registro:
+    """View de uma linha da tabela: os campos são lidos das colunas no acesso."""
+    __slots__ = ('tabela', 'posicao')
+
+    def __init__(self, tabela, posicao):
+        self.tabela = tabela
+        self.posicao = posicao
+
+    def __getattr__(self, nome):
+        if nome in Registro.__slots__:
+            raise AttributeError(nome)
+        try:
+            coluna = self.tabela.colunas[nome]
+        except KeyError:
+            raise AttributeError(f"'{type(self).__name__}' não tem o campo '{nome}'") from None
+        return coluna[self.posicao].item()
+
+    def como_dict(self):
+        """Campos da linha como dicionário (valores Python)."""
+        return {nome: coluna[self.posicao].item() for nome, coluna in self.tabela.colunas.items()}
+
+    def __eq__(self, outro):
+        return isinstance(outro, Registro) and self.tabela is outro.tabela and self.posicao == outro.posicao
+
+    def __hash__(self):
+        return hash((id(self.tabela), self.posicao))
+
+    def __repr__(self):
+        campos = ', '.join(f"{nome}={valor!r}" for nome, valor in self.como_dict().items())
+        return f"{type(self).__name__}({campos})"
+
+class Cliente(Registro):
+    __slots__ = ()
+
+    @property
+    def nascimento(self):
+        return dias_para_datetime(self.data_nascimento)
+
+class Conta(Registro):
+    __slots__ = ()
+
+    @property
+    def abertura(self):
+        return dias_para_datetime(self.data_abertura)
+
+    @property
+    def tipo(self):
+        return TIPOS_CONTA[self.tipo_conta]
+
+class PerfilRisco(Registro):
+    __slots__ = ()
+
+    @property
+    def nascimento(self):
+        return dias_para_datetime(self.data_nascimento)
+
+class Credito(Registro):
+    __slots__ = ()
+
+    @property
+    def aprovacao(self):
+        return dias_para_datetime(self.data_aprovacao)
+
+    @property
+    def situacao(self):
+        return STATUS_CREDITO[self.status]
+
+# --- TABELAS ---
+
+def ids_densos(ids):
+    """True se os ids são exatamente 1..N, em ordem (conferido em blocos, sem array temporário grande)."""
+    for inicio in range(0, len(ids), BLOCO_VERIFICACAO):
+        bloco = ids[inicio:inicio + BLOCO_VERIFICACAO]
+        if not np.array_equal(bloco, np.arange(inicio + 1, inicio + 1 + len(bloco))):
+            return False
+    return True
+
+class Tabela:
+    """Colunas de uma entidade indexadas pelo id (chave), com acesso por linha via registro."""
+    chave = None
+    registro = Registro
+
+    def __init__(self, colunas):
+        self.colunas = colunas
+        self.ids = colunas[self.chave]
+        self.denso = ids_densos(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return (self.registro(self, posicao) for posicao in range(len(self.ids)))
+
+    def __contains__(self, id_):
+        try:
+            self.posicao(id_)
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, id_):
+        return self.registro(self, self.posicao(id_))
+
+    def em(self, posicao):
+        """Registro da posicao-ésima linha (0..N-1)."""
+        return self.registro(self, posicao)
+
+    def coluna(self, nome):
+        return self.colunas[nome]
+
+    def posicao(self, id_):
+        """Linha do id; KeyError se não existir."""
+        if self.denso:
+            if 1 <= id_ <= len(self.ids):
+                return int(id_) - 1
+            raise KeyError(id_)
+        posicao = int(np.searchsorted(self.ids, id_))
+        if posicao < len(self.ids) and self.ids[posicao] == id_:
+            return posicao
+        raise KeyError(id_)
+
+    def posicoes(self, ids):
+        """Linhas de um array de ids, de uma vez; KeyError se algum não existir."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if self.denso:
+            posicoes = ids - 1
+            validos = (posicoes >= 0) & (posicoes < len(self.ids))
+        else:
+            posicoes = np.searchsorted(self.ids, ids)
+            validos = posicoes < len(self.ids)
+            validos[validos] = self.ids[posicoes[validos]] == ids[validos]
+        if not validos.all():
+            raise KeyError(int(ids[~validos][0]))
+        return posicoes
+
+    def valores(self, nome, ids):
+        """Coluna `nome` para um array de ids (gather vetorizado)."""
+        return self.colunas[nome][self.posicoes(ids)]
+
+class TabelaClientes(Tabela):
+    chave = 'cliente_id'
+    registro = Cliente
+
+class TabelaContas(Tabela):
+    chave = 'conta_id'
+    registro = Conta
+
+class TabelaRisco(Tabela):
+    chave = 'cliente_id'
+    registro = PerfilRisco
+
+class TabelaCreditos(Tabela):
+    chave = 'credito_id'
+    registro = Credito
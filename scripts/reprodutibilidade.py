@@ -0,0 +1,76 @@
+import argparse
+import random
+from datetime import date
+import numpy as np
+from datas import configurar_data_referencia
+
+# Geração reprodutível: --seed fixa os geradores aleatórios e --as-of fixa o "hoje"
+# de todas as janelas de datas (idades, aberturas de conta, aprovações, transações).
+# Cada lote/chunk é semeado sozinho a partir de (seed, etapa, índice do lote), e não
+# do estado deixado pelo lote anterior. Assim o lote N de uma execução é igual ao
+# lote N de qualquer outra com os mesmos parâmetros, e um lote já gravado (conferido
+# pelo manifesto) pode ser pulado sem mudar os seguintes.
+# O lote semeado é um segmento de tamanho fixo (CLIENTES_POR_SEGMENTO clientes em
+# 01-03, TRANSACOES_POR_SEGMENTO linhas no 04), separado do lote/chunk de escrita:
+# este encolhe com pouca RAM, mas só recorta (ou agrupa) segmentos, então a mesma
+# seed gera os mesmos bytes em qualquer máquina.
+# No --incremental o "índice" é o primeiro transacao_id novo (a marca d'água + 1):
+# cada dia anexado tem a sua semente, em vez de repetir o feed do dia anterior.
+
+# --- CONFIGURAÇÃO ---
+ETAPAS = {'clientes': 1, 'contas': 2, 'credito': 3, 'transacoes': 4, 'incremental': 5}
+CLIENTES_POR_SEGMENTO = 1_000          # Igual ao escala.MINIMO_CHUNK: o lote adaptado nunca fica abaixo de um segmento
+TRANSACOES_POR_SEGMENTO = 100_000      # Igual ao CHUNK_SIZE padrão: com RAM folgada, cada chunk é um segmento
+
+# Estado configurado por configurar_reprodutibilidade() (padrão: aleatório e relógio)
+SEED = None
+AS_OF = None
+
+def ler_data(texto):
+    """Tipo do argparse para --as-of: data YYYY-MM-DD."""
+    try:
+        return date.fromisoformat(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida: '{texto}' (use YYYY-MM-DD)") from None
+
+def adicionar_argumentos_reprodutibilidade(parser):
+    """Acrescenta --seed e --as-of ao parser do script."""
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Semente global: mesma seed e mesmos parâmetros geram os mesmos arquivos')
+    parser.add_argument('--as-of', type=ler_data, default=None, metavar='YYYY-MM-DD',
+                        help='Data de referência no lugar de hoje (padrão: o relógio)')
+
+def configurar_reprodutibilidade(args):
+    """Ativa a seed e a data de referência pedidas na linha de comando."""
+    global SEED, AS_OF
+    SEED = args.seed
+    AS_OF = args.as_of
+    configurar_data_referencia(args.as_of)
+    if SEED is not None:
+        print(f" -> Geração reprodutível: seed={SEED}, as-of={AS_OF.isoformat() if AS_OF else 'hoje'}")
+
+def parametros_reprodutibilidade():
+    """Seed e data de referência, para os manifestos (data de hoje quando não há --as-of)."""
+    return {'seed': SEED, 'as_of': (AS_OF or date.today()).isoformat()}
+
+def com_seed():
+    """True com --seed: a geração sai dos segmentos semeados."""
+    return SEED is not None
+
+def lote_alinhado(tamanho):
+    """Lote de clientes arredondado para baixo em segmentos inteiros (no mínimo um)."""
+    return max(CLIENTES_POR_SEGMENTO, tamanho - tamanho % CLIENTES_POR_SEGMENTO)
+
+def semear_lote(etapa, indice, *fakes):
+    """Semeia random (e as instâncias Faker dadas) para o lote `indice` da etapa.
+
+    Retorna o Generator NumPy do lote, ou None sem --seed (nada é semeado).
+    """
+    if SEED is None:
+        return None
+    semente = np.random.SeedSequence([SEED, ETAPAS[etapa], indice])
+    semente_int = int(semente.generate_state(1)[0])
+    random.seed(semente_int)
+    for fake in fakes:
+        fake.seed_instance(semente_int)
+    return np.random.default_rng(semente)
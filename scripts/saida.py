@@ -0,0 +1,26 @@
+from contextlib import ExitStack
+from carga_sqlite import carga_em_massa, carregar_tabela
+from escritores import abrir_escritor, gravar_chunks
+
+# Destino dos lotes de uma tabela: arquivo (qualquer formato de escritores.py),
+# SQLite, ou ambos. Os lotes são consumidos um a um, sem materializar a tabela.
+
+# --- FUNÇÕES ---
+
+def publicar(chunks, tabela, caminho, formato='csv', escrever_arquivo=True, carregar_sqlite=False):
+    """Leva os chunks ao arquivo e/ou ao SQLite; retorna (total de linhas, caminho do arquivo ou None)."""
+    caminho_final = None
+
+    with ExitStack() as pilha:
+        if escrever_arquivo:
+            escritor = pilha.enter_context(abrir_escritor(formato, caminho, tabela))
+            caminho_final = escritor.caminho
+            chunks = gravar_chunks(chunks, escritor)
+
+        if carregar_sqlite:
+            con = pilha.enter_context(carga_em_massa())
+            total = carregar_tabela(con, tabela, chunks)
+        else:
+            total = sum(len(chunk) for chunk in chunks)
+
+    return total, caminho_final
@@ -0,0 +1,485 @@
+import argparse
+import asyncio
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import date, timedelta
+from urllib.parse import parse_qsl, urlsplit
+from caminhos import CAMINHO_DB
+from carga_sqlite import tabela_existe
+from particoes import consultar_intervalo, tabelas_particionadas
+from razao import razao_existe
+
+# Serviço local de consultas (HTTP/JSON sobre asyncio) em cima do banco_fake.db,
+# para vários notebooks consultarem ao mesmo tempo sem cada um abrir a sua conexão
+# e refazer as mesmas agregações.
+# As consultas rodam num pool fixo de conexões somente leitura (modo WAL: leitores
+# não bloqueiam a carga, e a carga não bloqueia os leitores), cada uma numa thread
+# do executor, para o laço de eventos seguir atendendo. Os resultados ficam num
+# cache LRU com TTL; pedidos iguais simultâneos esperam a mesma consulta em vez de
+# repeti-la. O cache é esvaziado quando o banco muda: PRAGMA data_version, lido a
+# cada INTERVALO_VERSAO, muda a cada COMMIT de outra conexão (carga_sqlite.py,
+# --sqlite dos geradores, --incremental, ingestao.py, razao.py, agregados.py).
+#
+# Rotas (GET, parâmetros na query string; respostas em JSON):
+#   /extrato?conta_id=N[&inicio=YYYY-MM-DD][&fim=YYYY-MM-DD][&limite=N]
+#   /posicao_cliente?cliente_id=N
+#   /credito_segmento?segmento=ocupacao|estado|faixa_renda[&status=...]
+#   /estatisticas  (cache, pool e versão do banco; nunca em cache)
+
+# --- CONFIGURAÇÃO ---
+HOST = '127.0.0.1'
+PORTA = 8765
+CONEXOES = 4                   # Conexões somente leitura (e threads do executor)
+CACHE_ITENS = 1024             # Resultados guardados (0 desliga o cache)
+CACHE_TTL = 300.0              # Segundos de validade de cada resultado
+INTERVALO_VERSAO = 0.5         # Segundos entre as leituras do PRAGMA data_version
+MMAP_BYTES = 256 * 1024 ** 2   # Leitura por memory-map nas conexões do pool
+LIMITE_EXTRATO = 100
+LIMITE_MAXIMO = 5000
+
+# Índices usados pelas rotas, criados na subida do serviço se faltarem
+INDICES_SERVICO = {
+    'idx_trans_conta_id': ('transacoes', 'conta_id'),
+    'idx_contas_cliente_id': ('contas', 'cliente_id'),
+    'idx_credito_cliente_id': ('credito', 'cliente_id'),
+}
+
+FAIXA_RENDA = """CASE
+        WHEN cl.renda_mensal < 2000 THEN 'ate_2k'
+        WHEN cl.renda_mensal < 5000 THEN '2k_5k'
+        WHEN cl.renda_mensal < 10000 THEN '5k_10k'
+        WHEN cl.renda_mensal < 20000 THEN '10k_20k'
+        ELSE 'acima_20k'
+    END"""
+SEGMENTOS = {'ocupacao': 'cl.ocupacao', 'estado': 'cl.estado', 'faixa_renda': FAIXA_RENDA}
+
+MENSAGENS_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  500: 'Internal Server Error'}
+
+# --- ERROS ---
+
+class ParametroInvalido(Exception):
+    pass
+
+class NaoEncontrado(Exception):
+    pass
+
+# --- PARÂMETROS ---
+
+def inteiro(parametros, nome, padrao=None, maximo=None):
+    """Parâmetro inteiro positivo da query string (obrigatório se não houver padrão)."""
+    if nome not in parametros:
+        if padrao is None:
+            raise ParametroInvalido(f"parâmetro '{nome}' é obrigatório")
+        return padrao
+    try:
+        valor = int(parametros[nome])
+    except ValueError:
+        raise ParametroInvalido(f"'{nome}' precisa ser inteiro") from None
+    if valor <= 0:
+        raise ParametroInvalido(f"'{nome}' precisa ser positivo")
+    return valor if maximo is None else min(valor, maximo)
+
+def data_parametro(parametros, nome):
+    """Parâmetro de data YYYY-MM-DD (None se ausente)."""
+    if nome not in parametros:
+        return None
+    try:
+        return date.fromisoformat(parametros[nome])
+    except ValueError:
+        raise ParametroInvalido(f"'{nome}' precisa ser uma data YYYY-MM-DD") from None
+
+def escolha(parametros, nome, opcoes, padrao=None):
+    valor = parametros.get(nome, padrao)
+    if valor not in opcoes:
+        raise ParametroInvalido(f"'{nome}' precisa ser um de: {', '.join(opcoes)}")
+    return valor
+
+# --- CONSULTAS (executadas nas threads do pool, cada uma com a sua conexão) ---
+
+def dicionarios(cursor):
+    """Linhas do cursor como dicionários {coluna: valor}."""
+    colunas = [descricao[0] for descricao in cursor.description]
+    return [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+
+def extrato(con, parametros):
+    """Dados e saldo da conta e as transações mais recentes (opcionalmente num período [inicio, fim])."""
+    conta_id = inteiro(parametros, 'conta_id')
+    limite = inteiro(parametros, 'limite', LIMITE_EXTRATO, LIMITE_MAXIMO)
+    inicio, fim = data_parametro(parametros, 'inicio'), data_parametro(parametros, 'fim')
+
+    contas = dicionarios(con.execute(
+        "SELECT conta_id, cliente_id, tipo_conta, saldo_atual AS saldo_abertura, data_abertura "
+        "FROM contas WHERE conta_id = ?", (conta_id,)))
+    if not contas:
+        raise NaoEncontrado(f"conta {conta_id} não existe")
+    conta = contas[0]
+    if razao_existe(con):
+        linha = con.execute("SELECT saldo_atual FROM saldos_contas WHERE conta_id = ?", (conta_id,)).fetchone()
+        conta['saldo_atual'] = None if linha is None else linha[0]
+
+    # fim é inclusivo (o dia inteiro); data_hora é texto comparável 'YYYY-MM-DD HH:MM:SS'
+    fim_exclusivo = None if fim is None else fim + timedelta(days=1)
+    colunas = 'transacao_id, tipo, valor, data_hora, destino'
+    if tabela_existe(con, 'transacoes'):
+        filtro, valores = "conta_id = ?", [conta_id]
+        if inicio is not None:
+            filtro, valores = filtro + " AND data_hora >= ?", valores + [inicio.isoformat()]
+        if fim_exclusivo is not None:
+            filtro, valores = filtro + " AND data_hora < ?", valores + [fim_exclusivo.isoformat()]
+        transacoes = dicionarios(con.execute(
+            f"SELECT {colunas} FROM transacoes WHERE {filtro} ORDER BY data_hora DESC, transacao_id DESC LIMIT ?",
+            valores + [limite]))
+    elif tabelas_particionadas(con):
+        # Sem a tabela única, o período diz quais partições mensais ler
+        if inicio is None or fim is None:
+            raise ParametroInvalido("com transações particionadas, informe 'inicio' e 'fim'")
+        linhas = consultar_intervalo(con, inicio, fim_exclusivo, conta_id, colunas)
+        chaves = colunas.split(', ')
+        transacoes = [dict(zip(chaves, linha)) for linha in reversed(linhas[-limite:])]
+    else:
+        transacoes = []
+
+    return {'conta': conta, 'transacoes': transacoes}
+
+def posicao_cliente(con, parametros):
+    """Cliente, contas com saldo (do livro-razão, se existir) e crédito por status."""
+    cliente_id = inteiro(parametros, 'cliente_id')
+    clientes = dicionarios(con.execute(
+        "SELECT cliente_id, nome_completo, ocupacao, renda_mensal, cidade, estado FROM clientes WHERE cliente_id = ?",
+        (cliente_id,)))
+    if not clientes:
+        raise NaoEncontrado(f"cliente {cliente_id} não existe")
+
+    if razao_existe(con):
+        contas = dicionarios(con.execute(
+            "SELECT ct.conta_id, ct.tipo_conta, ct.data_abertura, ct.saldo_atual AS saldo_abertura, "
+            "sc.saldo_atual, sc.num_transacoes, sc.ultima_transacao "
+            "FROM contas ct LEFT JOIN saldos_contas sc ON sc.conta_id = ct.conta_id "
+            "WHERE ct.cliente_id = ? ORDER BY ct.conta_id", (cliente_id,)))
+    else:
+        contas = dicionarios(con.execute(
+            "SELECT conta_id, tipo_conta, data_abertura, saldo_atual FROM contas "
+            "WHERE cliente_id = ? ORDER BY conta_id", (cliente_id,)))
+
+    credito = dicionarios(con.execute(
+        "SELECT status, COUNT(*) AS operacoes, ROUND(SUM(valor_emprestado), 2) AS valor, "
+        "MAX(data_aprovacao) AS ultima_aprovacao FROM credito WHERE cliente_id = ? GROUP BY status ORDER BY status",
+        (cliente_id,)))
+
+    return {
+        'cliente': clientes[0],
+        'contas': contas,
+        'saldo_total': round(sum(conta['saldo_atual'] or 0.0 for conta in contas), 2),
+        'credito': credito,
+    }
+
+def credito_segmento(con, parametros):
+    """Operações de crédito por segmento de cliente e status: quantidade, valor e taxa média."""
+    segmento = escolha(parametros, 'segmento', list(SEGMENTOS), 'ocupacao')
+    filtro, valores = '', ()
+    if 'status' in parametros:
+        filtro, valores = "WHERE cr.status = ?", (parametros['status'],)
+
+    linhas = con.execute(f"""
+        SELECT {SEGMENTOS[segmento]} AS segmento, cr.status, COUNT(*), SUM(cr.valor_emprestado), AVG(cr.taxa_juros)
+        FROM credito cr
+        JOIN clientes cl ON cl.cliente_id = cr.cliente_id
+        {filtro}
+        GROUP BY segmento, cr.status
+        ORDER BY segmento, cr.status""", valores).fetchall()
+
+    segmentos = OrderedDict()
+    for nome, status, operacoes, valor, taxa in linhas:
+        item = segmentos.setdefault(nome, {'segmento': nome, 'operacoes': 0, 'valor': 0.0, 'por_status': {}})
+        item['operacoes'] += operacoes
+        item['valor'] += valor
+        item['por_status'][status] = {'operacoes': operacoes, 'valor': round(valor, 2), 'taxa_media': round(taxa, 4)}
+    for item in segmentos.values():
+        inadimplente = item['por_status'].get('Inadimplente', {}).get('valor', 0.0)
+        item['inadimplencia'] = round(inadimplente / item['valor'], 4) if item['valor'] else 0.0
+        item['valor'] = round(item['valor'], 2)
+
+    return {'segmento': segmento, 'segmentos': list(segmentos.values())}
+
+ROTAS = {
+    '/extrato': extrato,
+    '/posicao_cliente': posicao_cliente,
+    '/credito_segmento': credito_segmento,
+}
+
+# --- BANCO ---
+
+def preparar_banco(caminho_db):
+    """Põe o banco em modo WAL (persistente no arquivo) e cria os índices das rotas que faltarem."""
+    with closing(sqlite3.connect(caminho_db, isolation_level=None)) as con:
+        modo = con.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        if modo != 'wal':
+            print(f"Aviso: o banco ficou em journal_mode={modo} (outro processo com o banco aberto?).")
+        for indice, (tabela, coluna) in INDICES_SERVICO.items():
+            if tabela_existe(con, tabela):
+                existia = con.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                                      (indice,)).fetchone()
+                if existia is None:
+                    inicio = time.perf_counter()
+                    con.execute(f"CREATE INDEX IF NOT EXISTS {indice} ON {tabela} ({coluna})")
+                    print(f" -> Índice {indice} criado em {time.perf_counter() - inicio:.1f}s")
+
+def abrir_somente_leitura(caminho_db):
+    """Conexão de leitura para uso numa thread do pool (uma consulta por vez)."""
+    con = sqlite3.connect(f"file:{caminho_db}?mode=ro", uri=True, check_same_thread=False)
+    con.execute("PRAGMA query_only = 1")
+    con.execute(f"PRAGMA mmap_size = {MMAP_BYTES}")
+    return con
+
+class PoolConexoes:
+    """Conexões somente leitura emprestadas uma a uma; a consulta roda no executor, fora do laço de eventos."""
+
+    def __init__(self, caminho_db, tamanho=CONEXOES):
+        self.tamanho = tamanho
+        self.executor = ThreadPoolExecutor(max_workers=tamanho, thread_name_prefix='consulta')
+        self.livres = asyncio.Queue()
+        for _ in range(tamanho):
+            self.livres.put_nowait(abrir_somente_leitura(caminho_db))
+        self.espera = 0.0   # Tempo somado esperando uma conexão livre
+
+    async def executar(self, funcao, *argumentos):
+        inicio = time.perf_counter()
+        con = await self.livres.get()
+        self.espera += time.perf_counter() - inicio
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, funcao, con, *argumentos)
+        finally:
+            self.livres.put_nowait(con)
+
+    def fechar(self):
+        self.executor.shutdown()
+        while not self.livres.empty():
+            self.livres.get_nowait().close()
+
+# --- CACHE ---
+
+class CacheLRU:
+    """Resultados por chave, em ordem de uso, com validade (TTL) e limite de itens.
+
+    obter() junta pedidos simultâneos da mesma chave: só o primeiro calcula, os
+    outros esperam o mesmo resultado. limpar() descarta tudo (o banco mudou).
+    """
+
+    def __init__(self, itens=CACHE_ITENS, ttl=CACHE_TTL):
+        self.itens = itens
+        self.ttl = ttl
+        self.dados = OrderedDict()
+        self.em_andamento = {}
+        self.acertos = 0
+        self.falhas = 0
+        self.compartilhados = 0
+        self.expirados = 0
+        self.limpezas = 0
+
+    async def obter(self, chave, calcular):
+        if self.itens <= 0:
+            self.falhas += 1
+            return await calcular()
+
+        item = self.dados.get(chave)
+        if item is not None:
+            validade, valor = item
+            if validade > time.monotonic():
+                self.dados.move_to_end(chave)
+                self.acertos += 1
+                return valor
+            del self.dados[chave]
+            self.expirados += 1
+
+        if chave in self.em_andamento:
+            self.compartilhados += 1
+            return await asyncio.shield(self.em_andamento[chave])
+
+        self.falhas += 1
+        futuro = asyncio.get_running_loop().create_future()
+        self.em_andamento[chave] = futuro
+        geracao = self.limpezas
+        try:
+            valor = await calcular()
+        except Exception as e:
+            futuro.set_exception(e)
+            futuro.exception()   # Marca como lida: quem não esperava não gera aviso
+            raise
+        finally:
+            del self.em_andamento[chave]
+        futuro.set_result(valor)
+
+        # Um resultado calculado antes de uma limpeza pode ser de antes da mudança no banco
+        if geracao == self.limpezas:
+            self.dados[chave] = (time.monotonic() + self.ttl, valor)
+            if len(self.dados) > self.itens:
+                self.dados.popitem(last=False)
+        return valor
+
+    def limpar(self):
+        self.dados.clear()
+        self.limpezas += 1
+
+    def estatisticas(self):
+        consultas = self.acertos + self.falhas + self.compartilhados
+        return {
+            'itens': len(self.dados),
+            'capacidade': self.itens,
+            'ttl': self.ttl,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'compartilhados': self.compartilhados,
+            'expirados': self.expirados,
+            'invalidacoes': self.limpezas,
+            'taxa_acerto': round((self.acertos + self.compartilhados) / consultas, 4) if consultas else 0.0,
+        }
+
+# --- SERVIÇO ---
+
+class ServicoConsultas:
+    """Servidor HTTP/1.1 mínimo (GET, keep-alive) que despacha as rotas para o pool via cache."""
+
+    def __init__(self, caminho_db, conexoes=CONEXOES, cache_itens=CACHE_ITENS, cache_ttl=CACHE_TTL):
+        self.caminho_db = caminho_db
+        self.conexoes = conexoes
+        self.cache = CacheLRU(cache_itens, cache_ttl)
+        self.pool = None
+        self.vigia = None
+        self.versao = None
+        self.requisicoes = 0
+        self.erros = 0
+        self.inicio = time.monotonic()
+
+    # --- Versão do banco ---
+
+    def ler_versao(self):
+        return self.vigia.execute("PRAGMA data_version").fetchone()[0]
+
+    async def vigiar_versao(self):
+        """Esvazia o cache quando outra conexão grava no banco."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(INTERVALO_VERSAO)
+            versao = await loop.run_in_executor(self.pool.executor, self.ler_versao)
+            if versao != self.versao:
+                self.versao = versao
+                self.cache.limpar()
+                print(" -> Banco alterado: cache invalidado")
+
+    # --- HTTP ---
+
+    async def responder(self, metodo, alvo):
+        """(status, corpo) da requisição."""
+        if metodo != 'GET':
+            return 405, {'erro': 'só GET é aceito'}
+        partes = urlsplit(alvo)
+        parametros = dict(parse_qsl(partes.query))
+        if partes.path == '/estatisticas':
+            return 200, self.estatisticas()
+        funcao = ROTAS.get(partes.path)
+        if funcao is None:
+            return 404, {'erro': f"rota desconhecida: {partes.path}", 'rotas': list(ROTAS) + ['/estatisticas']}
+
+        chave = (partes.path, tuple(sorted(parametros.items())))
+        try:
+            return 200, await self.cache.obter(chave, lambda: self.pool.executar(funcao, parametros))
+        except ParametroInvalido as e:
+            return 400, {'erro': str(e)}
+        except NaoEncontrado as e:
+            return 404, {'erro': str(e)}
+        except Exception as e:
+            print(f"ERRO em {alvo}: {e!r}")
+            return 500, {'erro': str(e)}
+
+    async def atender(self, leitor, escritor):
+        """Uma conexão de cliente: várias requisições em sequência enquanto houver keep-alive."""
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                try:
+                    metodo, alvo, versao = linha.decode('latin-1').split()
+                except ValueError:
+                    break
+                cabecalhos = {}
+                while True:
+                    linha = await leitor.readline()
+                    if linha in (b'\r\n', b'\n', b''):
+                        break
+                    nome, _, valor = linha.decode('latin-1').partition(':')
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                status, corpo = await self.responder(metodo, alvo)
+                self.requisicoes += 1
+                if status != 200:
+                    self.erros += 1
+                manter = versao == 'HTTP/1.1' and cabecalhos.get('connection', '').lower() != 'close'
+                dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+                escritor.write(
+                    f"HTTP/1.1 {status} {MENSAGENS_HTTP[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(dados)}\r\n"
+                    f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n".encode('latin-1') + dados)
+                await escritor.drain()
+                if not manter or 'content-length' in cabecalhos:
+                    break   # Requisição com corpo não é esperada: fecha em vez de ler o corpo
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    def estatisticas(self):
+        return {
+            'banco': self.caminho_db,
+            'versao_dados': self.versao,
+            'requisicoes': self.requisicoes,
+            'erros': self.erros,
+            'conexoes': self.conexoes,
+            'espera_conexao_s': round(self.pool.espera, 3),
+            'no_ar_s': round(time.monotonic() - self.inicio, 1),
+            'cache': self.cache.estatisticas(),
+        }
+
+    async def servir(self, host=HOST, porta=PORTA):
+        self.pool = PoolConexoes(self.caminho_db, self.conexoes)
+        self.vigia = abrir_somente_leitura(self.caminho_db)
+        self.versao = self.ler_versao()
+        vigia = asyncio.create_task(self.vigiar_versao())
+        servidor = await asyncio.start_server(self.atender, host, porta)
+        print(f"Servindo '{self.caminho_db}' em http://{host}:{porta} ({self.conexoes} conexões, "
+              f"cache de {self.cache.itens} itens, TTL {self.cache.ttl:g}s). Ctrl+C encerra.")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            vigia.cancel()
+            self.pool.fechar()
+            self.vigia.close()
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serviço HTTP/JSON de consultas ao banco, com pool e cache.')
+    parser.add_argument('--db', default=CAMINHO_DB, help='Arquivo do banco (padrão: %(default)s)')
+    parser.add_argument('--host', default=HOST, help='Endereço (padrão: %(default)s)')
+    parser.add_argument('--porta', type=int, default=PORTA, help='Porta (padrão: %(default)s)')
+    parser.add_argument('--conexoes', type=int, default=CONEXOES,
+                        help='Conexões somente leitura no pool (padrão: %(default)s)')
+    parser.add_argument('--cache', type=int, default=CACHE_ITENS,
+                        help='Resultados no cache LRU, 0 desliga (padrão: %(default)s)')
+    parser.add_argument('--ttl', type=float, default=CACHE_TTL,
+                        help='Validade de cada resultado no cache, em segundos (padrão: %(default)s)')
+    args = parser.parse_args()
+
+    preparar_banco(args.db)
+    servico = ServicoConsultas(args.db, args.conexoes, args.cache, args.ttl)
+    try:
+        asyncio.run(servico.servir(args.host, args.porta))
+    except KeyboardInterrupt:
+        print(f"\nEncerrado após {servico.requisicoes:,} requisições.")
@@ -0,0 +1,98 @@
+import argparse
+import os
+import subprocess
+import sys
+from escritores import EscritorCSV
+from gerador_clientes import lotes_clientes
+from gerador_contas import gerar_lote_contas
+from gerador_credito import gerar_lote_credito, montar_dados_risco
+from instrumentacao import pico_rss_kb, zerar_pico_rss
+
+# Teste de memória da API em lotes: gera clientes, contas e crédito para 12 mil e
+# para 5 milhões de clientes (cada volume num subprocesso novo) e compara o pico de
+# RSS. Com os lotes a memória não pode crescer com NUM_CLIENTES.
+# O RSS sobe nos primeiros ~25 lotes e depois fica plano: são os buffers de 8 MB
+# dos três EscritorCSV (TAMANHO_BUFFER), cujas páginas só passam a ocupar memória
+# quando o buffer enche pela primeira vez. Para que o menor volume não seja medido
+# antes disso, cada subprocesso abre os escritores, gera AQUECIMENTO clientes, zera
+# o pico de RSS e só então gera o volume medido, com os mesmos escritores.
+# Os dados são escritos em os.devnull: o teste mede a geração, não o disco.
+
+# --- CONFIGURAÇÃO DE TESTE ---
+VOLUMES = [12_000, 5_000_000]
+TAMANHO_LOTE = 10_000   # Menor que o menor volume: todos os volumes enchem pelo menos um lote
+TOLERANCIA = 0.20   # Crescimento máximo aceito do pico de RSS entre o menor e o maior volume
+AQUECIMENTO = 300_000   # Clientes gerados antes da medição (os buffers enchem por volta de 250 mil)
+
+# --- FUNÇÕES ---
+
+def gerar_em_lotes(num_clientes, tamanho_lote, clientes_csv, contas_csv, credito_csv):
+    """Executa as três tabelas em lotes, escrevendo nos escritores dados."""
+    proxima_conta, proximo_credito = 1, 1
+    for linhas, clientes in lotes_clientes(num_clientes, tamanho_lote):
+        clientes_csv.escrever(linhas)
+
+        linhas, contas = gerar_lote_contas(clientes, proxima_conta)
+        proxima_conta += len(linhas)
+        contas_csv.escrever(linhas)
+
+        linhas = gerar_lote_credito(montar_dados_risco(clientes, contas), proximo_credito)
+        proximo_credito += len(linhas)
+        credito_csv.escrever(linhas)
+
+def medir_no_processo(num_clientes, tamanho_lote, aquecimento):
+    """Aquece, zera o pico de RSS e gera o volume, descartando a saída; retorna o pico de RSS (KB) da medição."""
+    with EscritorCSV(os.devnull, 'clientes') as clientes_csv, \
+            EscritorCSV(os.devnull, 'contas') as contas_csv, \
+            EscritorCSV(os.devnull, 'credito') as credito_csv:
+        escritores = (clientes_csv, contas_csv, credito_csv)
+        if aquecimento:
+            gerar_em_lotes(aquecimento, tamanho_lote, *escritores)
+        zerar_pico_rss()
+        gerar_em_lotes(num_clientes, tamanho_lote, *escritores)
+        return pico_rss_kb()
+
+def medir(num_clientes, tamanho_lote, aquecimento):
+    """Roda medir_no_processo num subprocesso (pico de RSS isolado) e retorna o pico em KB."""
+    saida = subprocess.run(
+        [sys.executable, __file__, '--filho', str(num_clientes), '--lote', str(tamanho_lote),
+         '--aquecimento', str(aquecimento)],
+        check=True, capture_output=True, text=True,
+    )
+    return int(saida.stdout.split()[-1])
+
+# --- EXECUÇÃO ---
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica que o pico de memória não cresce com o número de clientes.')
+    parser.add_argument('volumes', type=int, nargs='*', default=VOLUMES, help='Números de clientes (padrão: %(default)s)')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Clientes por lote (padrão: %(default)s)')
+    parser.add_argument('--aquecimento', type=int, default=AQUECIMENTO,
+                        help='Clientes gerados antes de medir, em cada volume (padrão: %(default)s)')
+    parser.add_argument('--filho', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho is not None:
+        print(medir_no_processo(args.filho, args.lote, args.aquecimento))
+        return
+
+    if args.lote > min(args.volumes):
+        print("Aviso: o lote é maior que o menor volume; a comparação de memória fica desigual.")
+
+    picos = []
+    for num_clientes in sorted(args.volumes):
+        print(f"Gerando {num_clientes:,} clientes em lotes de {args.lote:,} "
+              f"(depois de {args.aquecimento:,} de aquecimento)...")
+        pico = medir(num_clientes, args.lote, args.aquecimento)
+        picos.append(pico)
+        print(f" -> Pico de RSS: {pico / 1024:,.1f} MB")
+
+    crescimento = picos[-1] / picos[0] - 1
+    print(f"\nCrescimento do pico de RSS: {crescimento:+.1%} (tolerância: {TOLERANCIA:.0%})")
+    if crescimento > TOLERANCIA:
+        print("❌ FALHOU: a memória cresce com o número de clientes.")
+        sys.exit(1)
+    print("✅ OK: a memória fica estável com o número de clientes.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+import argparse
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, closing
+import numpy as np
+from caminhos import CAMINHO_DB
+from carga_sqlite import carga_em_massa
+from datas import formatar_datas_hora, parsear_datas_hora
+from dominios import CODIGOS_TIPO, SINAL_POR_CODIGO, TIPOS_TRANSACAO
+from instrumentacao import adicionar_argumentos_instrumentacao, configurar_instrumentacao, etapa
+from particoes import tabelas_particionadas
+
+# Varredura de regras de fraude/anomalia sobre as transações, em paralelo.
+# As contas são divididas em faixas contíguas de conta_id; cada faixa é um lote
+# que um processo do pool lê inteiro (todas as transações das contas, em ordem de
+# conta e data_hora) pelo índice de conta_id da tabela `transacoes` ou das
+# partições mensais. Como as janelas deslizantes nunca atravessam contas, cada
+# lote é avaliado sozinho, sem estado compartilhado entre os processos.
+# As regras são funções registradas em REGRAS: recebem o lote em arrays NumPy e
+# devolvem as posições marcadas e um detalhe por posição. O processo principal
+# grava os alertas na tabela `alertas` e soma o tempo de cada regra (linhas/seg).
+
+# --- CONFIGURAÇÃO ---
+FONTES = ['transacoes', 'particoes']
+CONTAS_POR_LOTE = 500
+
+IDX_SAQUE = TIPOS_TRANSACAO.index('Saque')
+IDX_TED = TIPOS_TRANSACAO.index('TED')
+IDX_PIX = TIPOS_TRANSACAO.index('Pix')
+ESCALA_CONTA = 1 << 33          # Chave ordenável (conta, instante) = conta_id * ESCALA_CONTA + segundos
+
+# Parâmetros padrão das regras (sobrescritos pela linha de comando)
+PARAMETROS_PADRAO = {
+    'janela_destinos': 3600,     # Rajada de Pix/TED: janela em segundos...
+    'min_destinos': 5,           # ...e destinos distintos que disparam o alerta
+    'janela_velocidade': 600,    # Velocidade: janela em segundos...
+    'min_transacoes': 6,         # ...e transações (de qualquer tipo) que disparam o alerta
+}
+
+ESQUEMA_ALERTAS = """
+    CREATE TABLE alertas (
+        alerta_id INTEGER PRIMARY KEY, regra TEXT, transacao_id INTEGER, conta_id INTEGER,
+        data_hora TEXT, valor REAL, detalhe TEXT)"""
+
+# Estado de cada processo do pool, montado por configurar_varredura()
+CONEXAO = None
+TABELAS_FONTE = None
+REGRAS_ATIVAS = None
+PARAMETROS = dict(PARAMETROS_PADRAO)
+
+# --- REGRAS ---
+
+def janela_inicio(chave, janela):
+    """Para cada linha (chaves ordenadas), a posição da primeira linha da mesma conta dentro da janela."""
+    return np.searchsorted(chave, chave - janela, side='left')
+
+def rajada_destinos(lote):
+    """Pix/TED para muitos destinos distintos dentro da janela (esvaziamento de conta)."""
+    janela, minimo = PARAMETROS['janela_destinos'], PARAMETROS['min_destinos']
+    sel = np.flatnonzero(np.isin(lote['tipo'], [IDX_PIX, IDX_TED]))
+    chave = lote['chave'][sel]
+    inicio = janela_inicio(chave, janela)
+    # Só as linhas com transferências suficientes na janela precisam da contagem exata de destinos
+    candidatas = np.flatnonzero(np.arange(len(sel)) - inicio + 1 >= minimo)
+    destinos = lote['destino'][sel]
+    posicoes, detalhes = [], []
+    for i in candidatas.tolist():
+        distintos = len(set(destinos[inicio[i]:i + 1].tolist()))
+        if distintos >= minimo:
+            posicoes.append(sel[i])
+            detalhes.append(f"{distintos} destinos distintos em {janela // 60} min")
+    return np.array(posicoes, dtype=np.int64), detalhes
+
+def saque_acima_saldo(lote):
+    """Saque maior que o saldo da conta naquele momento (saldo de abertura + movimento anterior)."""
+    delta = SINAL_POR_CODIGO[lote['tipo']] * lote['valor']
+    acumulado = np.cumsum(delta)
+    conta = lote['conta_id']
+    inicio_conta = np.r_[True, conta[1:] != conta[:-1]]
+    grupo = np.cumsum(inicio_conta) - 1
+    base = (acumulado - delta)[inicio_conta]
+    saldo_antes = lote['saldo_abertura'] + (acumulado - delta) - base[grupo]
+    posicoes = np.flatnonzero((lote['tipo'] == IDX_SAQUE) & (lote['valor'] > saldo_antes))
+    return posicoes, [f"saldo antes do saque: {saldo:.2f}" for saldo in saldo_antes[posicoes].tolist()]
+
+def velocidade(lote):
+    """Muitas transações da mesma conta dentro da janela, de qualquer tipo."""
+    janela, minimo = PARAMETROS['janela_velocidade'], PARAMETROS['min_transacoes']
+    contagem = np.arange(len(lote['chave'])) - janela_inicio(lote['chave'], janela) + 1
+    posicoes = np.flatnonzero(contagem >= minimo)
+    return posicoes, [f"{n} transações em {janela // 60} min" for n in contagem[posicoes].tolist()]
+
+REGRAS = {
+    'rajada_destinos': rajada_destinos,
+    'saque_acima_saldo': saque_acima_saldo,
+    'velocidade': velocidade,
+}
+
+# --- LOTES ---
+
+def configurar_varredura(caminho_db, fonte, regras, parametros):
+    """Inicializador de cada processo: conexão só de leitura, fonte, regras e parâmetros."""
+    global CONEXAO, TABELAS_FONTE, REGRAS_ATIVAS
+    CONEXAO = sqlite3.connect(f"file:{caminho_db}?mode=ro", uri=True)
+    CONEXAO.execute("PRAGMA cache_size = -65536")
+    TABELAS_FONTE = ['transacoes'] if fonte == 'transacoes' else tabelas_particionadas(CONEXAO)
+    REGRAS_ATIVAS = regras
+    PARAMETROS.update(parametros)
+
+def ler_lote(primeira_conta, ultima_conta):
+    """Transações das contas [primeira_conta, ultima_conta] em arrays, ordenadas por conta e data_hora."""
+    # Uma consulta por tabela (o SQLite limita os SELECTs de um UNION ALL); cada uma já vem ordenada
+    linhas = []
+    for tabela in TABELAS_FONTE:
+        linhas.extend(CONEXAO.execute(
+            f"SELECT transacao_id, conta_id, tipo, valor, data_hora, destino FROM {tabela} "
+            "WHERE conta_id BETWEEN ? AND ? ORDER BY conta_id, data_hora", (primeira_conta, ultima_conta)))
+    saldos = dict(CONEXAO.execute("SELECT conta_id, saldo_atual FROM contas WHERE conta_id BETWEEN ? AND ?",
+                                  (primeira_conta, ultima_conta)).fetchall())
+    if not linhas:
+        return None
+
+    transacao_id, conta_id, tipo, valor, data_hora, destino = zip(*linhas)
+    conta_id = np.array(conta_id, dtype=np.int64)
+    segundos = parsear_datas_hora(data_hora)
+    lote = {
+        'transacao_id': np.array(transacao_id, dtype=np.int64),
+        'conta_id': conta_id,
+        'tipo': np.array([CODIGOS_TIPO[t] for t in tipo], dtype=np.int64),
+        'valor': np.array(valor, dtype=np.float64),
+        'segundos': segundos,
+        'chave': conta_id * ESCALA_CONTA + segundos,
+        'destino': np.array(destino, dtype=object),
+        'saldo_abertura': np.array([saldos.get(c, 0.0) for c in conta_id.tolist()], dtype=np.float64),
+    }
+    if len(TABELAS_FONTE) > 1:
+        # Partições mensais: junta os pedaços de cada mês na ordem (conta, data_hora)
+        ordem = np.argsort(lote['chave'], kind='stable')
+        lote = {coluna: valores[ordem] for coluna, valores in lote.items()}
+    return lote
+
+def varrer_lote(faixa):
+    """Lê um lote de contas e aplica as regras ativas; executado dentro do pool de processos.
+
+    Retorna (linhas lidas, segundos de leitura, {regra: segundos}, alertas).
+    """
+    # Tempo de CPU do worker: não infla quando há mais processos que núcleos
+    inicio = time.process_time()
+    lote = ler_lote(*faixa)
+    leitura = time.process_time() - inicio
+    if lote is None:
+        return 0, leitura, {}, []
+
+    tempos, alertas = {}, []
+    for nome in REGRAS_ATIVAS:
+        inicio = time.process_time()
+        posicoes, detalhes = REGRAS[nome](lote)
+        tempos[nome] = time.process_time() - inicio
+        datas = formatar_datas_hora(lote['segundos'][posicoes])
+        alertas.extend(zip([nome] * len(posicoes), lote['transacao_id'][posicoes].tolist(),
+                           lote['conta_id'][posicoes].tolist(), datas.tolist(),
+                           lote['valor'][posicoes].tolist(), detalhes))
+    return len(lote['transacao_id']), leitura, tempos, alertas
+
+def dividir_contas(con, contas_por_lote):
+    """Faixas contíguas [(primeira_conta, ultima_conta), ...] cobrindo todas as contas."""
+    minimo, maximo = con.execute("SELECT MIN(conta_id), MAX(conta_id) FROM contas").fetchone()
+    if minimo is None:
+        return []
+    return [(inicio, min(inicio + contas_por_lote - 1, maximo))
+            for inicio in range(minimo, maximo + 1, contas_por_lote)]
+
+# --- VARREDURA ---
+
+def preparar_alertas(con):
+    con.execute("DROP TABLE IF EXISTS alertas")
+    con.execute(ESQUEMA_ALERTAS)
+
+def varrer(caminho_db=CAMINHO_DB, fonte='transacoes', regras=None, workers=1, contas_por_lote=CONTAS_POR_LOTE,
+           parametros=None, gravar=True, medida=None):
+    """Varre todas as contas com as regras pedidas em `workers` processos.
+
+    Retorna {'linhas', 'segundos', 'leitura', 'regras': {regra: segundos}, 'alertas': {regra: quantidade}}.
+    Os tempos de leitura e de cada regra são somados entre os processos (tempo de CPU dos workers).
+    """
+    regras = list(regras or REGRAS)
+    parametros = {**PARAMETROS_PADRAO, **(parametros or {})}
+    with closing(sqlite3.connect(caminho_db)) as con:
+        faixas = dividir_contas(con, contas_por_lote)
+
+    resultado = {'linhas': 0, 'leitura': 0.0, 'regras': dict.fromkeys(regras, 0.0),
+                 'alertas': dict.fromkeys(regras, 0)}
+    inicio = time.perf_counter()
+    with ExitStack() as pilha:
+        pool = pilha.enter_context(ProcessPoolExecutor(max_workers=workers, initializer=configurar_varredura,
+                                                       initargs=(caminho_db, fonte, regras, parametros)))
+        if gravar:
+            con = pilha.enter_context(carga_em_massa(caminho_db))
+            preparar_alertas(con)
+            con.execute("BEGIN")
+        # Os lotes chegam na ordem das faixas; os alertas são gravados à medida que chegam
+        for linhas, leitura, tempos, alertas in pool.map(varrer_lote, faixas):
+            resultado['linhas'] += linhas
+            resultado['leitura'] += leitura
+            for nome, segundos in tempos.items():
+                resultado['regras'][nome] += segundos
+            for alerta in alertas:
+                resultado['alertas'][alerta[0]] += 1
+            if gravar and alertas:
+                con.executemany("INSERT INTO alertas (regra, transacao_id, conta_id, data_hora, valor, detalhe) "
+                                "VALUES (?, ?, ?, ?, ?, ?)", alertas)
+            if medida is not None:
+                medida.linhas += linhas
+        if gravar:
+            con.execute("CREATE INDEX idx_alertas_conta ON alertas (conta_id)")
+            con.execute("COMMIT")
+    resultado['segundos'] = time.perf_counter() - inicio
+    return resultado
+
+def relatorio(resultado, workers):
+    """Imprime linhas/seg da varredura, da leitura e de cada regra e os alertas por regra."""
+    linhas = resultado['linhas']
+    print(f"\n--- VARREDURA ({workers} worker(s)) ---")
+    print(f" -> {linhas:,} transações em {resultado['segundos']:.2f}s "
+          f"({linhas / max(resultado['segundos'], 1e-9):,.0f} linhas/seg)")
+    print(f" -> {'leitura':<20} {resultado['leitura']:>8.2f}s {linhas / max(resultado['leitura'], 1e-9):>14,.0f} linhas/seg")
+    for nome, segundos in resultado['regras'].items():
+        print(f" -> {nome:<20} {segundos:>8.2f}s {linhas / max(segundos, 1e-9):>14,.0f} linhas/seg "
+              f"{resultado['alertas'][nome]:>10,} alertas")
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+def adicionar_argumentos_regras(parser):
+    """Acrescenta --regra e os parâmetros das janelas ao parser do script."""
+    parser.add_argument('--regra', action='append', choices=list(REGRAS),
+                        help='Regra a aplicar (pode repetir; padrão: todas)')
+    for nome, padrao in PARAMETROS_PADRAO.items():
+        parser.add_argument(f"--{nome.replace('_', '-')}", type=int, default=padrao,
+                            help='Padrão: %(default)s' + (' segundos' if nome.startswith('janela') else ''))
+
+def parametros_dos_argumentos(args):
+    return {nome: getattr(args, nome) for nome in PARAMETROS_PADRAO}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Varre as transações com as regras de fraude e grava a tabela alertas.')
+    parser.add_argument('--db', default=CAMINHO_DB, help='Arquivo do banco (padrão: %(default)s)')
+    parser.add_argument('--fonte', choices=FONTES, default='transacoes',
+                        help="Tabela única 'transacoes' ou as partições mensais (padrão: %(default)s)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processos do pool (padrão: nº de CPUs)')
+    parser.add_argument('--contas-por-lote', type=int, default=CONTAS_POR_LOTE,
+                        help='Contas por lote enviado a um worker (padrão: %(default)s)')
+    adicionar_argumentos_regras(parser)
+    adicionar_argumentos_instrumentacao(parser)
+    args = parser.parse_args()
+    configurar_instrumentacao(args)
+
+    if not os.path.exists(args.db):
+        print(f"ERRO: banco '{args.db}' não encontrado. Rode a carga (carga_sqlite.py ou --sqlite) antes.")
+    else:
+        print(f"Varrendo as transações ({args.fonte}) com {args.workers} worker(s)...")
+        with etapa('varredura') as medida:
+            resultado = varrer(args.db, args.fonte, args.regra, args.workers, args.contas_por_lote,
+                               parametros_dos_argumentos(args), medida=medida)
+        relatorio(resultado, args.workers)
+        print(f"\n✅ {sum(resultado['alertas'].values()):,} alertas gravados na tabela 'alertas'.")